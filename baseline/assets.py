@@ -0,0 +1,1673 @@
+"""
+资源管理
+
+图像按`(路径, 大小, 标志)`缓存: 每个文件只解码一次, 转换为显示格式 (`convert_alpha`/`convert`) 后在实体之间共享,
+超出内存预算时按LRU (最近最少使用) 淘汰。
+
+零散的小图 (图块、角色帧) 可以离线打包为图集 (`pack_atlas`, 命令行见`build_atlas.py`),
+运行时通过`AssetManager.load_atlas`登记后, 这些图像会作为同一张已转换图集的子Surface返回。
+
+图像还可以预先解码为资源包 (`build_bundle`, 命令行见`build_bundle.py`): 一个文件, 包含索引头与原始RGBA像素块,
+运行时内存映射 (`mmap`) 后用`pygame.image.frombuffer`直接生成Surface, 完全不需要解码。
+
+需要解码的图像可以交给`AssetStreamer`在后台线程中解码, 立即返回带占位图像的`AssetHandle`,
+主线程每帧调用`AssetStreamer.update`完成Surface的转换并换上真正的图像。
+
+音效由`SoundManager`缓存 (每个文件只解码一次), 并限制每个音效同时播放的数量, 按优先级抢占混音通道。
+背景音乐由`MusicManager`预加载, 切换时淡出/淡入, 不阻塞主循环。
+渲染好的文本由`TextCache`缓存, 重复的文本不再重新渲染。
+支持中文的字体由`FontRegistry`只查找一次, 同样的字号共享同一个Font对象。
+
+Classes
+---
+ImageFlag
+    加载图像的标志
+AssetManager
+    资源管理器
+AssetHandle
+    后台加载的资源的句柄
+AssetStreamer
+    后台资源加载器 (线程池)
+SoundManager
+    音效管理器 (音效缓存与混音通道池)
+MusicManager
+    背景音乐管理器 (预加载与淡入淡出切换)
+TextCache
+    渲染好的文本的缓存
+FontRegistry
+    字体注册表 (只查找一次中文字体, 缓存Font对象)
+
+Functions
+---
+update() -> None
+    (每帧在主线程中调用) 推进`default_streamer`与`default_music`
+pack_atlas(paths: Iterable[str], out_dir: str, root: str = ".", name: str = "atlas", max_size: int = 1024, padding: int = 1) -> str
+    把多张图像打包为图集, 返回索引文件路径
+build_bundle(paths: Iterable[str], bundle_path: str, root: str = ".", sizes: Optional[dict[str, list[tuple[int, int]]]] = None) -> int
+    把多张图像预先解码为资源包, 返回包含的图像数量
+get_placeholder_image(size: tuple[int, int]) -> pygame.Surface
+    获取完全透明的占位图像, 同一大小只创建一次 (共享)
+
+Attributes
+---
+default_assets : AssetManager
+    默认的资源管理器 (`utils.load_image_and_scale`使用)
+default_streamer : AssetStreamer
+    默认的后台资源加载器 (使用`default_assets`)
+default_sounds : SoundManager
+    默认的音效管理器 (`utils.PygameApis.play_sound`使用)
+default_music : MusicManager
+    默认的背景音乐管理器 (`utils.PygameApis.play_music`使用)
+default_text_cache : TextCache
+    默认的文本缓存 (`game_collections.TextEntity`使用)
+MUSIC_CHANNELS : int
+    为背景音乐预留的混音通道数 (通道0与1), 音效不会使用
+default_fonts : FontRegistry
+    默认的字体注册表 (`game_collections.TextEntity.get_zh_font`使用)
+"""
+
+import os
+import io
+import time
+import json
+import mmap
+import struct
+import queue
+import hashlib
+import collections
+from concurrent.futures import ThreadPoolExecutor, Future
+from enum import IntFlag
+from typing import Dict, Optional, Tuple, Hashable, Iterable, List, Callable, Any
+
+import pygame
+from loguru import logger
+
+_ImageKey = Tuple[str, Optional[Tuple[int, int]], int]
+_AtlasSprite = Tuple[str, pygame.Rect]  # (图集页的路径, 在页中的区域)
+
+_SourceKey = Tuple[str, Optional[Tuple[int, int]]]  # (规范化的源文件路径, 大小)
+_Voice = Tuple[pygame.mixer.Channel, str, int]  # (通道, 音效路径, 优先级)
+# (字体, 文本, 颜色, 抗锯齿)
+_TextKey = Tuple[pygame.font.Font, str, Tuple[int, ...], bool]
+_BundleEntry = Tuple[memoryview, int, Tuple[int, int]]  # (像素数据, 偏移, 图像大小)
+
+ATLAS_VERSION = 1
+BUNDLE_MAGIC = b"PGBUNDLE"
+BUNDLE_VERSION = 1
+_BUNDLE_HEADER = struct.Struct("<8sII")  # 魔数, 版本, 索引长度
+_BUNDLE_ALIGN = 16
+_BUNDLE_INDEX_SLACK = 256  # 头部预留的空间, 原地更新索引 (修改时间) 时长度可以略有增加
+MUSIC_CHANNELS = 2  # 为`MusicManager`预留的混音通道数 (通道0与1)
+
+
+class ImageFlag(IntFlag):
+    """
+    加载图像的标志, 是缓存键的一部分
+    """
+
+    NONE = 0
+    ALPHA = 1  # 使用`convert_alpha` (保留透明度), 否则使用`convert`
+    SMOOTH = 2  # 缩放时使用`pygame.transform.smoothscale`
+
+
+class AssetManager:
+    """
+    资源管理器: 缓存并共享解码后的图像
+
+    Attributes
+    ---
+    budget_bytes : Optional[int]
+        缓存的内存预算 (字节), `None`为不限制。超出时按LRU淘汰最久没有使用的图像
+    memory_bytes : int
+        当前缓存的图像占用的内存 (字节)
+    stats : collections.Counter[str]
+        统计: "hits" (命中), "misses" (未命中, 需要解码或缩放), "evictions" (被淘汰)
+
+    Methods
+    ---
+    load_image(self, path: str, size: Optional[tuple[int, int]] = None, flags: ImageFlag = ImageFlag.ALPHA) -> pygame.Surface
+        加载图像 (有缓存时直接返回)
+    load_atlas(self, index_path: str) -> int
+        登记图集, 之后图集中的图像从图集页中切出
+    load_bundle(self, bundle_path: str, auto_rebuild: bool = True) -> int
+        登记资源包, 之后资源包中的图像不再解码
+    needs_decode(self, path: str, flags: ImageFlag = ImageFlag.ALPHA) -> Optional[str]
+        加载图像需要解码的文件, 不需要解码时为`None`
+    add_image(self, path: str, image: pygame.Surface, flags: ImageFlag = ImageFlag.ALPHA) -> pygame.Surface
+        把 (在别处) 解码好的原始大小的图像放入缓存
+    clear(self) -> None
+        清空缓存
+
+    Notes
+    ---
+    - 返回的Surface被所有使用者共享, **不要在上面绘制** (需要修改时请先`copy()`)。
+    - 显示模式设置 (`pygame.display.set_mode`) 之前加载的图像无法转换格式, 会在设置之后第一次被使用时再转换。
+    - 被淘汰的图像如果仍被实体引用, 不会被释放, 只是之后再加载时会重新解码。
+    - 图集中的图像是图集页的子Surface, 不单独计入`memory_bytes`。
+    """
+
+    # attributes
+    __images: "collections.OrderedDict[_ImageKey, pygame.Surface]"
+    __converted: Dict[_ImageKey, bool]
+    __memory_bytes: int
+    __atlas_sprites: Dict[_SourceKey, _AtlasSprite]
+    __bundle_entries: Dict[_SourceKey, _BundleEntry]
+    __bundle_buffers: Dict[str, memoryview]
+    budget_bytes: Optional[int]
+    stats: collections.Counter
+
+    @property
+    def memory_bytes(self) -> int:
+        """当前缓存的图像占用的内存 (字节)"""
+        return self.__memory_bytes
+
+    def __init__(self, budget_bytes: Optional[int] = 256 * 1024 * 1024):
+        """
+        Parameters
+        ---
+        budget_bytes : Optional[int], default = 256 MiB
+            缓存的内存预算 (字节), `None`为不限制
+        """
+        self.budget_bytes: Optional[int] = budget_bytes
+        self.stats: collections.Counter = collections.Counter()
+        self.__images: "collections.OrderedDict[_ImageKey, pygame.Surface]" = (
+            collections.OrderedDict()
+        )
+        self.__converted: Dict[_ImageKey, bool] = {}
+        self.__memory_bytes: int = 0
+        self.__atlas_sprites: Dict[_SourceKey, _AtlasSprite] = {}
+        self.__bundle_entries: Dict[_SourceKey, _BundleEntry] = {}
+        self.__bundle_buffers: Dict[str, memoryview] = {}
+
+    def __len__(self) -> int:
+        return len(self.__images)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__images
+
+    @staticmethod
+    def surface_bytes(surface: pygame.Surface) -> int:
+        """Surface像素数据占用的内存 (字节), 子Surface与父Surface共享像素, 记为0"""
+        if surface.get_parent() is not None:
+            return 0
+        return surface.get_pitch() * surface.get_height()
+
+    @staticmethod
+    def make_key(
+        path: str,
+        size: Optional[Tuple[int, int]] = None,
+        flags: ImageFlag = ImageFlag.ALPHA,
+    ) -> _ImageKey:
+        """
+        生成缓存键`(规范化的路径, 大小, 标志)`
+
+        Notes
+        ---
+        路径中的`\\`与`/`视为相同, 因此`r".\\assets\\a.png"`与`"assets/a.png"`是同一个文件
+        """
+        return (
+            _normalize_path(path),
+            tuple(size) if size is not None else None,
+            int(flags),
+        )
+
+    def load_image(
+        self,
+        path: str,
+        size: Optional[Tuple[int, int]] = None,
+        flags: ImageFlag = ImageFlag.ALPHA,
+    ) -> pygame.Surface:
+        """
+        加载图像, 有缓存时直接返回缓存的Surface
+
+        Parameters
+        ---
+        path : str
+            图像路径
+        size : Optional[tuple[int, int]], default = None
+            缩放后的大小, `None`为原始大小
+        flags : ImageFlag, default = ImageFlag.ALPHA
+            加载标志
+
+        Returns
+        ---
+        pygame.Surface
+            共享的图像, 不要在上面绘制
+
+        Notes
+        ---
+        缩放的图像由原始大小的图像 (同样会被缓存) 缩放得到, 因此同一文件的不同大小只解码一次。
+        已登记到图集的图像, 原始大小的图像是图集页的子Surface。
+        已登记到资源包的图像直接使用资源包中的像素 (缩放过的图像仅在不使用`ImageFlag.SMOOTH`时使用)。
+        """
+        key = self.make_key(path, size, flags)
+        image = self.__images.get(key)
+        if image is not None:
+            self.stats["hits"] += 1
+            self.__images.move_to_end(key)
+            if not self.__converted[key]:
+                image = self.__convert(key, image)
+            return image
+
+        self.stats["misses"] += 1
+        # 资源包与图集中缩放过的图像是用`pygame.transform.scale`生成的
+        prebuilt = size is None or not flags & ImageFlag.SMOOTH
+        baked = self.__bundle_entries.get(key[:2]) if prebuilt else None
+        sprite = self.__atlas_sprites.get(key[:2]) if prebuilt else None
+        if baked is not None:
+            buffer, offset, shape = baked
+            image = pygame.image.frombuffer(
+                buffer[offset : offset + shape[0] * shape[1] * 4], shape, "RGBA"
+            )
+            if pygame.display.get_surface() is None:
+                image = image.copy()  # 资源包是只读映射, 不能交出直接引用它的Surface
+        elif sprite is not None:
+            image = self.load_image(sprite[0], None, flags).subsurface(sprite[1])
+        elif size is None:
+            image = pygame.image.load(key[0])
+        else:
+            source = self.load_image(path, None, flags)
+            if flags & ImageFlag.SMOOTH:
+                image = pygame.transform.smoothscale(source, size)
+            else:
+                image = pygame.transform.scale(source, size)
+        self.__converted[key] = False
+        self.__images[key] = image
+        self.__memory_bytes += self.surface_bytes(image)
+        image = self.__convert(key, image)
+        self.__evict(keep=key)
+        return image
+
+    def needs_decode(
+        self, path: str, flags: ImageFlag = ImageFlag.ALPHA
+    ) -> Optional[str]:
+        """
+        加载`path`的原始大小的图像需要解码的文件
+
+        Returns
+        ---
+        Optional[str]
+            需要解码的文件 (规范化的路径, 图集中的图像为图集页); 已缓存或在资源包中时为`None`
+        """
+        key = self.make_key(path, None, flags)
+        if key in self.__images or key[:2] in self.__bundle_entries:
+            return None
+        sprite = self.__atlas_sprites.get(key[:2])
+        if sprite is not None:
+            return self.needs_decode(sprite[0], flags)
+        return key[0]
+
+    def add_image(
+        self, path: str, image: pygame.Surface, flags: ImageFlag = ImageFlag.ALPHA
+    ) -> pygame.Surface:
+        """
+        把 (在别处, 比如后台线程中) 解码好的`path`的原始大小的图像放入缓存
+
+        Returns
+        ---
+        pygame.Surface
+            缓存中的图像 (已经缓存时为原有的图像, `image`被丢弃)
+        """
+        key = self.make_key(path, None, flags)
+        if key in self.__images:
+            return self.load_image(path, None, flags)
+        self.__converted[key] = False
+        self.__images[key] = image
+        self.__memory_bytes += self.surface_bytes(image)
+        image = self.__convert(key, image)
+        self.__evict(keep=key)
+        return image
+
+    def __convert(self, key: _ImageKey, image: pygame.Surface) -> pygame.Surface:
+        """转换为显示格式 (显示模式未设置时什么都不做)"""
+        if pygame.display.get_surface() is None:
+            return image
+        old_bytes = self.surface_bytes(image)
+        sprite = self.__atlas_sprites.get(key[:2]) if image.get_parent() else None
+        if sprite is not None:  # 从已转换的图集页重新切出, 保持为子Surface
+            image = self.load_image(sprite[0], None, ImageFlag(key[2]))
+            image = image.subsurface(sprite[1])
+        elif key[2] & ImageFlag.ALPHA:
+            image = image.convert_alpha()
+        else:
+            image = image.convert()
+        self.__images[key] = image
+        self.__converted[key] = True
+        self.__memory_bytes += self.surface_bytes(image) - old_bytes
+        return image
+
+    def __evict(self, keep: _ImageKey) -> None:
+        """超出预算时, 按LRU淘汰图像 (不淘汰`keep`)"""
+        budget = self.budget_bytes
+        if budget is None:
+            return
+        images = self.__images
+        while self.__memory_bytes > budget and len(images) > 1:
+            key = next(iter(images))
+            if key == keep:
+                images.move_to_end(key)
+                continue
+            image = images.pop(key)
+            del self.__converted[key]
+            self.__memory_bytes -= self.surface_bytes(image)
+            self.stats["evictions"] += 1
+            logger.debug(f"Evict image {key}.")
+
+    def load_atlas(self, index_path: str) -> int:
+        """
+        登记图集 (由`pack_atlas`生成), 之后加载图集中的图像时, 返回图集页的子Surface
+
+        Parameters
+        ---
+        index_path : str
+            图集索引文件的路径
+
+        Returns
+        ---
+        int
+            登记的图像数量。索引文件不存在时为0
+
+        Notes
+        ---
+        源文件在打包之后被修改过 (大小或修改时间不同) 的图像不会被登记, 仍从源文件加载。
+        需要在加载这些图像之前调用; 已经缓存的图像不受影响。
+        打包时指定了缩放大小的图像, 按这些大小加载时也来自图集 (带`ImageFlag.SMOOTH`时除外)。
+        """
+        index_path = _normalize_path(index_path)
+        if not os.path.exists(index_path):
+            logger.info(f"Atlas index {index_path} not found, load images one by one.")
+            return 0
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != ATLAS_VERSION:
+            logger.warning(f"Unsupported atlas version in {index_path}, ignored.")
+            return 0
+
+        index_dir = os.path.dirname(index_path)
+        root = os.path.join(index_dir, index["root"])
+        pages = [
+            _normalize_path(os.path.join(index_dir, page)) for page in index["pages"]
+        ]
+        count = 0
+        for rel_path, sprite in index["sprites"].items():
+            path = _normalize_path(os.path.join(root, rel_path))
+            page = pages[sprite["page"]]
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stat = None
+            if (
+                stat is not None
+                and (stat.st_size, stat.st_mtime_ns)
+                != (sprite["size"], sprite["mtime_ns"])
+            ) or not os.path.exists(page):
+                logger.debug(f"Atlas entry {rel_path} is stale, skipped.")
+                continue
+            self.__atlas_sprites[path, None] = (page, pygame.Rect(sprite["rect"]))
+            for scaled in sprite.get("scaled", ()):
+                rect = pygame.Rect(scaled["rect"])
+                if os.path.exists(pages[scaled["page"]]):
+                    self.__atlas_sprites[path, rect.size] = (
+                        pages[scaled["page"]],
+                        rect,
+                    )
+            count += 1
+        logger.info(f"Load atlas {index_path}: {count} sprites in {len(pages)} pages.")
+        return count
+
+    def load_bundle(self, bundle_path: str, auto_rebuild: bool = True) -> int:
+        """
+        登记资源包 (由`build_bundle`生成), 之后加载资源包中的图像时, 直接使用内存映射的像素数据
+
+        Parameters
+        ---
+        bundle_path : str
+            资源包路径
+        auto_rebuild : bool, default = True
+            有源文件被修改过 (内容的SHA-1不同) 时, 是否自动重新生成资源包。
+            为`False`时, 只登记没有被修改过的图像
+
+        Returns
+        ---
+        int
+            登记的图像数量。资源包不存在或格式不对时为0
+
+        Notes
+        ---
+        先比较源文件的大小与修改时间, 不同时才计算SHA-1, 因此正常启动不会读取源文件。
+        内容没有变化、只是修改时间变了的源文件, 会把新的修改时间写回索引, 之后启动不再计算SHA-1。
+        资源包是只读映射, 在显示模式设置之前加载的图像会被复制一份, 之后总是转换为显示格式。
+        需要在加载这些图像之前调用; 已经缓存的图像不受影响。
+        再次登记同一个资源包时, 会先释放之前的内存映射, 然后才更新索引或重新生成 (Windows不能替换或写入被映射的文件)。
+        """
+        bundle_path = _normalize_path(bundle_path)
+        index = _read_bundle_index(bundle_path)
+        if index is None:
+            logger.info(f"Bundle {bundle_path} not found or invalid, decode images.")
+            return 0
+
+        self.__release_bundle(bundle_path)
+        root = os.path.join(os.path.dirname(bundle_path), index["root"])
+        stale = []
+        touched = False
+        for entry in index["entries"]:
+            state = _check_bundle_entry(os.path.join(root, entry["path"]), entry)
+            if state is None:
+                stale.append(entry)
+            touched |= state is False
+        rebuild = bool(stale) and auto_rebuild
+        if touched and not rebuild:
+            # 内容没有变化但修改时间变了 (比如重新检出), 记录新的修改时间, 之后启动不再计算SHA-1
+            if not _rewrite_bundle_index(bundle_path, index):
+                rebuild = auto_rebuild  # 新的索引放不下, 重新生成
+        if rebuild:
+            logger.info(
+                f"{len(stale)} sources of bundle {bundle_path} changed, rebuild."
+            )
+            sizes: Dict[str, List[Tuple[int, int]]] = {}
+            for entry in index["entries"]:
+                path = os.path.join(root, entry["path"])
+                if os.path.exists(path):
+                    sizes.setdefault(path, [])
+                    if entry["size"] is not None:
+                        sizes[path].append(tuple(entry["size"]))
+            build_bundle(list(sizes), bundle_path, root, sizes)
+            index, stale = _read_bundle_index(bundle_path), []
+
+        stale_ids = {id(entry) for entry in stale}
+        with open(bundle_path, "rb") as f:
+            buffer = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        self.__bundle_buffers[bundle_path] = buffer
+        count = 0
+        for entry in index["entries"]:
+            if id(entry) in stale_ids:
+                continue
+            path = _normalize_path(os.path.join(root, entry["path"]))
+            size = tuple(entry["size"]) if entry["size"] is not None else None
+            self.__bundle_entries[path, size] = (
+                buffer,
+                entry["offset"],
+                tuple(entry["shape"]),
+            )
+            count += 1
+        logger.info(f"Load bundle {bundle_path}: {count} images.")
+        return count
+
+    def __release_bundle(self, bundle_path: str) -> None:
+        """取消登记资源包中的图像, 并关闭它的内存映射"""
+        buffer = self.__bundle_buffers.pop(bundle_path, None)
+        if buffer is None:
+            return
+        self.__bundle_entries = {
+            key: entry
+            for key, entry in self.__bundle_entries.items()
+            if entry[0] is not buffer
+        }
+        mapping = buffer.obj
+        try:
+            buffer.release()
+            mapping.close()
+        except BufferError as e:  # 还有Surface直接引用映射中的像素
+            logger.warning(f"Fail to unmap bundle {bundle_path}: {e!r}")
+
+    def clear(self) -> None:
+        """
+        清空缓存 (不重置`stats`)
+        """
+        self.__images.clear()
+        self.__converted.clear()
+        self.__memory_bytes = 0
+
+
+class AssetHandle:
+    """
+    后台加载的资源的句柄 (由`AssetStreamer`创建)
+
+    Attributes
+    ---
+    path : str
+        资源路径
+    value : Any
+        资源: 图像加载完成之前为透明的占位图像, 文件加载完成之前为`None`
+    ready : bool
+        是否加载完成
+    error : Optional[BaseException]
+        加载失败时的异常
+
+    Methods
+    ---
+    add_callback(self, callback: (Any) -> None) -> None
+        加载完成后 (在主线程中) 调用`callback(value)`, 已经完成时立即调用
+    """
+
+    __slots__ = ("path", "size", "flags", "value", "ready", "error", "__callbacks")
+
+    # attributes
+    path: str
+    size: Optional[Tuple[int, int]]
+    flags: ImageFlag
+    value: Any
+    ready: bool
+    error: Optional[BaseException]
+    __callbacks: List[Callable[[Any], Any]]
+
+    def __init__(
+        self,
+        path: str,
+        value: Any = None,
+        size: Optional[Tuple[int, int]] = None,
+        flags: ImageFlag = ImageFlag.ALPHA,
+    ):
+        self.path: str = path
+        self.size: Optional[Tuple[int, int]] = size
+        self.flags: ImageFlag = flags
+        self.value: Any = value
+        self.ready: bool = False
+        self.error: Optional[BaseException] = None
+        self.__callbacks: List[Callable[[Any], Any]] = []
+
+    def __repr__(self) -> str:
+        state = "ready" if self.ready else "failed" if self.error else "pending"
+        return f"<AssetHandle {self.path!r} {state}>"
+
+    def add_callback(self, callback: Callable[[Any], Any]) -> None:
+        """
+        加载完成后调用`callback(value)` (在`AssetStreamer.update`中, 即主线程中), 已经完成时立即调用。
+        加载失败时不会调用。
+
+        Examples
+        ---
+        ```
+        handle = assets.default_streamer.load_image(path, entity.rect.size)
+        entity.image = handle.value  # 先使用占位图像
+        handle.add_callback(lambda image: setattr(entity, "image", image))
+        ```
+        """
+        if self.ready:
+            callback(self.value)
+        else:
+            self.__callbacks.append(callback)
+
+    def set_value(self, value: Any) -> None:
+        """设置资源并调用回调 (由`AssetStreamer`调用)"""
+        self.value = value
+        self.ready = True
+        callbacks, self.__callbacks = self.__callbacks, []
+        for callback in callbacks:
+            callback(value)
+
+    def set_error(self, error: BaseException) -> None:
+        """设置加载失败 (由`AssetStreamer`调用)"""
+        self.error = error
+        self.__callbacks.clear()
+
+
+class AssetStreamer:
+    """
+    后台资源加载器: 在线程池中读取与解码文件, 在主线程中 (`update`) 生成并转换Surface
+
+    Attributes
+    ---
+    manager : AssetManager
+        图像放入的资源管理器
+    pending_count : int
+        还没有完成的任务数量
+
+    Methods
+    ---
+    load_image(self, path: str, size: Optional[tuple[int, int]] = None, flags: ImageFlag = ImageFlag.ALPHA) -> AssetHandle
+        后台加载图像, 立即返回句柄
+    load_file(self, path: str) -> AssetHandle
+        后台读取文件的全部字节 (比如音频), 立即返回句柄
+    prefetch(self, paths: Iterable[str]) -> list[AssetHandle]
+        后台预加载多张原始大小的图像
+    update(self, budget_ms: float = 2.0) -> int
+        (每帧在主线程中调用) 处理已经解码完成的任务
+    close(self) -> None
+        关闭线程池
+
+    Notes
+    ---
+    - 已缓存、在资源包中的图像不需要解码, 会同步加载, 返回的句柄已经完成。
+    - 同一文件的多个请求只解码一次。
+    - 后台线程只读取文件并解码为RGBA字节, 不接触显示与`AssetManager`, Surface的生成与转换都在主线程中。
+    """
+
+    # attributes
+    manager: AssetManager
+    __executor: ThreadPoolExecutor
+    __done: "queue.SimpleQueue[Tuple[str, Future]]"
+    __waiting: Dict[str, List[AssetHandle]]
+
+    @property
+    def pending_count(self) -> int:
+        """还没有完成的任务数量"""
+        return len(self.__waiting)
+
+    def __init__(self, manager: AssetManager, max_workers: int = 2):
+        """
+        Parameters
+        ---
+        manager : AssetManager
+            图像放入的资源管理器
+        max_workers : int, default = 2
+            线程池的线程数
+        """
+        self.manager: AssetManager = manager
+        self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="AssetStreamer"
+        )
+        self.__done: "queue.SimpleQueue[Tuple[str, Future]]" = queue.SimpleQueue()
+        self.__waiting: Dict[str, List[AssetHandle]] = {}
+
+    def __submit(self, job: str, function: Callable, *args) -> None:
+        """提交任务, 完成后把`(job, future)`放入完成队列"""
+        future = self.__executor.submit(function, *args)
+        future.add_done_callback(lambda future: self.__done.put((job, future)))
+
+    def load_image(
+        self,
+        path: str,
+        size: Optional[Tuple[int, int]] = None,
+        flags: ImageFlag = ImageFlag.ALPHA,
+    ) -> AssetHandle:
+        """
+        后台加载图像 (参数同`AssetManager.load_image`), 立即返回句柄
+
+        Returns
+        ---
+        AssetHandle
+            句柄, 加载完成之前`value`为透明的占位图像 (`size`为`None`时是1x1的)
+        """
+        handle = AssetHandle(
+            path,
+            get_placeholder_image(size if size is not None else (1, 1)),
+            size,
+            flags,
+        )
+        source = self.manager.needs_decode(path, flags)
+        if source is None:
+            handle.set_value(self.manager.load_image(path, size, flags))
+            return handle
+
+        job = f"image:{source}"
+        if job not in self.__waiting:
+            self.__waiting[job] = []
+            self.__submit(job, _decode_image, source)
+        self.__waiting[job].append(handle)
+        return handle
+
+    def load_file(self, path: str) -> AssetHandle:
+        """
+        后台读取文件的全部字节 (比如音频, 之后可以用`io.BytesIO`包装后交给pygame)
+
+        Returns
+        ---
+        AssetHandle
+            句柄, 加载完成之前`value`为`None`
+        """
+        handle = AssetHandle(path)
+        job = f"file:{_normalize_path(path)}"
+        if job not in self.__waiting:
+            self.__waiting[job] = []
+            self.__submit(job, _read_file, job[5:])
+        self.__waiting[job].append(handle)
+        return handle
+
+    def prefetch(self, paths: Iterable[str]) -> List[AssetHandle]:
+        """
+        后台预加载多张原始大小的图像 (之后`AssetManager.load_image`会直接命中缓存)
+        """
+        return [self.load_image(path) for path in paths]
+
+    def update(self, budget_ms: float = 2.0) -> int:
+        """
+        处理已经解码完成的任务: 生成并转换Surface, 放入资源管理器, 完成句柄 (调用回调)
+
+        每帧在主线程中调用一次。
+
+        Parameters
+        ---
+        budget_ms : float, default = 2.0
+            时间预算 (毫秒), 超出后剩下的任务留到下一帧 (至少处理一个)
+
+        Returns
+        ---
+        int
+            处理的任务数量
+        """
+        deadline = time.perf_counter() + budget_ms / 1000
+        count = 0
+        while count == 0 or time.perf_counter() < deadline:
+            try:
+                job, future = self.__done.get_nowait()
+            except queue.Empty:
+                break
+            count += 1
+            handles = self.__waiting.pop(job)
+            error = future.exception()
+            if error is not None:
+                logger.error(f"Fail to load {job}: {error!r}")
+                for handle in handles:
+                    handle.set_error(error)
+                continue
+
+            if job.startswith("file:"):
+                for handle in handles:
+                    handle.set_value(future.result())
+                continue
+
+            pixels, shape = future.result()
+            image = pygame.image.frombuffer(pixels, shape, "RGBA")
+            for flags in {handle.flags for handle in handles}:
+                self.manager.add_image(job[6:], image, flags)
+            for handle in handles:
+                handle.set_value(
+                    self.manager.load_image(handle.path, handle.size, handle.flags)
+                )
+        return count
+
+    def close(self) -> None:
+        """关闭线程池 (等待正在执行的任务完成)"""
+        self.__executor.shutdown(wait=True)
+
+
+class SoundManager:
+    """
+    音效管理器: 缓存解码后的音效, 并管理混音通道 (每个音效的同时播放数量上限, 按优先级抢占通道)
+
+    Attributes
+    ---
+    num_channels : int
+        混音通道数量 (在第一次播放时通过`pygame.mixer.set_num_channels`设置), 包括为背景音乐预留的`MUSIC_CHANNELS`个通道
+    default_voice_limit : int
+        每个音效默认的同时播放数量上限
+    stats : collections.Counter[str]
+        统计: "plays" (播放), "steals" (抢占了其他声音的通道), "drops" (没有可用的通道, 没有播放)
+
+    Methods
+    ---
+    load_sound(self, path: str) -> pygame.mixer.Sound
+        加载音效 (有缓存时直接返回)
+    preload(self, paths: Iterable[str]) -> None
+        预先加载多个音效
+    set_voice_limit(self, path: str, limit: int) -> None
+        设置音效的同时播放数量上限
+    play(self, path: str, *, loop: int = 0, priority: int = 0) -> Optional[pygame.mixer.Channel]
+        播放音效
+    stop(self) -> None
+        停止所有音效
+
+    Notes
+    ---
+    - 同一音效同时播放的数量达到上限时, 停止其中最早开始的一个, 再播放新的。
+    - 没有空闲通道时, 抢占优先级不高于新声音的、最早开始的声音的通道; 都比新声音优先时不播放。
+    - 第一次播放前预留前`MUSIC_CHANNELS`个通道给`MusicManager`, 音效只使用`pygame.mixer.find_channel`找到的
+      (未预留的) 通道, 因此不会覆盖或抢占背景音乐。
+    """
+
+    # attributes
+    __sounds: Dict[str, pygame.mixer.Sound]
+    __voice_limits: Dict[str, int]
+    __voices: List[_Voice]
+    __channels_ready: bool
+    num_channels: int
+    default_voice_limit: int
+    stats: collections.Counter
+
+    def __init__(self, num_channels: int = 16, default_voice_limit: int = 4):
+        """
+        Parameters
+        ---
+        num_channels : int, default = 16
+            混音通道数量
+        default_voice_limit : int, default = 4
+            每个音效默认的同时播放数量上限
+        """
+        self.num_channels: int = num_channels
+        self.default_voice_limit: int = default_voice_limit
+        self.stats: collections.Counter = collections.Counter()
+        self.__sounds: Dict[str, pygame.mixer.Sound] = {}
+        self.__voice_limits: Dict[str, int] = {}
+        self.__voices: List[_Voice] = []
+        self.__channels_ready: bool = False
+
+    def load_sound(self, path: str) -> pygame.mixer.Sound:
+        """
+        加载音效, 有缓存时直接返回缓存的Sound (被所有使用者共享)
+        """
+        path = _normalize_path(path)
+        sound = self.__sounds.get(path)
+        if sound is None:
+            sound = self.__sounds[path] = pygame.mixer.Sound(path)
+        return sound
+
+    def preload(self, paths: Iterable[str]) -> None:
+        """
+        预先加载 (解码) 多个音效, 避免第一次播放时卡顿
+        """
+        for path in paths:
+            self.load_sound(path)
+
+    def set_voice_limit(self, path: str, limit: int) -> None:
+        """
+        设置音效`path`的同时播放数量上限
+        """
+        self.__voice_limits[_normalize_path(path)] = limit
+
+    def __prune_voices(self) -> None:
+        """删除已经播放完 (或被别处停止、覆盖) 的声音"""
+        sounds = self.__sounds
+        self.__voices = [
+            voice
+            for voice in self.__voices
+            if voice[0].get_busy() and voice[0].get_sound() is sounds.get(voice[1])
+        ]
+
+    def play(
+        self, path: str, *, loop: int = 0, priority: int = 0
+    ) -> Optional[pygame.mixer.Channel]:
+        """
+        播放音效
+
+        Parameters
+        ---
+        path : str
+            音效路径
+        loop : int, default = 0
+            循环次数, `-1`为无限循环
+        priority : int, default = 0
+            优先级, 越大越优先。没有空闲通道时只能抢占优先级不高于它的声音
+
+        Returns
+        ---
+        Optional[pygame.mixer.Channel]
+            播放所用的通道, 没有播放时为`None`
+        """
+        if not self.__channels_ready:
+            pygame.mixer.set_num_channels(max(self.num_channels, MUSIC_CHANNELS + 1))
+            _reserve_music_channels()
+            self.__channels_ready = True
+        sound = self.load_sound(path)
+        path = _normalize_path(path)
+        self.__prune_voices()
+        voices = self.__voices
+
+        channel = None
+        same = [voice for voice in voices if voice[1] == path]
+        if len(same) >= self.__voice_limits.get(path, self.default_voice_limit):
+            channel = same[0][0]  # 达到上限, 替换同一音效中最早开始的
+            voices.remove(same[0])
+        if channel is None:
+            channel = pygame.mixer.find_channel()
+        if channel is None:
+            victim = next((voice for voice in voices if voice[2] <= priority), None)
+            if victim is None:
+                self.stats["drops"] += 1
+                return None
+            channel = victim[0]
+            voices.remove(victim)
+            self.stats["steals"] += 1
+
+        channel.play(sound, loops=loop)
+        voices.append((channel, path, priority))
+        self.stats["plays"] += 1
+        return channel
+
+    def stop(self) -> None:
+        """
+        停止所有音效
+        """
+        pygame.mixer.stop()
+        self.__voices.clear()
+
+
+class MusicManager:
+    """
+    背景音乐管理器: 预加载下一首音乐, 不阻塞主循环地淡出/淡入切换
+
+    Attributes
+    ---
+    streamer : AssetStreamer
+        读取音乐文件所用的后台资源加载器
+    current : Optional[str]
+        正在播放 (或正在淡出) 的音乐, 没有时为`None`
+    pending : Optional[str]
+        等待开始播放的音乐 (还没有加载完成, 或在等待旧的音乐淡出), 没有时为`None`
+
+    Methods
+    ---
+    preload(self, path: str, *, as_sound: bool = False) -> AssetHandle
+        在后台预加载音乐
+    play(self, path: str, *, loop: int = -1, fade_ms: int = 0) -> None
+        切换音乐 (不阻塞)
+    stop(self, fade_ms: int = 0) -> None
+        停止音乐
+    update(self) -> None
+        (每帧在主线程中调用) 推进切换
+
+    Notes
+    ---
+    - 音乐默认通过`pygame.mixer.music`从内存中的文件字节流式播放。同一时间只有一个流,
+      因此两首流式播放的音乐之间是先淡出再淡入 (旧的淡出结束后立即开始新的)。
+    - 预加载时`as_sound=True`的音乐 (适合较短的循环) 会被完整解码为`pygame.mixer.Sound`,
+      在两个预留的混音通道上播放, 与其他音乐之间可以真正交叉淡入淡出。
+    """
+
+    # attributes
+    streamer: AssetStreamer
+    __files: Dict[str, AssetHandle]
+    __sounds: Dict[str, pygame.mixer.Sound]
+    __current: Optional[str]
+    __channel: Optional[pygame.mixer.Channel]  # 正在播放的Sound音乐所在的通道
+    __pending: Optional[Tuple[str, int, int]]  # (路径, 循环次数, 淡入时间)
+
+    @property
+    def current(self) -> Optional[str]:
+        """正在播放 (或正在淡出) 的音乐"""
+        return self.__current
+
+    @property
+    def pending(self) -> Optional[str]:
+        """等待开始播放的音乐"""
+        return self.__pending[0] if self.__pending is not None else None
+
+    def __init__(self, streamer: AssetStreamer):
+        """
+        Parameters
+        ---
+        streamer : AssetStreamer
+            读取音乐文件所用的后台资源加载器
+        """
+        self.streamer: AssetStreamer = streamer
+        self.__files: Dict[str, AssetHandle] = {}
+        self.__sounds: Dict[str, pygame.mixer.Sound] = {}
+        self.__current: Optional[str] = None
+        self.__channel: Optional[pygame.mixer.Channel] = None
+        self.__pending: Optional[Tuple[str, int, int]] = None
+
+    def preload(self, path: str, *, as_sound: bool = False) -> AssetHandle:
+        """
+        在后台预加载音乐 (读取文件的全部字节), 比如接近传送门时预加载下一个场景的音乐
+
+        Parameters
+        ---
+        path : str
+            音乐路径
+        as_sound : bool, default = False
+            是否完整解码为`pygame.mixer.Sound` (加载完成后在主线程中解码, 只适合较短的循环)
+
+        Returns
+        ---
+        AssetHandle
+            文件字节的句柄
+        """
+        key = _normalize_path(path)
+        handle = self.__files.get(key)
+        if handle is None or handle.error is not None:
+            handle = self.__files[key] = self.streamer.load_file(path)
+        if as_sound and key not in self.__sounds:
+            handle.add_callback(lambda data: self.__decode_sound(key, data))
+        return handle
+
+    def __decode_sound(self, key: str, data: bytes) -> None:
+        """把预加载的文件字节解码为Sound (已经解码过时什么都不做)"""
+        if key not in self.__sounds:
+            self.__sounds[key] = pygame.mixer.Sound(file=io.BytesIO(data))
+
+    def play(self, path: str, *, loop: int = -1, fade_ms: int = 0) -> None:
+        """
+        切换音乐, 不阻塞: 旧的音乐在`fade_ms`内淡出, 新的音乐加载完成后在`fade_ms`内淡入
+
+        Parameters
+        ---
+        path : str
+            音乐路径 (没有预加载时会先在后台加载)
+        loop : int, default = -1
+            循环次数, `-1`为无限循环
+        fade_ms : int, default = 0
+            淡出/淡入的时间 (毫秒)
+        """
+        key = _normalize_path(path)
+        if key == self.__current and self.__pending is None:
+            return
+        self.preload(path)
+        self.__fade_out_current(fade_ms)
+        self.__pending = (key, loop, fade_ms)
+        self.update()
+
+    def stop(self, fade_ms: int = 0) -> None:
+        """
+        停止音乐 (取消等待中的音乐)
+
+        Parameters
+        ---
+        fade_ms : int, default = 0
+            淡出的时间 (毫秒)
+        """
+        self.__pending = None
+        self.__fade_out_current(fade_ms)
+
+    def __fade_out_current(self, fade_ms: int) -> None:
+        if self.__channel is not None:
+            if fade_ms > 0:
+                self.__channel.fadeout(fade_ms)
+            else:
+                self.__channel.stop()
+            self.__channel = None
+        elif fade_ms > 0:
+            pygame.mixer.music.fadeout(fade_ms)
+        else:
+            pygame.mixer.music.stop()
+
+    def update(self) -> None:
+        """
+        推进切换: 等待中的音乐加载完成 (且流式播放时旧的音乐已经淡出) 后开始播放
+
+        每帧在主线程中调用一次 (在`AssetStreamer.update`之后)。
+        """
+        if self.__pending is None:
+            if self.__channel is None and not pygame.mixer.music.get_busy():
+                self.__current = None
+            return
+        key, loop, fade_ms = self.__pending
+        handle = self.__files[key]
+        if handle.error is not None:
+            self.__pending = None
+            return
+        if not handle.ready:
+            return
+
+        sound = self.__sounds.get(key)
+        if sound is not None:
+            _reserve_music_channels()
+            channel = pygame.mixer.Channel(0)
+            if channel.get_busy():
+                channel = pygame.mixer.Channel(1)
+            channel.play(sound, loops=loop, fade_ms=fade_ms)
+            self.__channel = channel
+        elif pygame.mixer.music.get_busy():
+            return  # 等待旧的音乐淡出
+        else:
+            pygame.mixer.music.load(io.BytesIO(handle.value), key)
+            pygame.mixer.music.play(loops=loop, fade_ms=fade_ms)
+        self.__current = key
+        self.__pending = None
+
+
+class TextCache:
+    """
+    渲染好的文本 (单行) 的缓存, 按`(字体, 文本, 颜色, 抗锯齿)`缓存, 超出数量上限时按LRU淘汰
+
+    Attributes
+    ---
+    max_entries : int
+        最多缓存的Surface数量
+    stats : collections.Counter[str]
+        统计: "hits" (命中), "misses" (未命中, 需要渲染), "evictions" (被淘汰)
+
+    Methods
+    ---
+    render(self, font: pygame.font.Font, text: str, color: ColorValue, antialias: bool = True) -> pygame.Surface
+        渲染单行文本 (有缓存时直接返回)
+    clear(self) -> None
+        清空缓存
+
+    Notes
+    ---
+    返回的Surface被所有使用者共享, **不要在上面绘制**。
+    """
+
+    # attributes
+    __surfaces: "collections.OrderedDict[_TextKey, pygame.Surface]"
+    max_entries: int
+    stats: collections.Counter
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Parameters
+        ---
+        max_entries : int, default = 1024
+            最多缓存的Surface数量
+        """
+        self.max_entries: int = max_entries
+        self.stats: collections.Counter = collections.Counter()
+        self.__surfaces: "collections.OrderedDict[_TextKey, pygame.Surface]" = (
+            collections.OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self.__surfaces)
+
+    @staticmethod
+    def color_key(color: Any) -> Tuple[int, ...]:
+        """把各种形式的颜色 (`ColorValue`) 转换为可以作为键的`(r, g, b, a)`"""
+        return tuple(pygame.Color(color))
+
+    def render(
+        self, font: pygame.font.Font, text: str, color: Any, antialias: bool = True
+    ) -> pygame.Surface:
+        """
+        渲染单行文本 (`font.render(text, antialias, color)`), 有缓存时直接返回缓存的Surface
+
+        Parameters
+        ---
+        font : pygame.font.Font
+            字体 (按对象区分)
+        text : str
+            单行文本
+        color : ColorValue
+            颜色
+        antialias : bool, default = True
+            是否抗锯齿
+
+        Returns
+        ---
+        pygame.Surface
+            共享的Surface, 不要在上面绘制
+        """
+        key = (font, text, self.color_key(color), antialias)
+        surfaces = self.__surfaces
+        surface = surfaces.get(key)
+        if surface is not None:
+            self.stats["hits"] += 1
+            surfaces.move_to_end(key)
+            return surface
+
+        self.stats["misses"] += 1
+        surface = surfaces[key] = font.render(text, antialias, key[2])
+        while len(surfaces) > self.max_entries:
+            surfaces.popitem(last=False)
+            self.stats["evictions"] += 1
+        return surface
+
+    def clear(self) -> None:
+        """
+        清空缓存 (不重置`stats`)
+        """
+        self.__surfaces.clear()
+
+
+class FontRegistry:
+    """
+    字体注册表: 只查找一次支持中文的字体, 按`(字号, 加粗, 斜体)`缓存Font对象
+
+    Attributes
+    ---
+    candidates : tuple[str, ...]
+        中文字体的查找顺序 (`pygame.font.get_fonts`中的名称)
+    cache_path : Optional[str]
+        记录查找结果 (字体文件路径) 的磁盘缓存文件, `None`为不使用。之后启动时不需要再扫描系统字体
+    font_path : Optional[str]
+        找到的中文字体文件路径, 没有找到时为`None` (使用pygame默认字体)
+
+    Methods
+    ---
+    get_font(self, size: int, *, bold: bool = False, italic: bool = False) -> pygame.font.Font
+        获取支持中文的字体 (有缓存时直接返回)
+    clear(self) -> None
+        清空缓存, 下一次获取字体时重新查找
+
+    Notes
+    ---
+    - 返回的Font被所有使用者共享, 不要修改它的属性 (比如`bold`, `underline`), 需要时请用`get_font`的参数。
+    - 磁盘缓存中的字体文件不存在, 或`candidates`变化时, 重新扫描系统字体。没有找到中文字体时不写入缓存。
+    """
+
+    # attributes
+    __fonts: Dict[Tuple[int, bool, bool], pygame.font.Font]
+    __font_path: Optional[str]
+    __resolved: bool
+    candidates: Tuple[str, ...]
+    cache_path: Optional[str]
+
+    @property
+    def font_path(self) -> Optional[str]:
+        """找到的中文字体文件路径"""
+        if not self.__resolved:
+            self.__resolve()
+        return self.__font_path
+
+    def __init__(
+        self,
+        candidates: Iterable[str] = ("microsoftyahei", "simhei", "notosanscjk"),
+        cache_path: Optional[str] = None,
+    ):
+        """
+        Parameters
+        ---
+        candidates : Iterable[str], default = ("microsoftyahei", "simhei", "notosanscjk")
+            中文字体的查找顺序
+        cache_path : Optional[str], default = None
+            磁盘缓存文件, `None`为不使用
+        """
+        self.candidates: Tuple[str, ...] = tuple(candidates)
+        self.cache_path: Optional[str] = cache_path
+        self.__fonts: Dict[Tuple[int, bool, bool], pygame.font.Font] = {}
+        self.__font_path: Optional[str] = None
+        self.__resolved: bool = False
+
+    def __resolve(self) -> None:
+        """查找中文字体: 先读磁盘缓存, 没有时扫描系统字体 (`pygame.font.get_fonts`)"""
+        self.__resolved = True
+        cache_path = self.cache_path
+        if cache_path is not None:
+            cache_path = _normalize_path(cache_path)
+        if cache_path is not None and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    cache = json.load(f)
+                if cache["candidates"] == list(self.candidates) and os.path.exists(
+                    cache["font_path"]
+                ):
+                    self.__font_path = cache["font_path"]
+                    return
+            except (OSError, ValueError, KeyError, TypeError):
+                logger.warning(f"Invalid font cache {cache_path}, ignored.")
+
+        available_fonts = pygame.font.get_fonts()
+        self.__font_path = next(
+            (
+                pygame.font.match_font(name)
+                for name in self.candidates
+                if name in available_fonts
+            ),
+            None,
+        )
+        if self.__font_path is None:
+            logger.info("No CJK font found, use the pygame default font.")
+            return
+        logger.info(f"Resolve CJK font {self.__font_path}.")
+        if cache_path is not None:
+            try:  # 缓存只是加速, 写入失败 (只读目录, 磁盘已满等) 不影响使用
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                with open(cache_path, "w", encoding="utf-8") as f:
+                    json.dump(
+                        {
+                            "candidates": list(self.candidates),
+                            "font_path": self.__font_path,
+                        },
+                        f,
+                        ensure_ascii=False,
+                    )
+            except OSError as e:
+                logger.warning(f"Cannot write font cache {cache_path}: {e}")
+
+    def get_font(
+        self, size: int, *, bold: bool = False, italic: bool = False
+    ) -> pygame.font.Font:
+        """
+        获取支持中文的字体, 如果系统中没有找到支持的字体, 则返回pygame默认字体。有缓存时直接返回
+
+        Parameters
+        ---
+        size : int
+            字号
+        bold : bool, default = False
+            加粗 (仅当在系统中找到支持中文字体时生效)
+        italic : bool, default = False
+            斜体 (仅当在系统中找到支持中文字体时生效)
+
+        Returns
+        ---
+        pygame.font.Font
+            共享的字体, 不要修改它的属性
+        """
+        key = (size, bold, italic)
+        font = self.__fonts.get(key)
+        if font is None:
+            font_path = self.font_path
+            font = pygame.font.Font(font_path, size)
+            if font_path is not None:
+                font.bold = bold
+                font.italic = italic
+            self.__fonts[key] = font
+        return font
+
+    def clear(self) -> None:
+        """
+        清空缓存, 下一次获取字体时重新查找 (不删除磁盘缓存)
+        """
+        self.__fonts.clear()
+        self.__font_path = None
+        self.__resolved = False
+
+
+def _reserve_music_channels() -> None:
+    """预留前`MUSIC_CHANNELS`个混音通道给背景音乐 (`pygame.mixer.find_channel`不会返回它们)"""
+    if pygame.mixer.get_num_channels() < MUSIC_CHANNELS:
+        pygame.mixer.set_num_channels(MUSIC_CHANNELS)
+    pygame.mixer.set_reserved(MUSIC_CHANNELS)
+
+
+def _decode_image(path: str) -> Tuple[bytes, Tuple[int, int]]:
+    """(后台线程) 读取并解码图像为RGBA字节"""
+    with open(path, "rb") as f:
+        image = pygame.image.load(io.BytesIO(f.read()), path)
+    return pygame.image.tobytes(image, "RGBA"), image.get_size()
+
+
+def _read_file(path: str) -> bytes:
+    """(后台线程) 读取文件的全部字节"""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+_placeholder_images: Dict[Tuple[int, int], pygame.Surface] = {}
+
+
+def get_placeholder_image(size: Tuple[int, int]) -> pygame.Surface:
+    """
+    获取`size`大小的完全透明图像, 同一大小只创建一次 (共享)
+
+    Returns
+    ---
+    pygame.Surface
+        共享的透明图像, 不要在上面绘制
+    """
+    image = _placeholder_images.get(size)
+    if image is None:
+        image = _placeholder_images[size] = pygame.Surface(size, pygame.SRCALPHA)
+    return image
+
+
+def _normalize_path(path: str) -> str:
+    """规范化路径: `\\`与`/`视为相同, 转为绝对路径"""
+    return os.path.normcase(os.path.abspath(path.replace("\\", "/")))
+
+
+def _shelf_pack(
+    sizes: List[Tuple[int, int]], max_size: int, padding: int
+) -> Tuple[List[Tuple[int, int, int]], List[Tuple[int, int]]]:
+    """
+    货架法 (shelf packing) 排布矩形
+
+    按高度从大到小逐行放置, 一行放满换行, 一页放满换页。
+
+    Returns
+    ---
+    tuple[list[tuple[int, int, int]], list[tuple[int, int]]]
+        每个矩形的`(页号, x, y)`, 与每一页实际用到的大小
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    places: List[Tuple[int, int, int]] = [(0, 0, 0)] * len(sizes)
+    pages: List[Tuple[int, int]] = []
+    x = y = shelf_height = used_width = 0
+    for i in order:
+        w, h = sizes[i]
+        if w + padding > max_size or h + padding > max_size:
+            raise ValueError(f"Image of size {(w, h)} does not fit in {max_size}.")
+        if not pages:
+            pages.append((0, 0))
+        if x + w + padding > max_size:  # 换行
+            x, y, shelf_height = 0, y + shelf_height, 0
+        if y + h + padding > max_size:  # 换页
+            pages.append((0, 0))
+            x = y = shelf_height = used_width = 0
+        places[i] = (len(pages) - 1, x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h + padding)
+        used_width = max(used_width, x)
+        pages[-1] = (used_width, y + shelf_height)
+    return places, pages
+
+
+def pack_atlas(
+    paths: Iterable[str],
+    out_dir: str,
+    root: str = ".",
+    name: str = "atlas",
+    max_size: int = 1024,
+    padding: int = 1,
+    sizes: Optional[Dict[str, List[Tuple[int, int]]]] = None,
+) -> str:
+    """
+    把多张图像打包为图集 (离线步骤)
+
+    生成`{name}_0.png`, `{name}_1.png`, ...若干页与索引文件`{name}.json`。
+
+    Parameters
+    ---
+    paths : Iterable[str]
+        要打包的图像路径
+    out_dir : str
+        输出目录
+    root : str, default = "."
+        索引中记录相对于`root`的路径
+    name : str, default = "atlas"
+        图集名称 (文件名前缀)
+    max_size : int, default = 1024
+        每页的最大边长
+    padding : int, default = 1
+        图像之间的间隔 (像素), 避免缩放时采样到相邻图像
+    sizes : Optional[dict[str, list[tuple[int, int]]]], default = None
+        额外打包的缩放后的大小 (用`pygame.transform.scale`缩放), 键为图像路径。
+        游戏中图像大多按固定大小缩放后使用, 打包缩放后的版本才能让这些图像也来自图集
+
+    Returns
+    ---
+    str
+        索引文件的路径
+    """
+    paths = sorted({_normalize_path(path) for path in paths})
+    sizes = {
+        _normalize_path(path): size_list for path, size_list in (sizes or {}).items()
+    }
+    sources = {path: pygame.image.load(path) for path in paths}
+    items: List[Tuple[str, Optional[Tuple[int, int]], pygame.Surface]] = []
+    for path, source in sources.items():
+        items.append((path, None, source))
+        for size in sizes.get(path, ()):
+            items.append((path, tuple(size), pygame.transform.scale(source, size)))
+    places, page_sizes = _shelf_pack(
+        [image.get_size() for _, _, image in items], max_size, padding
+    )
+
+    os.makedirs(out_dir, exist_ok=True)
+    pages = [pygame.Surface(size, pygame.SRCALPHA, 32) for size in page_sizes]
+    for page in pages:
+        page.fill((0, 0, 0, 0))
+    index = {
+        "version": ATLAS_VERSION,
+        "root": os.path.relpath(os.path.abspath(root), os.path.abspath(out_dir)),
+        "pages": [f"{name}_{i}.png" for i in range(len(pages))],
+        "sprites": {},
+    }
+    for (path, size, image), (page, x, y) in zip(items, places):
+        pages[page].blit(image, (x, y))
+        rel_path = os.path.relpath(path, os.path.abspath(root)).replace("\\", "/")
+        rect = [x, y, *image.get_size()]
+        if size is not None:  # 原始大小的条目先加入 (见`items`的顺序)
+            index["sprites"][rel_path]["scaled"].append({"page": page, "rect": rect})
+            continue
+        stat = os.stat(path)
+        index["sprites"][rel_path] = {
+            "page": page,
+            "rect": rect,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "scaled": [],
+        }
+    for page, file_name in zip(pages, index["pages"]):
+        pygame.image.save(page, os.path.join(out_dir, file_name))
+
+    index_path = os.path.join(out_dir, f"{name}.json")
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    logger.info(
+        f"Pack {len(paths)} images ({len(items)} sprites) into {len(pages)} pages: {index_path}"
+    )
+    return index_path
+
+
+def _file_sha1(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _check_bundle_entry(path: str, entry: dict) -> Optional[bool]:
+    """
+    检查资源包中的条目是否过期
+
+    Returns
+    ---
+    Optional[bool]
+        `True`: 没有变化; `False`: 内容 (SHA-1) 没有变化, 但大小或修改时间变了, 已经更新`entry`中记录的值;
+        `None`: 过期 (源文件被删除, 或内容的SHA-1不同)
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if (stat.st_size, stat.st_mtime_ns) == (entry["file_size"], entry["mtime_ns"]):
+        return True
+    if _file_sha1(path) != entry["sha1"]:
+        return None
+    entry["file_size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+    return False
+
+
+def _rewrite_bundle_index(bundle_path: str, index: dict) -> bool:
+    """
+    原地重写资源包的索引头 (像素块不动)
+
+    Returns
+    ---
+    bool
+        新的索引超出原有的头部空间 (第一个像素块之前) 时返回`False`; 写入失败只记录警告
+    """
+    index_bytes = json.dumps(index, ensure_ascii=False).encode("utf-8")
+    header_length = min((entry["offset"] for entry in index["entries"]), default=0)
+    if _BUNDLE_HEADER.size + len(index_bytes) > header_length:
+        return False
+    padding = header_length - _BUNDLE_HEADER.size - len(index_bytes)
+    try:
+        with open(bundle_path, "r+b") as f:
+            f.write(_BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(index_bytes)))
+            f.write(index_bytes)
+            f.write(bytes(padding))
+    except OSError as e:
+        logger.warning(f"Fail to update bundle index {bundle_path}: {e!r}")
+    return True
+
+
+def _read_bundle_index(bundle_path: str) -> Optional[dict]:
+    """读取资源包的索引头, 文件不存在或格式不对时返回`None`"""
+    try:
+        with open(bundle_path, "rb") as f:
+            magic, version, index_length = _BUNDLE_HEADER.unpack(
+                f.read(_BUNDLE_HEADER.size)
+            )
+            if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+                return None
+            return json.loads(f.read(index_length).decode("utf-8"))
+    except (OSError, struct.error, ValueError):
+        return None
+
+
+def build_bundle(
+    paths: Iterable[str],
+    bundle_path: str,
+    root: str = ".",
+    sizes: Optional[Dict[str, List[Tuple[int, int]]]] = None,
+) -> int:
+    """
+    把多张图像预先解码为资源包 (离线步骤, 也会在源文件被修改后由`AssetManager.load_bundle`自动调用)
+
+    资源包的格式: 头部`(魔数, 版本, 索引长度)`, JSON索引, 之后是按16字节对齐的原始RGBA像素块。
+
+    Parameters
+    ---
+    paths : Iterable[str]
+        要打包的图像路径, 每张图像都会以原始大小打包
+    bundle_path : str
+        资源包路径
+    root : str, default = "."
+        索引中记录相对于`root`的路径
+    sizes : Optional[dict[str, list[tuple[int, int]]]], default = None
+        额外打包的缩放后的大小 (用`pygame.transform.scale`缩放), 键为图像路径
+
+    Returns
+    ---
+    int
+        资源包中的图像数量 (包括缩放后的)
+
+    Notes
+    ---
+    先写入临时文件再替换。替换前需要先释放旧资源包的内存映射 (Windows不能替换被映射的文件),
+    `AssetManager.load_bundle`重新生成时会先释放自己的映射。
+    """
+    sizes = {
+        _normalize_path(path): size_list for path, size_list in (sizes or {}).items()
+    }
+    bundle_dir = os.path.dirname(os.path.abspath(bundle_path))
+    abs_root = os.path.abspath(root)
+    entries = []
+    blocks = []
+    for path in sorted({_normalize_path(path) for path in paths}):
+        with open(path, "rb") as f:
+            data = f.read()
+        stat = os.stat(path)
+        source = pygame.image.load(io.BytesIO(data), path)
+        for size in [None, *sizes.get(path, ())]:
+            image = source if size is None else pygame.transform.scale(source, size)
+            pixels = pygame.image.tobytes(image, "RGBA")
+            entries.append(
+                {
+                    "path": os.path.relpath(path, abs_root).replace("\\", "/"),
+                    "size": list(size) if size is not None else None,
+                    "shape": list(image.get_size()),
+                    "offset": 0,  # 写入前再计算
+                    "sha1": hashlib.sha1(data).hexdigest(),
+                    "file_size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                }
+            )
+            blocks.append(pixels + bytes(-len(pixels) % _BUNDLE_ALIGN))
+
+    # 像素块的偏移相对于文件开头, 因此要先知道头部的长度
+    index = {"root": os.path.relpath(abs_root, bundle_dir), "entries": entries}
+    header_length = 0
+    while True:
+        for entry, block_offset in zip(entries, _block_offsets(blocks, header_length)):
+            entry["offset"] = block_offset
+        index_bytes = json.dumps(index, ensure_ascii=False).encode("utf-8")
+        length = _BUNDLE_HEADER.size + len(index_bytes) + _BUNDLE_INDEX_SLACK
+        length += -length % _BUNDLE_ALIGN
+        if length == header_length:
+            break
+        header_length = length
+
+    os.makedirs(bundle_dir, exist_ok=True)
+    temp_path = f"{bundle_path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        f.write(bytes(header_length - _BUNDLE_HEADER.size - len(index_bytes)))
+        for block in blocks:
+            f.write(block)
+    os.replace(temp_path, bundle_path)
+    logger.info(f"Build bundle {bundle_path}: {len(entries)} images.")
+    return len(entries)
+
+
+def _block_offsets(blocks: List[bytes], start: int) -> Iterable[int]:
+    for block in blocks:
+        yield start
+        start += len(block)
+
+
+default_assets: AssetManager = AssetManager()
+default_streamer: AssetStreamer = AssetStreamer(default_assets)
+default_sounds: SoundManager = SoundManager()
+default_music: MusicManager = MusicManager(default_streamer)
+default_text_cache: TextCache = TextCache()
+default_fonts: FontRegistry = FontRegistry()
+
+
+def update() -> None:
+    """
+    推进默认的后台资源加载器与背景音乐管理器, 每帧在主线程中调用一次
+    """
+    default_streamer.update()
+    default_music.update()
@@ -1,9 +1,27 @@
-from .collections import EventLike, ListenerLike, GroupLike, Core, PostEventApiLike
-from .tools import listening, find_listening_methods
+from .collections import (
+    EventLike,
+    PygameEventLike,
+    ListenerLike,
+    GroupLike,
+    Core,
+    PostEventApiLike,
+)
+from .tools import (
+    listening,
+    find_listening_methods,
+    get_listening_table,
+    FrameRecycler,
+    SortedDefaultDict,
+)
 from .constants import (
     get_unused_event_code,
     EVERYONE_RECEIVER,
+    EVERYONE_RECEIVERS,
     EventCode,
+    OverflowPolicy,
+    CoalescePolicy,
+    EventBody,
     StepEventBody,
     DrawEventBody,
+    KillEventBody,
 )
@@ -5,6 +5,8 @@ Classes
 ---
 EventLike
     事件
+PygameEventLike
+    包装pygame事件的事件 (按需读取pygame事件的属性)
 ListenerLike
     监听器
 GroupLike
@@ -19,7 +21,8 @@ Notes
 
 import typing as _typing
 import sys as _sys
-import types as _types
+import time as _time
+import collections as _collections
 
 import pygame as _pygame
 
@@ -37,12 +40,12 @@ class EventLike:
         事件代码
     sender: typing.Optional[str]
         发送者 (UUID)
-    receivers: typing.Set[str]
-        接收者 (UUID集合)
+    receivers: typing.AbstractSet[str]
+        接收者 (UUID集合)。默认是共享的`EVERYONE_RECEIVERS`, 不可原地修改
     prior: int
         优先级 (越小优先级越高)
-    body: typing.Dict[str, typing.Any]
-        事件附加信息
+    body: typing.MutableMapping[str, typing.Any]
+        事件附加信息, 一般是`EventBody`的子类实例 (兼容`body["..."]`写法), 也可以是字典
 
     Attribute `prior`
     ---
@@ -52,14 +55,20 @@ class EventLike:
         STEP事件优先级
     300
         DRAW事件优先级
+
+    Notes
+    ---
+    - 使用`__slots__`储存属性, 实例没有`__dict__`, 不能添加额外属性 (子类不受影响)。
     """
 
+    __slots__ = ("code", "prior", "sender", "receivers", "body", "__weakref__")
+
     # Attributes
     code: int
     sender: str
-    receivers: _typing.Set[str]
+    receivers: _typing.AbstractSet[str]
     prior: int
-    body: _typing.Dict[str, _typing.Any]
+    body: _typing.MutableMapping[str, _typing.Any]
 
     # pygame键盘事件会带有一个key属性, 代表被按下的按键
     key: _typing.Union[int, _typing.Any]
@@ -68,16 +77,14 @@ class EventLike:
     def from_pygame_event(cls, event: _pygame.event.Event) -> "EventLike":
         """
         pygame.event.Event转换为EventLike
-        (会使用object.__dict__继承pygame事件的全部属性)
+        (返回包装pygame事件的`PygameEventLike`, 不复制pygame事件的属性)
 
         Parameters
         ---
-        event : pygame.event.
+        event : pygame.event.Event
             pygame事件
         """
-        ins = cls(event.type, sender="pygame", prior=100)  # 创建EventLike实例
-        ins.__dict__.update(event.__dict__)  # 继承属性
-        return ins
+        return PygameEventLike(event)
 
     @classmethod
     def step_event(cls, second: float) -> "EventLike":
@@ -89,7 +96,7 @@ class EventLike:
         second : float
             距离上次广播STEP事件经过的时间
         """
-        body: _const.StepEventBody = {"second": second}
+        body = _const.StepEventBody(second)
         return cls(_const.EventCode.STEP, body=body, prior=200)
 
     @classmethod
@@ -102,7 +109,7 @@ class EventLike:
         uuid : str
             被删除监听者的UUID
         """
-        body: _const.KillEventBody = {"suicide": uuid}
+        body = _const.KillEventBody(uuid)
         return cls(_const.EventCode.KILL, body=body, sender=uuid, prior=0)
 
     @classmethod
@@ -110,7 +117,7 @@ class EventLike:
         cls,
         surface: _pygame.Surface,
         *,
-        receivers: _typing.Set[str] = None,
+        receivers: _typing.AbstractSet[str] = None,
         offset: _typing.Tuple[int, int] = (0, 0),
     ):
         """
@@ -120,12 +127,12 @@ class EventLike:
         ---
         surface : pygame.Surface
             一般是pygame.display.set_mode(...)返回的Surface对象, 占满整个窗口的画布
-        receivers : set[str], typing.Optional, default = {EVERYONE_RECEIVER}
+        receivers : set[str], typing.Optional, default = EVERYONE_RECEIVERS
             事件接收者, 默认是任何Listener
         offset : tuple[int, int], default = (0, 0)
             绘制偏移量
         """
-        body = {"surface": surface, "offset": offset}
+        body = _const.DrawEventBody(surface, offset)
         return cls(_const.EventCode.DRAW, body=body, prior=300, receivers=receivers)
 
     def __init__(
@@ -134,8 +141,8 @@ class EventLike:
         *,
         prior: int = 100,
         sender: str = "",
-        receivers: _typing.Set[str] = None,
-        body: _typing.Optional[_typing.Dict[str, _typing.Any]] = None,
+        receivers: _typing.AbstractSet[str] = None,
+        body: _typing.Optional[_typing.MutableMapping[str, _typing.Any]] = None,
     ) -> None:
         """
         Parameters
@@ -146,23 +153,24 @@ class EventLike:
             优先级 (越小优先级越高)
         sender : str, defualt = ""
             发送者 (UUID)
-        receiver : set[str], default = {EVERYONE_RECEIVER}
-            接收者 (UUID集合)。默认参数会提供一个集合, 添加"任何人"作为其中一个接收者。
-        body : dict[str, typing.Any], default = {}
+        receiver : set[str], default = EVERYONE_RECEIVERS
+            接收者 (UUID集合)。默认使用共享的不可变集合`EVERYONE_RECEIVERS` (只包含"任何人")。
+        body : EventBody | dict[str, typing.Any], default = {}
             事件附加信息
+
+        Notes
+        ---
+        出于性能考虑, 不检查参数类型。
         """
-        assert isinstance(code, int)
-        assert isinstance(prior, int)
-        assert isinstance(sender, str)
-        assert isinstance(receivers, (set, _types.NoneType))
-        assert isinstance(body, (dict, _types.NoneType))
         self.code: int = code
         self.prior: int = prior
         self.sender: str = sender
-        self.receivers: _typing.Set[str] = (
-            receivers if receivers is not None else {_const.EVERYONE_RECEIVER}
+        self.receivers: _typing.AbstractSet[str] = (
+            receivers if receivers is not None else _const.EVERYONE_RECEIVERS
+        )
+        self.body: _typing.MutableMapping[str, _typing.Any] = (
+            body if body is not None else {}
         )
-        self.body: _typing.Dict[str, _typing.Any] = body if body is not None else {}
 
     def __lt__(self, other: "EventLike") -> bool:
         """
@@ -175,6 +183,135 @@ class EventLike:
         return self.prior < other.prior
 
 
+class PygameEventLike(EventLike):
+    """
+    包装pygame事件的事件, 由`EventLike.from_pygame_event`创建
+
+    Attributes
+    ---
+    event : pygame.event.Event
+        被包装的pygame事件
+    code : int
+        事件代码, 即`event.type`
+    sender : str
+        发送者, 固定为"pygame"
+    receivers : typing.AbstractSet[str]
+        接收者, 固定为共享的`EVERYONE_RECEIVERS`
+    prior : int
+        优先级, 固定为100
+    body : dict[str, typing.Any]
+        pygame事件的属性字典 (与`event.__dict__`是同一个对象, 不是副本)
+
+    Notes
+    ---
+    - 其他属性 (比如`key`, `pos`, `w`, `h`) 在读取时才从`event`上获取, 创建时不复制任何属性。
+    - 与`EventLike`相同, 使用`__slots__`, 不能添加额外属性。
+    """
+
+    __slots__ = ("event",)
+
+    # Attributes
+    event: _pygame.event.Event
+
+    def __init__(self, event: _pygame.event.Event) -> None:
+        """
+        Parameters
+        ---
+        event : pygame.event.Event
+            被包装的pygame事件
+        """
+        self.event: _pygame.event.Event = event
+        self.code: int = event.type
+        self.prior: int = 100
+        self.sender: str = "pygame"
+        self.receivers: _typing.AbstractSet[str] = _const.EVERYONE_RECEIVERS
+        self.body: _typing.MutableMapping[str, _typing.Any] = event.__dict__
+
+    def __getattr__(self, name: str) -> _typing.Any:
+        """
+        读取不存在的属性时调用, 从被包装的pygame事件上获取 (比如`key`, `pos`)
+        """
+        if name == "event":  # 未初始化 (比如复制时), 避免无限递归
+            raise AttributeError(name)
+        return getattr(self.event, name)
+
+
+def _is_same_event(a: EventLike, b: EventLike) -> bool:
+    """
+    判断两个事件的代码, 优先级, 发送者, 接收者, body是否都相同
+
+    包装pygame事件的`PygameEventLike`直接比较被包装的pygame事件 (类型与全部属性),
+    不依赖`body`是否与pygame事件的属性同步。
+    """
+    a_is_pygame = isinstance(a, PygameEventLike)
+    if a_is_pygame or isinstance(b, PygameEventLike):
+        return a_is_pygame and isinstance(b, PygameEventLike) and a.event == b.event
+    return (
+        a.code == b.code
+        and a.prior == b.prior
+        and a.sender == b.sender
+        and a.receivers == b.receivers
+        and a.body == b.body
+    )
+
+
+# `Core`每帧回收 (重复使用同一个对象) 的事件代码, 它们不能被顺延到下一帧
+_RECYCLED_EVENT_CODES: _typing.FrozenSet[int] = frozenset(
+    {_const.EventCode.STEP, _const.EventCode.DRAW}
+)
+
+# 窗口与系统事件类型, 默认不会被`Core`的事件过滤屏蔽 (没有人监听也需要交给pygame/SDL处理)
+_SYSTEM_EVENT_TYPES: _typing.FrozenSet[int] = frozenset(
+    getattr(_pygame, name)
+    for name in (
+        "QUIT",
+        "ACTIVEEVENT",
+        "VIDEORESIZE",
+        "VIDEOEXPOSE",
+        "WINDOWEVENT",
+        "WINDOWSHOWN",
+        "WINDOWHIDDEN",
+        "WINDOWEXPOSED",
+        "WINDOWMOVED",
+        "WINDOWRESIZED",
+        "WINDOWSIZECHANGED",
+        "WINDOWMINIMIZED",
+        "WINDOWMAXIMIZED",
+        "WINDOWRESTORED",
+        "WINDOWENTER",
+        "WINDOWLEAVE",
+        "WINDOWFOCUSGAINED",
+        "WINDOWFOCUSLOST",
+        "WINDOWCLOSE",
+        "WINDOWTAKEFOCUS",
+        "WINDOWHITTEST",
+        "WINDOWICCPROFCHANGED",
+        "WINDOWDISPLAYCHANGED",
+        "TEXTINPUT",
+        "TEXTEDITING",
+        "AUDIODEVICEADDED",
+        "AUDIODEVICEREMOVED",
+        "APP_TERMINATING",
+        "APP_LOWMEMORY",
+        "APP_WILLENTERBACKGROUND",
+        "APP_DIDENTERBACKGROUND",
+        "APP_WILLENTERFOREGROUND",
+        "APP_DIDENTERFOREGROUND",
+        "RENDER_TARGETS_RESET",
+        "RENDER_DEVICE_RESET",
+        "LOCALECHANGED",
+        "SYSWMEVENT",
+        "CLIPBOARDUPDATE",
+    )
+    if hasattr(_pygame, name)
+)
+
+_core_instance: _typing.Optional["Core"] = None  # `Core`单例, 供静态方法`Core.flip`使用
+
+# 群组成员变化的次数, `Core`据此判断是否需要重新计算事件过滤
+_listen_codes_version: int = 0
+
+
 PostEventApiLike: _typing.TypeAlias = _typing.Callable[
     [EventLike], None
 ]  # 事件发布函数类型注释, 一般使用`Core`的`add_event`函数
@@ -240,7 +377,8 @@ class ListenerLike:
     find_listening_methods(object: object) -> dict[int, set[typing.Callable[[EventLike], None]]]
         找到所有被listening标记的函数, 并根据事件代码分类, 储存到一个字典中
 
-    在ListenerLike中, `self.__listen_methods`会通过`find_listening_methods`初始化。
+    在ListenerLike中, 每个子类被创建时都会通过`get_listening_table`计算一次方法名表。
+    `self.__listen_methods`在第一次调用`listen`时才根据方法名表绑定到实例上。
     调用`listen`函数处理事件时, 会根据`self.__listen_methods`将事件发配到能处理该事件的函数中。
     > 注意: listen发配事件是没有顺序的
 
@@ -279,12 +417,20 @@ class ListenerLike:
     """
 
     # Attributes
+    __uuid: str
     __post_api: _typing.Optional[PostEventApiLike]
     __listen_receivers: _typing.Set[str]
-    __listen_methods: _typing.Dict[
-        int, _typing.Set[_typing.Callable[[EventLike], None]]
+    __listen_methods: _typing.Optional[
+        _typing.Dict[int, _typing.Set[_typing.Callable[[EventLike], None]]]
     ]
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        """
+        子类创建时, 预先计算被`listening`装饰过的方法名表
+        """
+        super().__init_subclass__(**kwargs)
+        _tools.get_listening_table(cls)
+
     @property
     def listen_receivers(self) -> _typing.Set[str]:
         """监听的接收者集合"""
@@ -303,7 +449,7 @@ class ListenerLike:
         ---
         本属性不可修改
         """
-        return set(self.__listen_methods)
+        return set(_tools.get_listening_table(type(self)))
 
     @listen_codes.setter
     def listen_codes(self, listen_codes: _typing.Set[int]):
@@ -318,9 +464,9 @@ class ListenerLike:
         self.__post_api = post_api
 
     @property
-    def uuid(self) -> int:
+    def uuid(self) -> str:
         """监听者的UUID"""
-        return str(id(self))
+        return self.__uuid
 
     def __init__(
         self,
@@ -336,15 +482,16 @@ class ListenerLike:
         listen_receivers : set[str], optional, default = {EVERYONE_RECEIVER, self.uuid}
             监听的接收者集合, 自动加上EVERYONE_RECEIVER与self.uuid
         """
+        self.__uuid: str = str(id(self))
         self.__post_api: _typing.Optional[PostEventApiLike] = post_api
         self.__listen_receivers = (
             listen_receivers | {_const.EVERYONE_RECEIVER, self.uuid}
             if listen_receivers is not None
             else {_const.EVERYONE_RECEIVER, self.uuid}
         )
-        self.__listen_methods: _typing.Dict[
-            int, _typing.Set[_typing.Callable[[EventLike], None]]
-        ] = _tools.find_listening_methods(self)
+        self.__listen_methods: _typing.Optional[
+            _typing.Dict[int, _typing.Set[_typing.Callable[[EventLike], None]]]
+        ] = None  # 第一次调用`listen`时绑定
 
     def post(self, event: EventLike) -> None:
         """
@@ -377,10 +524,13 @@ class ListenerLike:
         event : EventLike
             需要处理的事件
         """
-        listen_receivers = self.__listen_receivers
-        if not event.receivers & listen_receivers:
+        if self.__listen_receivers.isdisjoint(event.receivers):  # 不创建新集合
             return
         listen_code_methods = self.__listen_methods
+        if listen_code_methods is None:
+            listen_code_methods = self.__listen_methods = _tools.find_listening_methods(
+                self
+            )
         if not event.code in listen_code_methods:
             return
         for method_ in listen_code_methods[event.code]:
@@ -520,8 +670,12 @@ class GroupLike(ListenerLike):
         ---
         event : EventLike
             需要处理的事件
+
+        Notes
+        ---
+        成员按加入群组的顺序处理事件。分发列表按`(code, receiver)`缓存, 成员变动时只有相关的列表会失效。
         """
-        for ls in self.get_listener({event.code}, event.receivers):
+        for ls in self.__listeners.get_ordered(event.code, event.receivers):
             ls.listen(event)
 
     def get_listener(
@@ -554,7 +708,9 @@ class GroupLike(ListenerLike):
         listener : ListenerLike
             新增的ListenerLike
         """
+        global _listen_codes_version
         self.__listeners.add(listener)
+        _listen_codes_version += 1
 
     def remove_listener(self, listener: ListenerLike) -> None:
         """
@@ -565,13 +721,17 @@ class GroupLike(ListenerLike):
         listener : ListenerLike
             移除的ListenerLike
         """
+        global _listen_codes_version
         self.__listeners.remove(listener)
+        _listen_codes_version += 1
 
     def clear_listener(self) -> None:
         """
         清除群组中的全部ListenerLike
         """
+        global _listen_codes_version
         self.__listeners.clear()
+        _listen_codes_version += 1
 
     def listen(self, event: EventLike) -> None:
         """
@@ -616,12 +776,77 @@ class Core:
     Notes
     ---
     - 单例类, 每次初始化都返回相同的实例
+    - 默认注入的STEP和DRAW事件每帧都是同一个对象 (见`tools.FrameRecycler`), 处理函数不应该保存它们。
+      打开`tools.FrameRecycler.check`可以检查是否有处理函数保存了这些事件。
+      因此STEP和DRAW事件总是在本帧处理, 不会因为预算顺延到下一帧 (否则下一帧会修改并再次加入同一个对象)。
 
     Attributes
     ---
     queue_injectors : list[Callable[[Core], None]]
         每次执行`self.yield_events`时, 先执行的函数列表。常用于往事件队列中初始化事件。
         默认有自动添加pygame事件以及STEP和DRAW事件。
+    flip_hooks : list[Callable[[Core], None]]
+        每次执行`Core.flip`时, 输出到屏幕之前执行的函数列表。常用于在一帧的最后绘制覆盖层 (比如DEBUG框)。
+        默认为空。
+    event_budget : Optional[int], default = None
+        每帧最多处理的事件数量, `None`为不限制
+    time_budget_ms : Optional[float], default = None
+        每帧处理事件的时间上限 (ms), `None`为不限制
+    budget_exempt_codes : set[int], default = {STEP, DRAW}
+        不受预算限制的事件代码。超出预算后, 只有这些事件会在本帧处理, 其余事件顺延到下一帧。
+        STEP和DRAW即使被移出该集合也不会被顺延 (见Notes)
+    event_stats : collections.Counter[str]
+        事件队列统计: "carried" (顺延到下一帧), "dropped" (因容量上限被丢弃), "coalesced" (因容量上限被合并)
+    coalesce_policies : dict[int, CoalescePolicy]
+        按事件代码注册的合并策略, 默认`MOUSEMOTION`与`VIDEORESIZE`只保留每帧最后一个
+    coalesced_counts : collections.Counter[int]
+        按事件代码统计, 因`coalesce_policies`被合并 (丢弃) 的事件数量
+    attached_listeners : list[ListenerLike]
+        通过`attach`登记的监听者 (一般是群组或场景), 用于计算pygame事件过滤
+    auto_event_filter : bool, default = True
+        是否根据`attached_listeners`的`listen_codes`自动过滤pygame事件
+    required_event_types : set[int], default = 窗口与系统事件
+        无论是否有监听者, 都不会被过滤的pygame事件类型, 默认包括QUIT, WINDOW*, VIDEORESIZE, VIDEOEXPOSE, ACTIVEEVENT,
+        TEXTINPUT, TEXTEDITING, AUDIODEVICE*, APP_*等窗口与系统事件
+    dirty_rect_mode : bool, default = False
+        脏矩形模式, 见下文
+    background : pygame.Surface | tuple[int, int, int], default = (0, 0, 0)
+        脏矩形模式下, 用于恢复脏区域的背景 (窗口大小的Surface, 或者颜色)
+    dirty_rects : list[pygame.Rect]
+        本帧的脏矩形 (互不重叠, 重叠的脏矩形会被合并)
+    dirty_area : Optional[pygame.Rect]
+        本帧的脏区域 (所有脏矩形的外接矩形), 没有时为None
+
+    Frame Budget
+    ---
+    `event_budget`或`time_budget_ms`被设置后, 一帧内处理的事件超出预算时, 剩下的事件 (除了`budget_exempt_codes`中的事件与STEP, DRAW事件)
+    会按原来的顺序顺延到下一帧, 在下一帧的`queue_injectors`之前重新加入队列。
+    这样事件风暴 (比如事件处理函数不断发布新事件) 只会降低帧率, 而不会卡住窗口。
+    配合`set_queue_cap`限制每个优先级的事件数量, 可以避免顺延的事件无限堆积。
+
+    Coalescing
+    ---
+    `coalesce_policies`中注册了策略的事件代码, 在同一帧内会被合并:
+    pygame事件与通过`add_event`加入的事件使用同样的规则 (pygame事件转换后也通过`add_event`加入):
+    `KEEP_LAST`会替换队列中同代码的事件, `DEDUPE`会丢弃本帧已经加入过的相同事件 (pygame事件比较全部属性)。
+    被合并的事件都计入`coalesced_counts`。
+
+    Event Filtering
+    ---
+    通过`attach`登记群组或场景后, 每帧获取pygame事件前, 会计算所有登记者`listen_codes`的并集 (加上`required_event_types`),
+    并通过`pygame.event.set_blocked`/`set_allowed`屏蔽没有人监听的事件类型, 这些事件不会进入pygame队列, 也不会被转换。
+    并集只在登记者变化 (`attach`/`detach`)、任何群组增删成员或`required_event_types`变化时才重新计算,
+    所以增删成员后过滤会自动更新。没有登记任何监听者时不过滤。
+
+    Dirty Rect Mode
+    ---
+    打开`dirty_rect_mode`后, 每帧只重绘并输出发生变化的区域:
+    1. 绘制前, 通过`mark_dirty`报告变化的区域 (`SceneLike`会自动报告成员的变化), 重叠的矩形会被合并, 不重叠的分别保留;
+    2. 调用`begin_dirty_draw`: 在每个脏矩形内恢复`background`, 并把窗口的裁剪区域设置为脏区域 (外接矩形);
+    3. 正常绘制 (裁剪区域外的绘制会被pygame忽略);
+    4. `flip`调用`pygame.display.update(脏矩形列表)`代替`pygame.display.flip()`, 然后清空脏矩形。
+    脏矩形之间 (外接矩形内) 的像素也可能被重新绘制, 但不会被输出; 它们下次被输出之前一定会先恢复`background`。
+    主循环中不需要 (也不应该) 再用`window.fill`清屏。打开该模式或者改变窗口大小时, 整个窗口都会被标记为脏区域。
     """
 
     # Attributes
@@ -631,25 +856,67 @@ class Core:
     __rate: float
     __clock: _pygame.time.Clock
     __event_queue: _tools.BarrelQueue[EventLike]
+    __step_events: _tools.FrameRecycler[EventLike]
+    __draw_events: _tools.FrameRecycler[EventLike]
+    __carried_events: _typing.List[EventLike]
+    __queue_caps: _typing.Dict[int, _typing.Tuple[int, _const.OverflowPolicy]]
+    __frame_events: _typing.Dict[int, _typing.List[EventLike]]
     queue_injectors: list[_typing.Callable[["Core"], None]]
+    flip_hooks: list[_typing.Callable[["Core"], None]]
+    event_budget: _typing.Optional[int]
+    time_budget_ms: _typing.Optional[float]
+    budget_exempt_codes: _typing.Set[int]
+    event_stats: _collections.Counter
+    coalesce_policies: _typing.Dict[int, _const.CoalescePolicy]
+    coalesced_counts: _collections.Counter
+    __attached_listeners: _typing.Dict[ListenerLike, None]
+    __allowed_event_types: _typing.Optional[_typing.FrozenSet[int]]
+    auto_event_filter: bool
+    required_event_types: _typing.Set[int]
+    __dirty_rect_mode: bool
+    __dirty_rects: _typing.List[_pygame.Rect]
+    __dirty_drawing: bool
+    __next_dirty_rects: _typing.List[_pygame.Rect]
+    background: _typing.Union[_pygame.Surface, _typing.Tuple[int, int, int]]
 
     def __init__(self):
+        global _core_instance
+        _core_instance = self
+
         def GET_PRIOR(event: EventLike) -> int:
             return event.prior
 
         def ADD_PYGAME_EVENTS(core: Core):
+            core.__update_event_filter()
             pygame_events = [
                 EventLike.from_pygame_event(i) for i in _pygame.event.get()
             ]
-            core.__event_queue.extend(pygame_events)
+            if core.coalesce_policies or core.__queue_caps:
+                for event in pygame_events:
+                    core.add_event(event)
+            else:
+                core.__event_queue.extend(pygame_events)
             for event in filter(lambda x: x.code == _pygame.VIDEORESIZE, pygame_events):
                 core.winsize = (event.w, event.h)
 
         def ADD_STEP(core: Core):
-            core.__event_queue.append(core.get_step_event())
+            event = core.__step_events.get()
+            event.body.second = core.tick() / 1000
+            core.__event_queue.append(event)
 
         def ADD_DRAW(core: Core):
-            core.__event_queue.append(EventLike.draw_event(core.window))
+            event = core.__draw_events.get()
+            event.body.surface = core.window
+            event.body.offset = (0, 0)
+            core.__event_queue.append(event)
+
+        self.__dirty_rect_mode: bool = False
+        self.__dirty_rects: _typing.List[_pygame.Rect] = []
+        self.__dirty_drawing: bool = False
+        self.__next_dirty_rects: _typing.List[_pygame.Rect] = []
+        self.background: _typing.Union[
+            _pygame.Surface, _typing.Tuple[int, int, int]
+        ] = (0, 0, 0)
 
         self.winsize: _typing.Tuple[int, int] = (1280, 720)  # width, height
         self.title: str = "The Bizarre Adventure of the Pufferfish"
@@ -658,12 +925,44 @@ class Core:
         self.__event_queue: _tools.BarrelQueue[EventLike] = _tools.BarrelQueue(
             GET_PRIOR
         )
+        self.__step_events: _tools.FrameRecycler[EventLike] = _tools.FrameRecycler(
+            lambda: EventLike.step_event(0), name="Core STEP event"
+        )
+        self.__draw_events: _tools.FrameRecycler[EventLike] = _tools.FrameRecycler(
+            lambda: EventLike.draw_event(self.window), name="Core DRAW event"
+        )
 
         self.queue_injectors: list[_typing.Callable[[Core], None]] = [
             ADD_PYGAME_EVENTS,
             ADD_STEP,
             ADD_DRAW,
         ]
+        self.flip_hooks: list[_typing.Callable[[Core], None]] = []
+
+        self.event_budget: _typing.Optional[int] = None
+        self.time_budget_ms: _typing.Optional[float] = None
+        self.budget_exempt_codes: _typing.Set[int] = {
+            _const.EventCode.STEP,
+            _const.EventCode.DRAW,
+        }
+        self.event_stats: _collections.Counter = _collections.Counter()
+        self.__carried_events: _typing.List[EventLike] = []
+        self.__queue_caps: _typing.Dict[
+            int, _typing.Tuple[int, _const.OverflowPolicy]
+        ] = {}
+        self.coalesce_policies: _typing.Dict[int, _const.CoalescePolicy] = {
+            _pygame.MOUSEMOTION: _const.CoalescePolicy.KEEP_LAST,
+            _pygame.VIDEORESIZE: _const.CoalescePolicy.KEEP_LAST,
+        }
+        self.coalesced_counts: _collections.Counter = _collections.Counter()
+        self.__frame_events: _typing.Dict[int, _typing.List[EventLike]] = {}
+        self.__attached_listeners: _typing.Dict[ListenerLike, None] = {}
+        self.__allowed_event_types: _typing.Optional[_typing.FrozenSet[int]] = None
+        self.__event_filter_key: _typing.Optional[
+            _typing.Tuple[int, _typing.FrozenSet[int]]
+        ] = None
+        self.auto_event_filter: bool = True
+        self.required_event_types: _typing.Set[int] = set(_SYSTEM_EVENT_TYPES)
 
         self.init()
         _pygame.display.set_caption(self.__title)
@@ -693,11 +992,104 @@ class Core:
         Notes
         ---
         `add_pygame_event=True`时, 会捕获`pygame.VIDEORESIZE`事件, 并更新窗口大小
+        设置了`event_budget`或`time_budget_ms`时, 超出预算的事件会顺延到下一帧 (见类注释Frame Budget)
+        """
+        self.__prepare_frame()
+        queue = self.__event_queue
+        if self.event_budget is None and self.time_budget_ms is None:
+            while queue:
+                yield queue.popleft()
+            return
+
+        is_over_budget = self.__get_budget_checker()
+        count = 0
+        while queue and not is_over_budget(count):
+            yield queue.popleft()
+            count += 1
+        for batch in self.__drain_over_budget():
+            yield from batch
+
+    def yield_event_batches(
+        self,
+    ) -> _typing.Generator[_typing.Iterable[EventLike], None, None]:
         """
+        批量生成事件
+
+        与`yield_events`相同, 但每次yield出同一优先级的全部事件 (一个`deque`), 减少Python层面的调用次数。
+
+        Yields
+        ---
+        Iterable[EventLike]
+            同一优先级的事件 (按加入顺序)
+
+        Examples
+        ---
+        ```
+        core = Core()
+        for batch in core.yield_event_batches():
+            for event in batch:
+                deal(event)
+        ```
+
+        Notes
+        ---
+        处理一批事件的过程中新加入的事件, 即使优先级更高, 也会在这一批事件处理完之后才被yield。
+        预算按批检查, 一批事件总是完整地被yield。
+        """
+        self.__prepare_frame()
+        queue = self.__event_queue
+        if self.event_budget is None and self.time_budget_ms is None:
+            while queue:
+                yield queue.drain_bucket()
+            return
+
+        is_over_budget = self.__get_budget_checker()
+        count = 0
+        while queue and not is_over_budget(count):
+            batch = queue.drain_bucket()
+            count += len(batch)
+            yield batch
+        yield from self.__drain_over_budget()
+
+    def __prepare_frame(self) -> None:
+        """将上一帧顺延的事件重新加入队列, 然后执行`queue_injectors`"""
+        if self.__frame_events:
+            self.__frame_events.clear()
+        if self.__carried_events:
+            carried, self.__carried_events = self.__carried_events, []
+            for event in carried:
+                self.add_event(event)
         for inject in self.queue_injectors:
             inject(self)
-        while self.__event_queue:
-            yield self.__event_queue.popleft()
+
+    def __get_budget_checker(self) -> _typing.Callable[[int], bool]:
+        """返回判断本帧是否超出预算的函数, 参数为本帧已处理的事件数量"""
+        event_budget = self.event_budget
+        if self.time_budget_ms is None:
+            return lambda count: count >= event_budget
+
+        deadline = _time.perf_counter() + self.time_budget_ms / 1000
+        if event_budget is None:
+            return lambda count: _time.perf_counter() >= deadline
+        return lambda count: count >= event_budget or _time.perf_counter() >= deadline
+
+    def __drain_over_budget(
+        self,
+    ) -> _typing.Generator[_typing.List[EventLike], None, None]:
+        """超出预算后, 按优先级yield出`budget_exempt_codes`中的事件, 其余事件顺延到下一帧"""
+        queue = self.__event_queue
+        exempt_codes = self.budget_exempt_codes | _RECYCLED_EVENT_CODES
+        carried = self.__carried_events
+        while queue:
+            exempt: _typing.List[EventLike] = []
+            for event in queue.drain_bucket():
+                if event.code in exempt_codes:
+                    exempt.append(event)
+                else:
+                    carried.append(event)
+                    self.event_stats["carried"] += 1
+            if exempt:
+                yield exempt
 
     def add_event(self, event: EventLike) -> None:
         """
@@ -707,19 +1099,197 @@ class Core:
         ---
         event : EventLike
             事件
-        """
+
+        Notes
+        ---
+        如果该事件代码注册了合并策略 (`coalesce_policies`), 会先尝试合并事件。
+        如果该优先级设置了容量上限 (`set_queue_cap`), 并且已经达到上限, 会根据策略丢弃或合并事件
+        """
+        coalesce_policy = self.coalesce_policies.get(event.code)
+        if coalesce_policy is not None and self.__coalesce_event(
+            event, coalesce_policy
+        ):
+            self.coalesced_counts[event.code] += 1
+            return
+        queue_cap = self.__queue_caps.get(event.prior)
+        if (
+            queue_cap is not None
+            and self.__event_queue.count(event.prior) >= queue_cap[0]
+            and not self.__is_cap_exempt(event)
+        ):
+            self.__handle_overflow(event, queue_cap[1])
+            return
         self.__event_queue.append(event)
 
+    def __is_cap_exempt(self, event: EventLike) -> bool:
+        """每帧必须处理的事件 (STEP, DRAW与`budget_exempt_codes`) 不会因为容量上限被丢弃"""
+        return (
+            event.code in _RECYCLED_EVENT_CODES
+            or event.code in self.budget_exempt_codes
+        )
+
+    def set_queue_cap(
+        self,
+        prior: int,
+        cap: _typing.Optional[int],
+        policy: _const.OverflowPolicy = _const.OverflowPolicy.DROP_OLDEST,
+    ) -> None:
+        """
+        设置某一优先级的事件在队列中的数量上限
+
+        Parameters
+        ---
+        prior : int
+            优先级
+        cap : Optional[int]
+            数量上限, `None`为取消上限
+        policy : OverflowPolicy, default = OverflowPolicy.DROP_OLDEST
+            达到上限时的处理策略
+
+        Notes
+        ---
+        STEP, DRAW与`budget_exempt_codes`中的事件不受上限限制, 也不会被`DROP_OLDEST`挤出队列;
+        该优先级中没有其他事件可以挤出时, 丢弃新事件。
+
+        Examples
+        ---
+        ```
+        core = Core()
+        # 优先级为100的事件最多排队1000个, 超出时用新事件替换同代码的旧事件
+        core.set_queue_cap(100, 1000, OverflowPolicy.COALESCE)
+        ```
+        """
+        if cap is None:
+            self.__queue_caps.pop(prior, None)
+            return
+        if cap < 1:
+            raise ValueError(f"Queue cap must be positive, got {cap}.")
+        self.__queue_caps[prior] = (cap, policy)
+
+    def __handle_overflow(
+        self, event: EventLike, policy: _const.OverflowPolicy
+    ) -> None:
+        """事件数量达到上限时, 根据策略处理新事件"""
+        queue = self.__event_queue
+        if policy == _const.OverflowPolicy.DROP_NEWEST:
+            self.event_stats["dropped"] += 1
+            return
+        if policy == _const.OverflowPolicy.COALESCE:
+            code = event.code
+            if queue.replace_last(event.prior, lambda x: x.code == code, event):
+                self.event_stats["coalesced"] += 1
+                return
+        self.event_stats["dropped"] += 1
+        if queue.pop_first(event.prior, lambda x: not self.__is_cap_exempt(x)) is None:
+            return  # 该优先级中只有不能丢弃的事件, 丢弃新事件
+        queue.append(event)
+
+    def __coalesce_event(self, event: EventLike, policy: _const.CoalescePolicy) -> bool:
+        """
+        根据合并策略合并通过`add_event`加入的事件 (包括转换后的pygame事件)
+
+        Returns
+        ---
+        bool
+            事件是否被合并 (合并后不需要再加入队列)
+        """
+        code = event.code
+        if policy == _const.CoalescePolicy.KEEP_LAST:
+            return self.__event_queue.replace_last(
+                event.prior, lambda x: x.code == code, event
+            )
+        if policy == _const.CoalescePolicy.DEDUPE:
+            same_code_events = self.__frame_events.setdefault(code, [])
+            for i in same_code_events:
+                if _is_same_event(i, event):
+                    return True
+            same_code_events.append(event)
+        return False
+
     def clear_event(self):
         """
-        清空所有事件 (包括pygame的队列)
+        清空所有事件 (包括pygame的队列, 以及顺延到下一帧的事件)
         """
         _pygame.event.clear()
         self.__event_queue.clear()
+        self.__carried_events.clear()
+        self.__frame_events.clear()
+
+    @property
+    def attached_listeners(self) -> _typing.List[ListenerLike]:
+        """
+        通过`attach`登记的监听者 (按登记顺序)
+        """
+        return list(self.__attached_listeners)
+
+    def attach(self, listener: ListenerLike) -> None:
+        """
+        登记监听者, 它的`listen_codes`会参与pygame事件过滤
+
+        Parameters
+        ---
+        listener : ListenerLike
+            登记的监听者 (一般是群组或场景)
+
+        Notes
+        ---
+        登记不会让`Core`把事件分发给该监听者, 事件仍然需要自己通过`listen`处理
+        """
+        self.__attached_listeners[listener] = None
+        self.__event_filter_key = None
+
+    def detach(self, listener: ListenerLike) -> None:
+        """
+        取消登记监听者, 没有登记过时什么都不做
+
+        Parameters
+        ---
+        listener : ListenerLike
+            取消登记的监听者
+        """
+        self.__attached_listeners.pop(listener, None)
+        self.__event_filter_key = None
+
+    def __update_event_filter(self) -> None:
+        """
+        根据登记的监听者的`listen_codes`更新pygame事件过滤
+
+        Notes
+        ---
+        只在登记者、群组成员或`required_event_types`变化后才重新计算并集, 并集没有变化时不调用pygame
+        """
+        if not self.auto_event_filter or not self.__attached_listeners:
+            if self.__allowed_event_types is not None:
+                _pygame.event.set_allowed(None)
+                self.__allowed_event_types = None
+            self.__event_filter_key = None
+            return
+        if self.__event_filter_key is not None and (
+            self.__event_filter_key[0] == _listen_codes_version
+            and self.__event_filter_key[1] == self.required_event_types
+        ):
+            return
+        self.__event_filter_key = (
+            _listen_codes_version,
+            frozenset(self.required_event_types),
+        )
+        allowed = set(self.required_event_types)
+        for listener in self.__attached_listeners:
+            allowed |= listener.listen_codes
+        allowed = frozenset(code for code in allowed if 0 < code < _pygame.NUMEVENTS)
+        if allowed == self.__allowed_event_types:
+            return
+        _pygame.event.set_blocked(None)
+        _pygame.event.set_allowed(list(allowed))
+        self.__allowed_event_types = allowed
 
     def get_step_event(self) -> EventLike:
         """
         调用`tick()`, 并生成一个STEP事件
+
+        Notes
+        ---
+        每次都会创建新事件 (不会被回收)
         """
         return EventLike.step_event(self.tick() / 1000)
 
@@ -735,6 +1305,8 @@ class Core:
     def winsize(self, rect: _typing.Tuple[int, int]):
         self.__winsize = rect
         self.__window = _pygame.display.set_mode(self.__winsize, _pygame.RESIZABLE)
+        if self.__dirty_rect_mode:
+            self.mark_dirty(self.__window.get_rect())
 
     @property
     def title(self) -> str:
@@ -799,13 +1371,138 @@ class Core:
             tick_rate = self.__rate
         return self.__clock.tick(tick_rate)
 
+    # dirty rect
+    @property
+    def dirty_rect_mode(self) -> bool:
+        """
+        是否使用脏矩形模式
+
+        Notes
+        ---
+        打开时整个窗口都会被标记为脏区域
+        """
+        return self.__dirty_rect_mode
+
+    @dirty_rect_mode.setter
+    def dirty_rect_mode(self, mode: bool) -> None:
+        self.__dirty_rect_mode = mode
+        self.__dirty_rects = []
+        self.__dirty_drawing = False
+        self.window.set_clip(None)
+        if mode:
+            self.mark_dirty(self.window.get_rect())
+
+    @property
+    def dirty_rects(self) -> _typing.List[_pygame.Rect]:
+        """
+        本帧的脏矩形 (已经裁剪到窗口内, 互不重叠)
+        """
+        return [rect.copy() for rect in self.__dirty_rects]
+
+    @property
+    def dirty_area(self) -> _typing.Optional[_pygame.Rect]:
+        """
+        本帧的脏区域 (所有脏矩形的外接矩形, 已经裁剪到窗口内), 没有时为None
+        """
+        if not self.__dirty_rects:
+            return None
+        return self.__dirty_rects[0].unionall(self.__dirty_rects[1:])
+
+    def mark_dirty(self, rect: _pygame.Rect) -> None:
+        """
+        报告窗口中发生变化的区域 (窗口坐标)
+
+        Parameters
+        ---
+        rect : pygame.Rect
+            变化的区域
+
+        Notes
+        ---
+        需要在`begin_dirty_draw`之前调用才会在本帧重绘, 之后调用的会留到下一帧。
+        与已有脏矩形重叠时合并为它们的外接矩形 (可能连锁合并), 否则单独保留;
+        这样相距很远的两处小变化不会让中间的大片区域也被重绘和输出。
+        没有打开脏矩形模式时什么都不做。
+        """
+        if not self.__dirty_rect_mode:
+            return
+        if self.__dirty_drawing:  # 本帧已经开始绘制, 留到下一帧
+            self.__next_dirty_rects.append(_pygame.Rect(rect))
+            return
+        rect = _pygame.Rect(rect).clip(self.window.get_rect())
+        if not rect.width or not rect.height:
+            return
+        rects = self.__dirty_rects
+        i = 0
+        while i < len(rects):
+            if rects[i].colliderect(rect):
+                rect.union_ip(rects.pop(i))
+                i = 0  # 合并后变大, 可能与之前检查过的矩形重叠
+            else:
+                i += 1
+        rects.append(rect)
+
+    def begin_dirty_draw(self) -> _typing.Optional[_pygame.Rect]:
+        """
+        开始绘制脏区域: 在每个脏矩形内恢复`background`, 并把窗口的裁剪区域设置为脏区域 (外接矩形)
+
+        Returns
+        ---
+        Optional[pygame.Rect]
+            脏区域, 没有需要重绘的区域时返回None (此时窗口的裁剪区域为空, 绘制不会生效)
+
+        Notes
+        ---
+        每帧只生效一次, 重复调用返回相同的结果。没有打开脏矩形模式时返回整个窗口, 不做任何事。
+        """
+        if not self.__dirty_rect_mode:
+            return self.window.get_rect()
+        area = self.dirty_area
+        if self.__dirty_drawing:
+            return area
+        self.__dirty_drawing = True
+        window = self.window
+        if area is None:
+            window.set_clip(_pygame.Rect(0, 0, 0, 0))
+            return None
+        for rect in self.__dirty_rects:
+            if isinstance(self.background, _pygame.Surface):
+                window.blit(self.background, rect, rect)
+            else:
+                window.fill(self.background, rect)
+        window.set_clip(area)
+        return area.copy()
+
     # pygame api
     @staticmethod
     def flip() -> None:
         """
         将`self.window`上画的内容输出的屏幕上
-        """
-        return _pygame.display.flip()
+
+        Notes
+        ---
+        输出之前先按顺序执行`flip_hooks`。
+        脏矩形模式下, 只输出脏矩形 (`pygame.display.update`), 然后清空脏矩形并恢复窗口的裁剪区域。
+        与之前一样是静态方法, `Core.flip()`与`core.flip()`都可以使用
+        """
+        core = _core_instance
+        if core is not None:
+            for hook in core.flip_hooks:
+                hook(core)
+        if core is None or not core.__dirty_rect_mode:
+            return _pygame.display.flip()
+        core.__update_dirty()
+
+    def __update_dirty(self) -> None:
+        """输出脏矩形, 然后清空脏矩形并恢复窗口的裁剪区域"""
+        if self.__dirty_rects:
+            _pygame.display.update(self.__dirty_rects)
+        self.__dirty_rects = []
+        self.__dirty_drawing = False
+        self.window.set_clip(None)
+        next_rects, self.__next_dirty_rects = self.__next_dirty_rects, []
+        for rect in next_rects:
+            self.mark_dirty(rect)
 
     @staticmethod
     def init() -> None:
@@ -5,6 +5,15 @@ Constants
 ---
 EVERYONE_RECEIVER
     事件的特殊接收者地址: 所有人
+EVERYONE_RECEIVERS
+    只包含`EVERYONE_RECEIVER`的共享接收者集合, 事件的默认接收者
+
+Enums
+---
+OverflowPolicy
+    事件队列超出容量上限时的处理策略
+CoalescePolicy
+    同一帧内同代码事件的合并策略
 
 Methods
 ---
@@ -22,21 +31,25 @@ EventCode.KILL
 
 Event Body Templates
 ---
+EventBody
+    事件body基类 (带`__slots__`, 兼容字典写法)
 StepEventBody
     STEP事件body模板
 DrawEventBody
     DRAW事件body模板
-KILL事件body模板
+KillEventBody
     KILL事件body模板
 
 """
 
 import pygame as _pygame
 import typing as _typing
+from collections.abc import MutableMapping as _MutableMapping
 from enum import IntEnum as _IntEnum
 
 
 EVERYONE_RECEIVER: _typing.Final = "constants_everyone"  # 事件接收者: 所有人
+EVERYONE_RECEIVERS: _typing.Final = frozenset({EVERYONE_RECEIVER})  # 默认接收者集合
 
 # event code
 __user_event_start: _typing.Final = _pygame.USEREVENT
@@ -62,29 +75,122 @@ class EventCode(_IntEnum):
     KILL = get_unused_event_code()  # 删除监听者事件（从群组等中删除监听者）
 
 
+class OverflowPolicy(_IntEnum):
+    """
+    事件队列中, 某一优先级的事件数量达到上限时的处理策略
+    """
+
+    DROP_NEWEST = 0  # 丢弃新加入的事件
+    DROP_OLDEST = 1  # 丢弃该优先级中最早加入的事件
+    COALESCE = 2  # 替换最后一个同代码的事件, 没有则同DROP_OLDEST
+
+
+class CoalescePolicy(_IntEnum):
+    """
+    同一帧内, 同代码事件的合并策略
+    """
+
+    KEEP_LAST = 0  # 只保留最后一个事件 (比如MOUSEMOTION, VIDEORESIZE)
+    DEDUPE = 1  # 丢弃本帧已加入过的相同事件 (代码, 优先级, 发送者, 接收者, body)
+
+
 # event body
 
 
-class StepEventBody(_typing.TypedDict):
+class EventBody(_MutableMapping):
+    """
+    事件body基类
+
+    子类在`__slots__`中声明字段, 实例不带`__dict__`, 比字典更省内存、创建更快。
+
+    为了兼容旧的字典写法, 支持`body["key"]`读写、`"key" in body`、`body.get("key")`等操作,
+    并且可以和字典比较是否相等。
+
+    Examples
+    ---
+    ```
+    body = StepEventBody(0.016)
+    body.second  # 0.016
+    body["second"]  # 0.016
+    body == {"second": 0.016}  # True
+    ```
+
+    Notes
+    ---
+    - 只能读写`__slots__`中声明的字段, 不能增加或删除字段。
+    - 旧代码中直接传入字典作为body仍然可用。
+    """
+
+    __slots__ = ()
+    _fields: _typing.ClassVar[_typing.FrozenSet[str]] = frozenset()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        fields = set()
+        for klass in cls.__mro__:
+            slots = klass.__dict__.get("__slots__", ())
+            fields.update((slots,) if isinstance(slots, str) else slots)
+        fields.discard("__weakref__")
+        cls._fields = frozenset(fields)
+
+    def __getitem__(self, key: str) -> _typing.Any:
+        if key in self._fields:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: _typing.Any) -> None:
+        if key not in self._fields:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError(f"Can't delete field {key!r} of {type(self).__name__}")
+
+    def __iter__(self) -> _typing.Iterator[str]:
+        return (i for i in sorted(self._fields) if hasattr(self, i))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        items = ", ".join(f"{k}={v!r}" for k, v in self.items())
+        return f"{type(self).__name__}({items})"
+
+
+class StepEventBody(EventBody):
     """
     STEP事件body模板
     """
 
-    second: float  # 距离上一次游戏刻发生经过的时间（秒）
+    __slots__ = ("second",)
+
+    def __init__(self, second: float) -> None:
+        self.second: float = second  # 距离上一次游戏刻发生经过的时间（秒）
 
 
-class DrawEventBody(_typing.TypedDict):
+class DrawEventBody(EventBody):
     """
     DRAW事件body模板
     """
 
-    surface: _pygame.Surface  # 画布
-    offset: tuple[int, int]  # 绘制偏移量
+    __slots__ = ("surface", "offset")
 
+    def __init__(
+        self, surface: _pygame.Surface, offset: _typing.Tuple[int, int] = (0, 0)
+    ) -> None:
+        self.surface: _pygame.Surface = surface  # 画布
+        self.offset: _typing.Tuple[int, int] = offset  # 绘制偏移量
 
-class KillEventBody(_typing.TypedDict):
+
+class KillEventBody(EventBody):
     """
     KILL事件body模板
     """
 
-    suicide: str  # 被删除监听者的UUID
+    __slots__ = ("suicide",)
+
+    def __init__(self, suicide: str) -> None:
+        self.suicide: str = suicide  # 被删除监听者的UUID
@@ -7,6 +7,8 @@ listening
     装饰函数: 表示这个函数能处理某个事件代码。
 find_listening_methods
     寻找实例中, 被listening装饰过的方法
+get_listening_table
+    获取类中被listening装饰过的方法名表 (每个类只计算一次)
 singleton
     单例类装饰器
 
@@ -16,6 +18,10 @@ BarrelQueue
     高度优化的队列, 用于保证事件队列永远有序(排序规则: 1. 优先级 2.插入顺序), 且插入与弹出的复杂度皆为O(1)。
 DoubleKeyBarrel
     高度优化的桶。用于快速将事件分发到所有能处理该类型事件(且为接收者)的监听者中。
+FrameRecycler
+    每帧重复使用同一个对象 (比如STEP, DRAW事件), 避免反复创建。
+SortedDefaultDict
+    按键排序的defaultdict, 增量维护有序的键序列 (用于图层顺序)
 """
 
 import functools as _functools
@@ -23,13 +29,16 @@ import itertools as _itertools
 import typing as _typing
 import heapq as heapq
 import collections as _collections
-import inspect as _inspect
+import types as _types
+import weakref as _weakref
+import bisect as _bisect
 
 from loguru import logger as _logger
 
 if _typing.TYPE_CHECKING:
     from . import collections as _colls
 _LISTENING_METHOD_ATTR_NAME = "_listening_codes"  # listening装饰器修改的函数属性
+_LISTENING_TABLE_ATTR_NAME = "_listening_table"  # get_listening_table缓存的类属性
 
 
 _WARNING_DO_NOT_DECORATE_PRIVATE = """Do not use the `listening` decorator on private methods!
@@ -106,6 +115,49 @@ def listening(code: int) -> _typing.Callable[[_typing.Callable], _typing.Callabl
     return decorator
 
 
+def get_listening_table(cls: type) -> _typing.Dict[int, _typing.Tuple[str, ...]]:
+    """
+    找到类中, 所有被listening装饰过的方法名。
+
+    结果会缓存在类属性中, 每个类只计算一次。
+
+    Parameters
+    ---
+    cls : type
+        类
+
+    Returns
+    ---
+    dict[int, tuple[str, ...]]
+        键: 事件代码, 值: 事件处理方法的名字
+
+    Notes
+    ---
+    只检查`cls.__mro__`中各个类的`__dict__`, 不会对属性求值（比如不会触发`property`）。
+    因此, 在类定义之后才绑定到类或实例上的方法不会被捕捉。
+    """
+    table = cls.__dict__.get(_LISTENING_TABLE_ATTR_NAME)
+    if table is not None:
+        return table
+
+    members: _typing.Dict[str, _typing.Any] = {}
+    for klass in reversed(cls.__mro__):  # 子类的同名属性覆盖父类
+        members.update(klass.__dict__)
+
+    names: _typing.Dict[int, _typing.List[str]] = {}
+    for name, attr in members.items():
+        if isinstance(attr, classmethod):
+            attr = attr.__func__
+        elif not isinstance(attr, _types.FunctionType):
+            continue
+        for code in getattr(attr, _LISTENING_METHOD_ATTR_NAME, ()):
+            names.setdefault(code, []).append(name)
+
+    table = {code: tuple(sorted(method_names)) for code, method_names in names.items()}
+    setattr(cls, _LISTENING_TABLE_ATTR_NAME, table)
+    return table
+
+
 def find_listening_methods(
     obj: object,
 ) -> _typing.Dict[int, _typing.Set[_typing.Callable[["_colls.EventLike"], None]]]:
@@ -147,17 +199,15 @@ def find_listening_methods(
     #   30: {<bound method Foo.func30}
     # }
     ```
+
+    Notes
+    ---
+    方法名表由`get_listening_table(type(obj))`提供, 这里只负责绑定到实例上。
     """
-    listen_code_methods: _typing.Dict[
-        int, _typing.Set[_typing.Callable[["_colls.EventLike"], None]]
-    ] = {}
-    for _, method in _inspect.getmembers(obj, predicate=_inspect.ismethod):
-        if hasattr(method, _LISTENING_METHOD_ATTR_NAME):
-            for code in getattr(method, _LISTENING_METHOD_ATTR_NAME):
-                if code not in listen_code_methods:
-                    listen_code_methods[code] = set()
-                listen_code_methods[code].add(method)
-    return listen_code_methods
+    return {
+        code: {getattr(obj, name) for name in names}
+        for code, names in get_listening_table(type(obj)).items()
+    }
 
 
 _T = _typing.TypeVar("_T")
@@ -200,10 +250,26 @@ class BarrelQueue(_typing.Generic[_Element]):
         在队列右边加入物品
     popleft(self)
         弹出队列最左边的元素 (队列中最小的元素)
+    drain_bucket(self)
+        弹出队列最左边的整个桶 (键最小的所有元素)
+    count(self, key: Key)
+        键为`key`的元素个数
+    popleft_key(self, key: Key)
+        弹出键为`key`的最早加入的元素
+    pop_first(self, key: Key, match: Callable[[Element], bool])
+        弹出键为`key`的元素中, 最早加入的满足`match`的元素
+    replace_last(self, key: Key, match: Callable[[Element], bool], item: Element)
+        替换键为`key`的元素中, 最后一个满足`match`的元素
     extend(self, items: Iterable[Element])
         在队列右边加入多个物品
     clear(self)
         清空队列
+
+    Notes
+    ---
+    队列长度是增量维护的, `len`的复杂度为O(1)。
+    每个键对应一个`deque`; 从中间的键弹出元素后变空的桶不会立即从堆中删除, 而是在到达堆顶时再删除,
+    因此`popleft_key`与`pop_first`不需要重建堆。
     """
 
     def __init__(self, get_key: _typing.Callable[[_Element], _Key] = lambda x: x):
@@ -211,12 +277,13 @@ class BarrelQueue(_typing.Generic[_Element]):
 
         self.__barrels: _typing.Dict[_Key, _collections.deque[_Element]] = {}
         self.__barrel_heap: _typing.List[_Key] = []
+        self.__size: int = 0
 
     def __len__(self) -> int:
-        return sum(len(i) for i in self.__barrels.values())
+        return self.__size
 
     def __bool__(self) -> bool:
-        return bool(self.__barrels)
+        return self.__size > 0
 
     def append(self, item: _Element) -> None:
         """
@@ -230,6 +297,7 @@ class BarrelQueue(_typing.Generic[_Element]):
         k = self.__get_key(item)
         self.__set_default_key(k)
         self.__barrels[k].append(item)
+        self.__size += 1
 
     def popleft(self) -> _Element:
         """
@@ -240,12 +308,127 @@ class BarrelQueue(_typing.Generic[_Element]):
         Element
             队列中最小的元素
         """
+        self.__drop_empty_top()
         k = self.__barrel_heap[0]
         element = self.__barrels[k].popleft()
+        self.__size -= 1
         if not self.__barrels[k]:
             self.__pop_key()
         return element
 
+    def drain_bucket(self) -> _collections.deque:
+        """
+        弹出队列最左边的整个桶, 也就是键最小的所有元素 (保持插入顺序)
+
+        Returns
+        ---
+        deque[Element]
+            键最小的所有元素。桶已经从队列中移除, 之后加入的同键元素会进入新的桶。
+
+        Raises
+        ---
+        IndexError
+            如果队列为空
+        """
+        self.__drop_empty_top()
+        k = heapq.heappop(self.__barrel_heap)
+        barrel = self.__barrels.pop(k)
+        self.__size -= len(barrel)
+        return barrel
+
+    def count(self, key: _Key) -> int:
+        """
+        键为`key`的元素个数
+
+        Parameters
+        ---
+        key : Key
+            键
+        """
+        barrel = self.__barrels.get(key)
+        return len(barrel) if barrel is not None else 0
+
+    def popleft_key(self, key: _Key) -> _Element:
+        """
+        弹出键为`key`的最早加入的元素
+
+        Parameters
+        ---
+        key : Key
+            键
+
+        Raises
+        ---
+        KeyError
+            如果队列中没有键为`key`的元素
+        """
+        barrel = self.__barrels.get(key)
+        if not barrel:
+            raise KeyError(key)
+        element = barrel.popleft()
+        self.__size -= 1
+        return element
+
+    def pop_first(
+        self, key: _Key, match: _typing.Callable[[_Element], bool]
+    ) -> _typing.Optional[_Element]:
+        """
+        弹出键为`key`的元素中, 最早加入的满足`match`的元素
+
+        Parameters
+        ---
+        key : Key
+            键
+        match : (Element) -> bool
+            判断函数
+
+        Returns
+        ---
+        Optional[Element]
+            被弹出的元素, 没有满足`match`的元素时为None
+        """
+        barrel = self.__barrels.get(key)
+        if barrel is None:
+            return None
+        for i, element in enumerate(barrel):
+            if match(element):
+                del barrel[i]
+                self.__size -= 1
+                return element
+        return None
+
+    def replace_last(
+        self,
+        key: _Key,
+        match: _typing.Callable[[_Element], bool],
+        item: _Element,
+    ) -> bool:
+        """
+        从右往左查找键为`key`的元素, 将第一个满足`match`的元素替换为`item` (位置不变)
+
+        Parameters
+        ---
+        key : Key
+            键, `item`的键也应该是`key`
+        match : (Element) -> bool
+            判断函数
+        item : Element
+            新元素
+
+        Returns
+        ---
+        bool
+            是否替换成功
+        """
+        barrel = self.__barrels.get(key)
+        if barrel is None:
+            return False
+        for i in range(len(barrel) - 1, -1, -1):
+            if match(barrel[i]):
+                barrel[i] = item
+                return True
+        return False
+
     def extend(self, items: _typing.Iterable[_Element]) -> None:
         """
         在队列右边加入多个元素
@@ -268,6 +451,7 @@ class BarrelQueue(_typing.Generic[_Element]):
                     self.__set_default_key(k)
                     k_old = k
                 self.__barrels[k].append(item)
+                self.__size += 1
 
         except StopIteration:
             pass
@@ -276,6 +460,7 @@ class BarrelQueue(_typing.Generic[_Element]):
         """清空队列"""
         self.__barrel_heap.clear()
         self.__barrels.clear()
+        self.__size = 0
 
     def __set_default_key(self, k: _Key):
         if k in self.__barrels:
@@ -290,6 +475,13 @@ class BarrelQueue(_typing.Generic[_Element]):
         self.__barrels.pop(k)
         heapq.heappop(self.__barrel_heap)
 
+    def __drop_empty_top(self):
+        """删除堆顶已经变空的桶 (由`popleft_key`与`pop_first`留下)"""
+        heap = self.__barrel_heap
+        barrels = self.__barrels
+        while heap and not barrels[heap[0]]:
+            barrels.pop(heapq.heappop(heap))
+
 
 class DoubleKeyBarrel(_typing.Generic[_Element]):
     """
@@ -303,14 +495,16 @@ class DoubleKeyBarrel(_typing.Generic[_Element]):
         删除元素
     get(self, keys1: set[Key1], keys2: set[Key2]) -> set[Element]
         检查`DoubleKeyBarrel`内所有元素, 满足`get_keys1(Element) & keys1 and get_keys2(Element) & keys2`的元素都返回
+    get_ordered(self, key1: Key1, keys2: set[Key2]) -> Sequence[Element]
+        与`get({key1}, keys2)`相同, 但按添加顺序返回, 且结果会被缓存
     clear(self) -> None:
         清空元素
 
     Notes
     ---
-    本质上在维护一个字典`self.__barrels` : `dict[tuple[Key1, Key2], set[Element]]`
+    本质上在维护一个字典`self.__barrels` : `dict[tuple[Key1, Key2], dict[Element, None]]`
     里面储存的每个元素可以提取出两个键集合set[Key1], set[Key2]
-    元素会根据其键集合, 储存到相应的桶里面
+    元素会根据其键集合, 储存到相应的桶里面 (桶是按添加顺序排列的有序集合)
 
     比如`item`能提取出两个键集合`{1, 2}`和`{"a", "b"}`, 那么字典中的情况应该是
     ```
@@ -326,6 +520,9 @@ class DoubleKeyBarrel(_typing.Generic[_Element]):
     ```
     如果调用`get({2, 3}, {"c", "d"})`
     那么键为`(2, "c")`, `{2, "d"}`, `(3, "c")`, `{3, "d"}`的集合, 其内容都会被返回。
+
+    `get_ordered`返回的列表缓存在`self.__lists`中。添加或删除元素时, 只有该元素涉及的键的缓存会失效。
+    缓存的列表不会被原地修改, 所以遍历过程中添加或删除元素是安全的。
     """
 
     @property
@@ -358,11 +555,17 @@ class DoubleKeyBarrel(_typing.Generic[_Element]):
         self.__get_keys2: _typing.Callable[[_Element], _Key2] = get_keys2
         self.__barrels: _typing.Dict[
             _typing.Tuple[_Key1, _Key2],
-            _typing.Set[_Element],
+            _typing.Dict[_Element, None],
         ] = {}
         # __iter__优化
         self.__all_elements: _typing.Set[_Element] = set()
         self.__caches: _typing.Dict = {}
+        # get_ordered优化
+        self.__lists: _typing.Dict[
+            _typing.Tuple[_Key1, _Key2], _typing.List[_Element]
+        ] = {}
+        self.__orders: _typing.Dict[_Element, int] = {}  # 元素的添加序号
+        self.__order_counter: _typing.Iterator[int] = _itertools.count()
 
     def __iter__(self) -> _typing.Iterable[_Element]:
         return iter(self.__all_elements)
@@ -395,11 +598,49 @@ class DoubleKeyBarrel(_typing.Generic[_Element]):
         keys1, keys2 : set[Key1], set[Key2]
             查询键集
         """
-        assert isinstance(keys1, set) and isinstance(keys2, set)
+        assert isinstance(keys1, (set, frozenset))
+        assert isinstance(keys2, (set, frozenset))
 
         res = set()
         for ck in _itertools.product(keys1, keys2):
-            res.update(self.__barrels.get(ck, set()))
+            res.update(self.__barrels.get(ck, ()))
+        return res
+
+    def get_ordered(
+        self, key1: _Key1, keys2: _typing.AbstractSet[_Key2]
+    ) -> _typing.Sequence[_Element]:
+        """
+        返回所有满足`key1 in get_keys1(Element) and get_keys2(Element) & keys2`的元素, 按添加顺序排列
+
+        Parameters
+        ---
+        key1 : Key1
+            查询键
+        keys2 : set[Key2]
+            查询键集
+
+        Returns
+        ---
+        Sequence[Element]
+            按添加顺序排列的元素。请不要修改返回的列表。
+
+        Notes
+        ---
+        `keys2`只有一个元素时, 直接返回缓存的列表, 不会创建新对象。
+        """
+        if len(keys2) == 1:
+            for key2 in keys2:
+                return self.__get_list((key1, key2))
+
+        merged: _typing.Dict[_Element, None] = {}
+        for key2 in keys2:
+            merged.update(self.__barrels.get((key1, key2), ()))
+        return sorted(merged, key=self.__orders.__getitem__)
+
+    def __get_list(self, ck: _typing.Tuple[_Key1, _Key2]) -> _typing.List[_Element]:
+        res = self.__lists.get(ck)
+        if res is None:
+            res = self.__lists[ck] = list(self.__barrels.get(ck, ()))
         return res
 
     def add(self, item: _Element) -> None:
@@ -413,12 +654,14 @@ class DoubleKeyBarrel(_typing.Generic[_Element]):
         """
         self.__caches.clear()
         self.__all_elements.add(item)
+        self.__orders.setdefault(item, next(self.__order_counter))
 
         comb_keys = self.__get_comb_keys(item)
         for ck in comb_keys:
             if ck not in self.__barrels:
-                self.__barrels[ck] = set()
-            self.__barrels[ck].add(item)
+                self.__barrels[ck] = {}
+            self.__barrels[ck][item] = None
+            self.__lists.pop(ck, None)
 
     def remove(self, item: _Element) -> None:
         """
@@ -436,10 +679,12 @@ class DoubleKeyBarrel(_typing.Generic[_Element]):
         """
         self.__caches.clear()
         self.__all_elements.remove(item)
+        self.__orders.pop(item)
 
         comb_keys = self.__get_comb_keys(item)
         for ck in comb_keys:
-            self.__barrels[ck].remove(item)
+            self.__barrels[ck].pop(item)
+            self.__lists.pop(ck, None)
             if not self.__barrels[ck]:
                 self.__barrels.pop(ck)
 
@@ -448,3 +693,193 @@ class DoubleKeyBarrel(_typing.Generic[_Element]):
         self.__all_elements.clear()
         self.__barrels.clear()
         self.__caches.clear()
+        self.__lists.clear()
+        self.__orders.clear()
+
+
+class FrameRecycler(_typing.Generic[_Element]):
+    """
+    帧对象回收器: 每次`get`都返回同一个对象, 用于每帧都会创建的对象 (比如STEP, DRAW事件)。
+
+    调用者需要在`get`之后重新设置对象的全部可变属性。
+    处理函数不应该保存被回收的对象 (下一帧它的内容就会被修改)。
+
+    Attributes
+    ---
+    check : bool, default = False
+        类属性, 调试开关。打开后`get`每次都创建新对象, 并用弱引用检查两次`get`之前的对象是否仍然存活。
+        如果仍然存活, 说明有处理函数保存了该对象, 会输出一次警告。
+
+    Methods
+    ---
+    get(self) -> Element
+        获取对象
+
+    Examples
+    ---
+    ```
+    step_events = FrameRecycler(lambda: EventLike.step_event(0))
+
+    event = step_events.get()
+    event.body.second = 0.016
+    ```
+
+    Notes
+    ---
+    调试检查延迟两次`get`, 是因为主循环的`for event in core.yield_events()`会在下一帧开始时仍然引用上一帧的最后一个事件。
+    被回收的对象需要支持弱引用。
+    """
+
+    check: bool = False
+
+    def __init__(self, factory: _typing.Callable[[], _Element], *, name: str = ""):
+        """
+        Parameters
+        ---
+        factory : () -> Element
+            创建对象的函数
+        name : str, default = ""
+            名字, 用于警告信息
+        """
+        self.__factory: _typing.Callable[[], _Element] = factory
+        self.__name: str = name
+        self.__item: _typing.Optional[_Element] = None
+        self.__history: _collections.deque = _collections.deque(maxlen=2)
+        self.__warned: bool = False
+
+    def get(self) -> _Element:
+        """
+        获取对象
+
+        Returns
+        ---
+        Element
+            被回收的对象 (调试模式下是新对象)
+        """
+        if not FrameRecycler.check:
+            item = self.__item
+            if item is None:
+                item = self.__item = self.__factory()
+            return item
+
+        history = self.__history
+        if len(history) == history.maxlen and not self.__warned:
+            if history[0]() is not None:
+                self.__warned = True
+                _logger.warning(
+                    f"A recycled object ({self.__name or self.__factory}) is still referenced after it was reused. Handlers must not keep recycled events. 被回收的对象在重复使用后仍被引用, 处理函数不应该保存被回收的事件。"
+                )
+        item = self.__factory()
+        history.append(_weakref.ref(item))
+        return item
+
+
+_Value = _typing.TypeVar("_Value")
+_MISSING = object()  # `pop`没有传入默认值
+
+
+class SortedDefaultDict(_collections.defaultdict, _typing.Generic[_Key, _Value]):
+    """
+    按键排序的`collections.defaultdict`: 增删键时增量维护有序的键序列, 不需要每次都`sorted(d.keys())`
+
+    Methods
+    ---
+    sorted_keys(self) -> tuple[Key, ...]
+        从小到大排列的键
+
+    Examples
+    ---
+    ```
+    layers = SortedDefaultDict(list)
+    layers[10].append("a")
+    layers[-1].append("b")
+    layers.sorted_keys()  # (-1, 10)
+    ```
+
+    Notes
+    ---
+    键之间需要能比较大小。新增键时用二分插入 (O(log n)查找), 键集合不变时`sorted_keys`直接返回缓存的元组。
+    """
+
+    def __init__(
+        self,
+        default_factory: _typing.Optional[_typing.Callable[[], _Value]] = None,
+        *args,
+        **kwargs,
+    ):
+        """
+        Parameters
+        ---
+        default_factory : () -> Value, optional, default = None
+            与`collections.defaultdict`相同
+        *args, **kwargs
+            与`dict`相同, 初始内容
+        """
+        super().__init__(default_factory)
+        self.__keys: _typing.List[_Key] = []
+        self.__keys_cache: _typing.Optional[_typing.Tuple[_Key, ...]] = ()
+        self.update(*args, **kwargs)
+
+    def sorted_keys(self) -> _typing.Tuple[_Key, ...]:
+        """
+        从小到大排列的键
+
+        Returns
+        ---
+        tuple[Key, ...]
+            键的元组 (快照, 遍历时增删键不影响它)
+        """
+        keys = self.__keys_cache
+        if keys is None:
+            keys = self.__keys_cache = tuple(self.__keys)
+        return keys
+
+    def __add_key(self, key: _Key) -> None:
+        _bisect.insort(self.__keys, key)
+        self.__keys_cache = None
+
+    def __remove_key(self, key: _Key) -> None:
+        keys = self.__keys
+        del keys[_bisect.bisect_left(keys, key)]
+        self.__keys_cache = None
+
+    def __setitem__(self, key: _Key, value: _Value) -> None:
+        if key not in self:
+            self.__add_key(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: _Key) -> None:
+        super().__delitem__(key)
+        self.__remove_key(key)
+
+    def setdefault(self, key: _Key, default: _Value = None) -> _Value:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, key: _Key, default: _Value = _MISSING) -> _Value:
+        if key in self:
+            value = super().pop(key)
+            self.__remove_key(key)
+            return value
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def popitem(self) -> _typing.Tuple[_Key, _Value]:
+        key, value = super().popitem()
+        self.__remove_key(key)
+        return key, value
+
+    def clear(self) -> None:
+        super().clear()
+        self.__keys.clear()
+        self.__keys_cache = ()
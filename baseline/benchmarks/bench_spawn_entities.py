@@ -0,0 +1,60 @@
+"""
+基准测试: 创建大量`EntityLike`的耗时
+
+对比`inspect.getmembers`逐实例扫描 (旧实现) 与按类缓存的`listening`方法表 (现实现)。
+
+Usage
+---
+```
+python benchmarks/bench_spawn_entities.py [count]
+```
+"""
+
+import os
+import sys
+import time
+import inspect
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from base import tools
+from game_collections import EntityLike
+
+
+def legacy_find_listening_methods(obj: object) -> dict:
+    """旧实现: 每个实例都用`inspect.getmembers`扫描全部属性 (会对property求值)"""
+    res = {}
+    for _, method in inspect.getmembers(obj, predicate=inspect.ismethod):
+        for code in getattr(method, "_listening_codes", ()):
+            res.setdefault(code, set()).add(method)
+    return res
+
+
+def spawn(count: int) -> float:
+    image = pygame.Surface((40, 40))
+    start = time.perf_counter()
+    for i in range(count):
+        EntityLike(pygame.Rect(i % 100 * 40, i // 100 * 40, 40, 40), image=image)
+    return time.perf_counter() - start
+
+
+def main(count: int = 10000) -> None:
+    pygame.init()
+
+    current = spawn(count)
+
+    entities = [EntityLike(pygame.Rect(0, 0, 40, 40)) for _ in range(count)]
+    start = time.perf_counter()
+    for entity in entities:
+        legacy_find_listening_methods(entity)
+    legacy = time.perf_counter() - start
+
+    print(f"spawn {count} EntityLike: {current * 1000:8.1f} ms")
+    print(f"legacy getmembers scan:   {legacy * 1000:8.1f} ms (scan only)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
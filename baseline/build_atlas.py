@@ -0,0 +1,56 @@
+"""
+离线打包图集: 把`assets/tiles`中的图块与`assets/player`, `assets/npc`中的角色帧打包为图集
+
+生成的图集在`assets/atlas`中 (不纳入版本控制), 运行时由`assets.AssetManager.load_atlas`登记。
+游戏中缩放使用的图像 (`SCALED_SIZES`) 还会打包缩放后的版本, 按这些大小加载时直接切出子Surface。
+源文件修改后需要重新运行; 修改过的图像在重新打包之前仍从源文件加载。
+
+Usage
+---
+```
+python build_atlas.py [max_size]
+```
+"""
+
+import os
+import sys
+import glob
+from typing import Dict, List, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import assets
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+ATLAS_DIR = os.path.join(ASSETS_DIR, "atlas")
+SOURCE_PATTERNS = ("tiles/*.png", "player/*.png", "npc/*.png", "npc/monster/*.png")
+# 游戏中实际使用的大小 (`utils.load_image_and_scale`): 地图格子40x40, 角色与树60x60
+SCALED_SIZES = (
+    ("tiles/*.png", (40, 40)),
+    ("tiles/tree.png", (60, 60)),
+    ("player/*.png", (60, 60)),
+    ("npc/*.png", (60, 60)),
+    ("npc/monster/*.png", (60, 60)),
+)
+
+
+def collect_sizes() -> Dict[str, List[Tuple[int, int]]]:
+    """按`SCALED_SIZES`收集每张图像需要打包的缩放后的大小"""
+    sizes: Dict[str, List[Tuple[int, int]]] = {}
+    for pattern, size in SCALED_SIZES:
+        for path in glob.glob(os.path.join(ASSETS_DIR, pattern)):
+            sizes.setdefault(path, []).append(size)
+    return sizes
+
+
+def main(max_size: int = 1024) -> None:
+    paths = []
+    for pattern in SOURCE_PATTERNS:
+        paths.extend(glob.glob(os.path.join(ASSETS_DIR, pattern)))
+    assets.pack_atlas(
+        paths, ATLAS_DIR, root=ASSETS_DIR, max_size=max_size, sizes=collect_sizes()
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1024)
@@ -0,0 +1,44 @@
+"""
+离线生成资源包: 把`assets`中的图像预先解码为原始RGBA像素, 写入`assets/bundle/images.bundle`
+
+生成的资源包不纳入版本控制, 运行时由`assets.AssetManager.load_bundle`内存映射并登记。
+源文件修改后, `load_bundle`会自动重新生成; 也可以手动重新运行本脚本。
+已生成图集 (`build_atlas.py`) 时, 图集页也会被打包。
+游戏中缩放使用的图像 (`build_atlas.SCALED_SIZES`) 还会打包缩放后的版本, `utils.load_image_and_scale`直接使用, 不再缩放。
+
+Usage
+---
+```
+python build_bundle.py
+```
+"""
+
+import os
+import glob
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import assets
+from build_atlas import collect_sizes
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+BUNDLE_PATH = os.path.join(ASSETS_DIR, "bundle", "images.bundle")
+SOURCE_PATTERNS = (
+    "background/*.png",
+    "tiles/*.png",
+    "player/*.png",
+    "npc/*.png",
+    "npc/monster/*.png",
+    "atlas/*.png",
+)
+
+
+def main() -> None:
+    paths = []
+    for pattern in SOURCE_PATTERNS:
+        paths.extend(glob.glob(os.path.join(ASSETS_DIR, pattern)))
+    assets.build_bundle(paths, BUNDLE_PATH, root=ASSETS_DIR, sizes=collect_sizes())
+
+
+if __name__ == "__main__":
+    main()
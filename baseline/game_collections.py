@@ -14,6 +14,30 @@ LayerLike
     图层（管理绘制顺序）
 SceneLike
     场景类, 主要提供相机坐标, 图层控制, 以及进入与退出
+TrackedRect
+    修改时会发出通知的`pygame.Rect` (`EntityLike.rect`)
+Layer
+    图层 (记录修改次数的成员列表)
+SpatialIndex
+    实体的空间索引, 用于剔除相机范围外的实体
+TileMap
+    瓦片地图图层 (按区块预渲染)
+DebugOverlay
+    DEBUG图层 (收集一帧的DEBUG图元, 一次性绘制)
+
+Functions
+---
+get_shared_mask
+    获取Surface的掩码, 同一个Surface的掩码只生成一次 (共享)
+get_placeholder_image
+    获取完全透明的占位图像, 同一大小只创建一次 (共享)
+flush_debug_overlay
+    把`debug_overlay`绘制到窗口上, 登记到`Core.flip_hooks`后每帧执行一次
+
+Attributes
+---
+debug_overlay : DebugOverlay
+    `c.DEBUG`打开时, 实体的DEBUG框收集到这里
 """
 
 from typing import (
@@ -24,8 +48,13 @@ from typing import (
     Optional,
     Set,
     Any,
+    Callable,
+    Iterable,
+    Sequence,
+    Union,
 )
-import collections
+import weakref
+import array
 
 import pygame
 from loguru import logger
@@ -38,8 +67,338 @@ from base import (
     Core,
     PostEventApiLike,
     listening,
+    get_listening_table,
+    FrameRecycler,
+    SortedDefaultDict,
 )
 import utils
+import assets
+from assets import get_placeholder_image
+
+_shared_masks: "weakref.WeakKeyDictionary[pygame.Surface, pygame.Mask]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_shared_mask(surface: pygame.Surface) -> pygame.Mask:
+    """
+    获取`surface`的掩码, 同一个Surface只调用一次`pygame.mask.from_surface`
+
+    Parameters
+    ---
+    surface : pygame.Surface
+        图像
+
+    Returns
+    ---
+    pygame.Mask
+        共享的掩码, 不要原地修改
+
+    Notes
+    ---
+    缓存以Surface对象为键 (弱引用, Surface被回收后自动删除)。
+    原地修改Surface的像素后, 需要调用`drop_shared_mask`使缓存失效。
+    """
+    mask = _shared_masks.get(surface)
+    if mask is None:
+        mask = _shared_masks[surface] = pygame.mask.from_surface(surface)
+    return mask
+
+
+def drop_shared_mask(surface: pygame.Surface) -> None:
+    """
+    删除`surface`的共享掩码缓存, 没有缓存时什么都不做
+    """
+    _shared_masks.pop(surface, None)
+
+
+class DebugOverlay:
+    """
+    DEBUG图层: 在一帧中收集所有实体的DEBUG图元 (矩形框, 直线, 文字), 最后一次性绘制到可复用的透明Surface上再输出
+
+    `c.DEBUG`打开时, `EntityLike.draw_debug`把图元加入模块的`debug_overlay`;
+    每帧只在`Core.flip`输出之前通过`flush_debug_overlay`绘制一次 (`SceneLike`会自动登记到`Core.flip_hooks`),
+    因此所有图层的DEBUG框都在最上面, 不会被更高的图层遮挡。
+
+    Attributes
+    ---
+    color : ColorValue
+        图元的颜色
+    glyph_cache : assets.TextCache
+        单个字符的渲染缓存 (有数量上限), 文字由字符拼接而成
+    pending_count : int
+        已收集还没有绘制的图元数量
+
+    Methods
+    ---
+    add_rect(self, rect: pygame.Rect) -> None
+        收集矩形框
+    add_line(self, start: tuple[int, int], end: tuple[int, int]) -> None
+        收集直线
+    add_label(self, text: str, position: tuple[int, int]) -> None
+        收集文字 (左上角在`position`)
+    draw(self, surface: pygame.Surface) -> None
+        把收集的图元一次性绘制到`surface`上, 并清空
+    clear(self) -> None
+        清空收集的图元
+    """
+
+    # attributes
+    __rects: List[pygame.Rect]
+    __lines: List[Tuple[Tuple[int, int], Tuple[int, int]]]
+    __labels: List[Tuple[str, Tuple[int, int]]]
+    __surface: Optional[pygame.Surface]
+    color: c.ColorValue
+    glyph_cache: assets.TextCache
+
+    @property
+    def pending_count(self) -> int:
+        """已收集还没有绘制的图元数量"""
+        return len(self.__rects) + len(self.__lines) + len(self.__labels)
+
+    def __init__(self, color: c.ColorValue = (255, 0, 0), max_glyphs: int = 256):
+        """
+        Parameters
+        ---
+        color : ColorValue, default = (255, 0, 0)
+            图元的颜色
+        max_glyphs : int, default = 256
+            最多缓存的字符数量
+        """
+        self.color: c.ColorValue = color
+        self.glyph_cache: assets.TextCache = assets.TextCache(max_glyphs)
+        self.__rects: List[pygame.Rect] = []
+        self.__lines: List[Tuple[Tuple[int, int], Tuple[int, int]]] = []
+        self.__labels: List[Tuple[str, Tuple[int, int]]] = []
+        self.__surface: Optional[pygame.Surface] = None
+
+    def add_rect(self, rect: pygame.Rect) -> None:
+        """收集矩形框 (宽度为1)"""
+        self.__rects.append(rect)
+
+    def add_line(self, start: Tuple[int, int], end: Tuple[int, int]) -> None:
+        """收集直线 (宽度为1)"""
+        self.__lines.append((start, end))
+
+    def add_label(self, text: str, position: Tuple[int, int]) -> None:
+        """收集文字, 左上角在`position`"""
+        self.__labels.append((text, position))
+
+    def draw(self, surface: pygame.Surface) -> None:
+        """
+        把收集的图元一次性绘制到`surface`上, 并清空。没有图元时什么都不做
+
+        Notes
+        ---
+        图元先画到与`surface`同样大小的透明Surface (大小不变时复用) 上, 再用一次`blit`输出。
+        文字按字符从`self.glyph_cache`取出后用一次`blits`绘制。
+        """
+        if not self.pending_count:
+            return
+        overlay = self.__surface
+        if overlay is None or overlay.get_size() != surface.get_size():
+            overlay = self.__surface = pygame.Surface(
+                surface.get_size(), pygame.SRCALPHA
+            )
+        overlay.fill((0, 0, 0, 0))
+
+        color = self.color
+        for rect in self.__rects:
+            pygame.draw.rect(overlay, color, rect, width=1)
+        for start, end in self.__lines:
+            pygame.draw.line(overlay, color, start, end, width=1)
+        font = utils.get_debug_font()
+        glyphs: Dict[str, Tuple[pygame.Surface, int]] = {}  # 这一帧用到的字符
+        blit_items: List[Tuple[pygame.Surface, Tuple[int, int]]] = []
+        for text, (x, y) in self.__labels:
+            for char in text:
+                glyph = glyphs.get(char)
+                if glyph is None:
+                    image = self.glyph_cache.render(font, char, color)
+                    glyph = glyphs[char] = (image, image.get_width())
+                blit_items.append((glyph[0], (x, y)))
+                x += glyph[1]
+        overlay.blits(blit_items, doreturn=False)
+
+        surface.blit(overlay, (0, 0))
+        self.clear()
+
+    def clear(self) -> None:
+        """清空收集的图元"""
+        self.__rects.clear()
+        self.__lines.clear()
+        self.__labels.clear()
+
+
+debug_overlay: DebugOverlay = DebugOverlay()
+
+
+def flush_debug_overlay(core: Core) -> None:
+    """
+    把`debug_overlay`收集的图元绘制到窗口上, 用于`Core.flip_hooks`
+
+    Examples
+    ---
+    ```
+    # 不使用场景时, 手动登记一次
+    Core().flip_hooks.append(flush_debug_overlay)
+    ```
+    """
+    debug_overlay.draw(core.window)
+
+
+class TrackedRect(pygame.Rect):
+    """
+    修改时会发出通知的`pygame.Rect`
+
+    Attributes
+    ---
+    on_change : Optional[() -> None], default = None
+        修改 (设置属性, 以及`move_ip`等原地修改方法) 后调用的函数
+
+    Notes
+    ---
+    `move`, `copy`等方法返回的新矩形不会继承`on_change`。
+    """
+
+    on_change: Optional[Callable[[], None]] = None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        on_change = self.on_change
+        if on_change is not None and name != "on_change":
+            on_change()
+
+
+class Layer(list):
+    """
+    图层 (成员列表), 记录修改次数`version`, 并把成员的增删通知给`on_change`
+
+    Attributes
+    ---
+    version : int
+        修改次数, 每次增删改成员都会增加
+    on_change : Optional[(added, removed) -> None], default = None
+        修改后调用的函数 (`SceneLike`用它增量更新图层的空间索引)。
+        `added`是加在末尾的新成员, `removed`是被删除的成员;
+        改变了已有成员顺序的修改 (`insert`到中间, `sort`, `reverse`, 赋值等) 传入`(None, None)`, 表示需要重新读取整个图层
+
+    Notes
+    ---
+    与`list`用法相同。同一个成员在一个图层中最多出现一次。
+    """
+
+    version: int = 0
+    on_change: Optional[
+        Callable[[Optional[Sequence[Any]], Optional[Sequence[Any]]], None]
+    ] = None
+
+    def __changed(
+        self, added: Optional[Sequence[Any]], removed: Optional[Sequence[Any]]
+    ) -> None:
+        self.version += 1
+        on_change = self.on_change
+        if on_change is not None:
+            on_change(added, removed)
+
+    def append(self, item: Any) -> None:
+        super().append(item)
+        self.__changed((item,), ())
+
+    def extend(self, items: Iterable[Any]) -> None:
+        items = list(items)
+        super().extend(items)
+        self.__changed(items, ())
+
+    def __iadd__(self, items: Iterable[Any]) -> "Layer":
+        self.extend(items)
+        return self
+
+    def insert(self, i: int, item: Any) -> None:
+        at_end = i >= len(self)
+        super().insert(i, item)
+        if at_end:
+            self.__changed((item,), ())
+        else:
+            self.__changed(None, None)
+
+    def remove(self, item: Any) -> None:
+        super().remove(item)
+        self.__changed((), (item,))
+
+    def pop(self, i: int = -1) -> Any:
+        item = super().pop(i)
+        self.__changed((), (item,))
+        return item
+
+    def clear(self) -> None:
+        removed = list(self)
+        super().clear()
+        self.__changed((), removed)
+
+    def __delitem__(self, i: Union[int, slice]) -> None:
+        removed = self[i] if isinstance(i, slice) else (self[i],)
+        super().__delitem__(i)
+        self.__changed((), removed)
+
+    def __setitem__(self, i: Union[int, slice], value: Any) -> None:
+        super().__setitem__(i, value)
+        self.__changed(None, None)
+
+    def __imul__(self, n: int) -> "Layer":
+        super().__imul__(n)
+        self.__changed(None, None)
+        return self
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self.__changed(None, None)
+
+    def reverse(self) -> None:
+        super().reverse()
+        self.__changed(None, None)
+
+
+def _notify_after(
+    cls: type, names: Tuple[str, ...], notify: Callable[[Any], None]
+) -> None:
+    """包装`cls`的原地修改方法, 调用后执行`notify(self)`"""
+
+    def wrap(method):
+        def wrapper(self, *args, **kwargs):
+            res = method(self, *args, **kwargs)
+            notify(self)
+            return res
+
+        wrapper.__name__ = method.__name__
+        wrapper.__doc__ = method.__doc__
+        return wrapper
+
+    for name in names:
+        setattr(cls, name, wrap(getattr(cls, name)))
+
+
+def _rect_changed(rect: TrackedRect) -> None:
+    on_change = rect.on_change
+    if on_change is not None:
+        on_change()
+
+
+_notify_after(
+    TrackedRect,
+    (
+        "move_ip",
+        "inflate_ip",
+        "scale_by_ip",
+        "clamp_ip",
+        "union_ip",
+        "unionall_ip",
+        "update",
+        "normalize",
+        "__setitem__",
+    ),
+    _rect_changed,
+)
 
 
 class EntityLike(ListenerLike, pygame.sprite.Sprite):
@@ -51,10 +410,16 @@ class EntityLike(ListenerLike, pygame.sprite.Sprite):
     ---
     mask : pygame.Mask:
         返回图像的掩码, 用于碰撞检测
-    rect : pygame.Rect
-        实体的矩形区域, 用于定位和碰撞检测
+    rect : TrackedRect
+        实体的矩形区域, 用于定位和碰撞检测。修改时会通知`add_rect_observer`登记的函数
     image : pygame.Surface
         实体图像
+    has_image : bool
+        是否有图像 (`image`不是占位的透明图像)
+    cullable : bool, default = True
+        类属性, 是否允许`SceneLike`在实体的矩形不在相机范围内时跳过绘制。绘制范围超出`rect`的子类应该设置为False
+    render_version : int
+        外观版本, 调用`touch`时增加。脏矩形模式下, 版本变化的实体会被重绘
 
     ---
 
@@ -69,13 +434,55 @@ class EntityLike(ListenerLike, pygame.sprite.Sprite):
 
     Methods
     -------
+    invalidate_mask()
+        原地修改了图像的像素后, 使掩码缓存失效
+    get_blit_item(offset)
+        返回`(image, 位置)`, 用于`Surface.blits`批量绘制
+    touch()
+        报告外观在原地发生了变化 (脏矩形模式下会被重绘)
+    get_render_state()
+        返回决定外观的状态`(image, render_version)`
+    add_rect_observer(callback)
+        登记`rect`被修改时调用的函数
+    remove_rect_observer(callback)
+        取消登记`rect`被修改时调用的函数
     draw@DRAW
         在屏幕上绘制实体。
     """
 
     # attributes
-    rect: pygame.Rect
+    __rect: TrackedRect
+    __rect_observers: Dict[Callable[["EntityLike"], None], None]
     __image: Optional[pygame.Surface]
+    __mask: Optional[pygame.Mask]
+    cullable: bool = True
+    render_version: int
+
+    @property
+    def rect(self) -> TrackedRect:
+        """
+        实体的矩形区域, 用于定位和碰撞检测
+
+        Notes
+        ---
+        原地修改 (比如`self.rect.x += 1`) 与重新设置都会通知`add_rect_observer`登记的函数。
+        只能设置为`TrackedRect` (不会复制, 之后原地修改传入的矩形同样会移动实体),
+        设置为普通的`pygame.Rect`会抛出`TypeError`, 因为之后对它的修改无法被跟踪;
+        用普通矩形移动实体请使用`self.rect.update(rect)`。
+        """
+        return self.__rect
+
+    @rect.setter
+    def rect(self, rect: TrackedRect) -> None:
+        if not isinstance(rect, TrackedRect):
+            raise TypeError(
+                "EntityLike.rect only accepts a TrackedRect (kept as is, not copied). "
+                "Use `entity.rect.update(rect)` to move an entity to a pygame.Rect."
+            )
+        self.__rect.on_change = None
+        rect.on_change = self.__notify_rect_observers
+        self.__rect = rect
+        self.__notify_rect_observers()
 
     @property
     def mask(self) -> pygame.Mask:
@@ -89,8 +496,21 @@ class EntityLike(ListenerLike, pygame.sprite.Sprite):
         Notes
         ---
         此变量根据`self.image`生成, 不可修改
+
+        掩码按Surface缓存, 使用相同Surface的实体共享同一个掩码 (`get_shared_mask`),
+        因此任何一个实体调用`invalidate_mask`后, 其他使用该Surface的实体也会得到新的掩码。
+        子类重写了`image`属性时, 使用重写后的`self.image`。
+        没有图像时, 返回`self.rect`大小的空掩码 (不会创建透明图像)。
         """
-        return pygame.mask.from_surface(self.image)
+        if type(self).image is not EntityLike.image:
+            return get_shared_mask(self.image)
+        if self.__image is None:
+            mask = self.__mask
+            size = self.rect.size
+            if mask is None or mask.get_size() != size:
+                mask = self.__mask = pygame.Mask(size)
+            return mask
+        return get_shared_mask(self.__image)
 
     @property
     def image(self) -> pygame.Surface:
@@ -102,6 +522,11 @@ class EntityLike(ListenerLike, pygame.sprite.Sprite):
         Returns
         -------
         pygame.Surface
+
+        Notes
+        ---
+        与之前一样, 没有图像时每次返回新的透明图像 (调用者可以在上面绘制, 不影响其他实体)。
+        框架内部的绘制、掩码等路径通过`self.has_image`跳过没有图像的实体, 不会读取该属性。
         """
         if self.__image is None:
             return pygame.Surface(self.rect.size, pygame.SRCALPHA)
@@ -110,6 +535,20 @@ class EntityLike(ListenerLike, pygame.sprite.Sprite):
     @image.setter
     def image(self, image: Optional[pygame.Surface]):
         self.__image = image
+        self.__mask = None
+
+    @property
+    def has_image(self) -> bool:
+        """
+        是否有图像。没有图像的实体 (比如触发区域, 碰撞箱) 绘制时不会调用`blit`
+
+        Notes
+        ---
+        子类重写了`image`属性时, 总是视为有图像
+        """
+        if type(self).image is EntityLike.image:
+            return self.__image is not None
+        return True
 
     def __init__(
         self,
@@ -123,7 +562,7 @@ class EntityLike(ListenerLike, pygame.sprite.Sprite):
         Parameters
         ---
         rect : pygame.Rect
-            实体的矩形区域, 用于定位和碰撞检测
+            实体的矩形区域, 用于定位和碰撞检测。`TrackedRect`直接使用, 普通的`pygame.Rect`会被复制为`TrackedRect`
         image : Optional[pygame.Surface], optional, default = None
             实体图像, 传入None则会被视作`rect`大小的完全透明图像。
         post_api : (EventLike) -> None, optional, default = None
@@ -134,8 +573,96 @@ class EntityLike(ListenerLike, pygame.sprite.Sprite):
         super().__init__(post_api=post_api, listen_receivers=listen_receivers)
         pygame.sprite.Sprite.__init__(self)
 
-        self.rect: pygame.Rect = rect
+        self.__rect_observers: Dict[Callable[["EntityLike"], None], None] = {}
+        if not isinstance(rect, TrackedRect):
+            rect = TrackedRect(rect)
+        rect.on_change = self.__notify_rect_observers
+        self.__rect: TrackedRect = rect
         self.__image: Optional[pygame.Surface] = image
+        self.__mask: Optional[pygame.Mask] = None
+        self.render_version: int = 0
+
+    def touch(self) -> None:
+        """
+        报告外观在原地发生了变化 (比如原地修改了图像像素, 自定义`draw`绘制的内容变化), 增加`self.render_version`
+
+        Notes
+        ---
+        设置`self.image`与`self.rect`不需要调用该方法
+        """
+        self.render_version += 1
+
+    def get_render_state(self) -> Tuple[Optional[pygame.Surface], int]:
+        """
+        返回决定实体外观的状态 (不包括位置), 用于脏矩形模式判断实体是否需要重绘
+
+        Returns
+        ---
+        tuple[Optional[pygame.Surface], int]
+            `(image, render_version)`, 图像按对象比较
+        """
+        if type(self).image is EntityLike.image:
+            return self.__image, self.render_version
+        return self.image, self.render_version
+
+    def add_rect_observer(self, callback: Callable[["EntityLike"], None]) -> None:
+        """
+        登记`self.rect`被修改时调用的函数 (比如空间索引的更新函数)
+
+        Parameters
+        ---
+        callback : (EntityLike) -> None
+            被调用时传入实体本身
+        """
+        self.__rect_observers[callback] = None
+
+    def remove_rect_observer(self, callback: Callable[["EntityLike"], None]) -> None:
+        """
+        取消登记`self.rect`被修改时调用的函数, 没有登记过时什么都不做
+        """
+        self.__rect_observers.pop(callback, None)
+
+    def __notify_rect_observers(self) -> None:
+        observers = self.__rect_observers
+        if observers:
+            for callback in tuple(observers):
+                callback(self)
+
+    def get_blit_item(
+        self, offset: Tuple[int, int]
+    ) -> Optional[Tuple[pygame.Surface, Tuple[int, int]]]:
+        """
+        返回绘制实体所需的`(image, 位置)`, 没有图像时返回None
+
+        Parameters
+        ---
+        offset : tuple[int, int]
+            偏移量
+
+        Notes
+        ---
+        与`draw`的绘制结果相同 (不包括DEBUG框), 供`LayerLike.draw`批量绘制
+        """
+        image = self.__image
+        if image is None:
+            return None
+        rect = self.rect
+        return image, (rect.x + offset[0], rect.y + offset[1])
+
+    def invalidate_mask(self) -> None:
+        """
+        使掩码缓存失效 (包括该图像的共享掩码)
+
+        Notes
+        ---
+        只有原地修改了`self.image`的像素时才需要调用, 设置`self.image`会自动使缓存失效。
+        使用同一个Surface的其他实体同样会得到新的掩码。
+        """
+        image = self.image if type(self).image is not EntityLike.image else self.__image
+        if image is not None:
+            drop_shared_mask(image)
+        self.__mask = None
+        self.touch()
 
     @listening(c.EventCode.DRAW)
     def draw(self, event: EventLike):
@@ -149,25 +676,213 @@ class EntityLike(ListenerLike, pygame.sprite.Sprite):
                 画布
             offset : tuple[int, int]
                 偏移量
+
+        Notes
+        ---
+        没有图像 (`self.has_image`为False) 时跳过绘制
         """
+        has_image = self.has_image
+        if not has_image and not c.DEBUG:
+            return
         body: c.DrawEventBody = event.body
         surface: pygame.Surface = body["surface"]
         offset: Tuple[int, int] = body["offset"]
 
         rect = self.rect.move(offset)
-        surface.blit(self.image, rect)
+        if has_image:
+            surface.blit(self.image, rect)
 
         if c.DEBUG:
-            # DEBUG框绘制 (红色碰撞箱, 连接到原点的直线, 碰撞箱坐标)
-            RED = (255, 0, 0)
-            # rect
-            pygame.draw.rect(surface, RED, rect, width=1)
-            pygame.draw.line(surface, RED, rect.topleft, offset, width=1)
-            # font
-            text_rect: pygame.Rect = rect.copy()
-            text_rect.topleft = rect.bottomleft
-            text_surface = utils.debug_text(f"{self.rect.topleft+self.rect.size}")
-            surface.blit(text_surface, text_rect)
+            self.draw_debug(offset)
+
+    def draw_debug(self, offset: Tuple[int, int]) -> None:
+        """
+        把DEBUG框 (红色碰撞箱, 连接到原点的直线, 碰撞箱坐标) 加入`debug_overlay`, 由它在一帧的最后统一绘制
+
+        Parameters
+        ---
+        offset : tuple[int, int]
+            偏移量
+        """
+        rect = self.rect.move(offset)
+        debug_overlay.add_rect(rect)
+        debug_overlay.add_line(rect.topleft, offset)
+        debug_overlay.add_label(f"{self.rect.topleft+self.rect.size}", rect.bottomleft)
+
+
+class SpatialIndex:
+    """
+    实体的空间索引 (空间哈希): 把世界划分为`cell_size`大小的格子, 记录每个格子内有哪些实体
+
+    实体加入索引后, 它的`rect`被修改时 (见`EntityLike.add_rect_observer`) 会自动更新所在的格子。
+
+    Methods
+    ---
+    add(self, entity: EntityLike) -> None
+        加入实体
+    remove(self, entity: EntityLike) -> None
+        移除实体
+    update(self, entity: EntityLike) -> None
+        根据实体当前的`rect`更新所在格子
+    query(self, rect: pygame.Rect) -> set[EntityLike]
+        返回所在格子与`rect`重叠的实体 (可能包含不与`rect`相交的实体)
+    clear(self) -> None
+        清空索引
+
+    Notes
+    ---
+    `query`的结果是粗略的 (以格子为单位), 用于剔除明显不可见的实体。
+    """
+
+    # attributes
+    __cell_size: int
+    __cells: Dict[Tuple[int, int], Set["EntityLike"]]
+    __entity_cells: Dict["EntityLike", Tuple[int, int, int, int]]
+
+    @property
+    def cell_size(self) -> int:
+        """格子边长 (像素)"""
+        return self.__cell_size
+
+    def __init__(self, cell_size: int = 256):
+        """
+        Parameters
+        ---
+        cell_size : int, default = 256
+            格子边长 (像素)
+        """
+        self.__cell_size: int = cell_size
+        self.__cells: Dict[Tuple[int, int], Set[EntityLike]] = {}
+        self.__entity_cells: Dict[EntityLike, Tuple[int, int, int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__entity_cells)
+
+    def __contains__(self, entity: "EntityLike") -> bool:
+        return entity in self.__entity_cells
+
+    def __cell_range(self, rect: pygame.Rect) -> Tuple[int, int, int, int]:
+        """返回`rect`覆盖的格子范围`(x0, y0, x1, y1)` (包含两端)"""
+        size = self.__cell_size
+        return (
+            rect.left // size,
+            rect.top // size,
+            max(rect.left, rect.right - 1) // size,
+            max(rect.top, rect.bottom - 1) // size,
+        )
+
+    def __put(self, entity: "EntityLike", cells: Tuple[int, int, int, int]) -> None:
+        x0, y0, x1, y1 = cells
+        grid = self.__cells
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                cell = grid.get((x, y))
+                if cell is None:
+                    cell = grid[(x, y)] = set()
+                cell.add(entity)
+
+    def __take(self, entity: "EntityLike", cells: Tuple[int, int, int, int]) -> None:
+        x0, y0, x1, y1 = cells
+        grid = self.__cells
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                cell = grid[(x, y)]
+                cell.discard(entity)
+                if not cell:
+                    del grid[(x, y)]
+
+    def add(self, entity: "EntityLike") -> None:
+        """
+        加入实体, 并登记到实体的`rect`修改通知上。已经在索引中时什么都不做
+        """
+        if entity in self.__entity_cells:
+            return
+        cells = self.__cell_range(entity.rect)
+        self.__entity_cells[entity] = cells
+        self.__put(entity, cells)
+        entity.add_rect_observer(self.update)
+
+    def remove(self, entity: "EntityLike") -> None:
+        """
+        移除实体, 并取消登记实体的`rect`修改通知。不在索引中时什么都不做
+        """
+        cells = self.__entity_cells.pop(entity, None)
+        if cells is None:
+            return
+        self.__take(entity, cells)
+        entity.remove_rect_observer(self.update)
+
+    def update(self, entity: "EntityLike") -> None:
+        """
+        根据实体当前的`rect`更新所在格子 (所在格子没有变化时什么都不做)
+        """
+        old_cells = self.__entity_cells.get(entity)
+        if old_cells is None:
+            return
+        cells = self.__cell_range(entity.rect)
+        if cells == old_cells:
+            return
+        self.__take(entity, old_cells)
+        self.__entity_cells[entity] = cells
+        self.__put(entity, cells)
+
+    def query(self, rect: pygame.Rect) -> Set["EntityLike"]:
+        """
+        返回所在格子与`rect`重叠的实体
+
+        Parameters
+        ---
+        rect : pygame.Rect
+            查询范围 (比如相机范围)
+
+        Returns
+        ---
+        set[EntityLike]
+            候选实体 (新集合)
+        """
+        x0, y0, x1, y1 = self.__cell_range(rect)
+        grid = self.__cells
+        res: Set[EntityLike] = set()
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(grid):  # 查询范围比已有的格子还多
+            for (x, y), cell in grid.items():
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    res |= cell
+            return res
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                cell = grid.get((x, y))
+                if cell:
+                    res |= cell
+        return res
+
+    def clear(self) -> None:
+        """
+        清空索引, 并取消登记所有实体的`rect`修改通知
+        """
+        for entity in self.__entity_cells:
+            entity.remove_rect_observer(self.update)
+        self.__entity_cells.clear()
+        self.__cells.clear()
+
+
+_plain_entity_classes: Dict[type, bool] = {}
+
+
+def _is_plain_entity(cls: type) -> bool:
+    """
+    判断类是否是"普通"实体: 只使用`EntityLike.draw`处理DRAW事件, 且没有重写`listen`与`image`。
+    普通实体可以由`LayerLike.draw`直接批量绘制, 不需要经过事件分发。(每个类只计算一次)
+    """
+    res = _plain_entity_classes.get(cls)
+    if res is None:
+        res = _plain_entity_classes[cls] = (
+            issubclass(cls, EntityLike)
+            and cls.listen is ListenerLike.listen
+            and cls.draw is EntityLike.draw
+            and cls.image is EntityLike.image
+            and get_listening_table(cls).get(c.EventCode.DRAW) == ("draw",)
+        )
+    return res
 
 
 class LayerLike(GroupLike):
@@ -176,8 +891,8 @@ class LayerLike(GroupLike):
 
     Attributes
     ----------
-    layers : collections.defaultdict[int, List[ListenerLike]]
-        图层。键为整数, 代表绘制顺序 (从小到大)
+    layers : SortedDefaultDict[int, List[ListenerLike]]
+        图层。键为整数, 代表绘制顺序 (从小到大), 键的顺序增量维护。新图层是`Layer`
 
     ---
 
@@ -214,6 +929,9 @@ class LayerLike(GroupLike):
     post(self, event: EventLike) -> None
         发布事件 (`通过self.__post_api`)  (一般是发布到Core的事件队列上)
 
+    draw_layer(self, listeners: Iterable[ListenerLike], surface: pygame.Surface, offset: tuple[int, int]) -> None
+        按顺序绘制一个图层中的成员
+
     Listening Methods
     ---
     draw@DRAW
@@ -226,7 +944,8 @@ class LayerLike(GroupLike):
     """
 
     # attributes
-    layers: collections.defaultdict[int, List[ListenerLike]]
+    layers: SortedDefaultDict[int, List[ListenerLike]]
+    __draw_events: FrameRecycler[EventLike]
 
     def __init__(
         self,
@@ -243,10 +962,14 @@ class LayerLike(GroupLike):
             监听的接收者集合
         """
         super().__init__(post_api=post_api, listen_receivers=listen_receivers)
-        self.layers: collections.defaultdict[int, List[ListenerLike]] = (
-            collections.defaultdict(list)
+        self.layers: SortedDefaultDict[int, List[ListenerLike]] = SortedDefaultDict(
+            Layer
         )
         self.is_activated = False
+        self.__draw_events: FrameRecycler[EventLike] = FrameRecycler(
+            lambda: EventLike.draw_event(None),
+            name=f"{type(self).__name__} layer DRAW event",
+        )
 
     def listen(self, event: EventLike):
         """
@@ -277,17 +1000,63 @@ class LayerLike(GroupLike):
         Notes
         ---
         根据图层的键从小到大排序图层, 逐层处理。每个图层中的对象按照列表顺序接收DRAW事件。
+        转发给成员的DRAW事件每帧都是同一个对象 (见`FrameRecycler`)。
+
+        普通实体 (只使用`EntityLike.draw`绘制的实体) 不经过事件分发, 而是收集`(image, 位置)`后
+        用一次`surface.blits`批量绘制; 遇到其他成员时先绘制已收集的实体, 因此绘制顺序不变。
+        批量绘制不检查成员的`listen_receivers` (DRAW事件的接收者总是"任何人")。
+
+        `c.DEBUG`打开时, 普通实体的DEBUG框同样收集到`debug_overlay`, 在`Core.flip`之前一次性绘制。
         """
         body: c.DrawEventBody = event.body
-        surface = body["surface"]
-        offset = body["offset"]
-        draw_event = EventLike.draw_event(surface, offset=offset)
+        surface: pygame.Surface = body["surface"]
+        offset: Tuple[int, int] = body["offset"]
+
+        layers = self.layers
+        for lid in layers.sorted_keys():
+            layer = layers.get(lid)
+            if layer:
+                self.draw_layer(layer, surface, offset)
 
-        layer_ids = sorted(self.layers.keys())
-        for lid in layer_ids:
-            layer = self.layers[lid]
-            for listener in layer:
-                listener.listen(draw_event)
+    def draw_layer(
+        self,
+        listeners: Iterable[ListenerLike],
+        surface: pygame.Surface,
+        offset: Tuple[int, int],
+    ) -> None:
+        """
+        按顺序绘制一个图层中的成员 (批量绘制普通实体, 其他成员接收DRAW事件)
+
+        Parameters
+        ---
+        listeners : Iterable[ListenerLike]
+            需要绘制的成员
+        surface : pygame.Surface
+            画布
+        offset : tuple[int, int]
+            偏移量
+        """
+        draw_event: Optional[EventLike] = None
+        debug: bool = c.DEBUG
+        blit_items: List[Tuple[pygame.Surface, Tuple[int, int]]] = []
+        for listener in listeners:
+            if _is_plain_entity(type(listener)):
+                item = listener.get_blit_item(offset)
+                if item is not None:
+                    blit_items.append(item)
+                if debug:
+                    listener.draw_debug(offset)
+                continue
+            if blit_items:
+                surface.blits(blit_items, doreturn=False)
+                blit_items.clear()
+            if draw_event is None:
+                draw_event = self.__draw_events.get()
+                draw_event.body.surface = surface
+                draw_event.body.offset = offset
+            listener.listen(draw_event)
+        if blit_items:
+            surface.blits(blit_items, doreturn=False)
 
     @listening(c.EventCode.KILL)
     def kill(self, event: EventLike):
@@ -306,11 +1075,77 @@ class LayerLike(GroupLike):
         """
         body: c.KillEventBody = event.body
         uuid = body["suicide"]
-        for i in self.layers:
-            self.layers[i][:] = [j for j in self.layers[i] if j.uuid != uuid]
+        for layer in self.layers.values():
+            for j in [j for j in layer if j.uuid == uuid]:  # 逐个删除, 图层可以增量更新
+                layer.remove(j)
         super().kill(event)
 
 
+class _LayerIndex:
+    """
+    `SceneLike`为一个图层维护的剔除数据: 可剔除实体的空间索引, 不可剔除的成员, 以及成员在图层中的顺序
+
+    通过`Layer.on_change`增量更新: 在末尾加入与删除成员只修改这些成员, 不会遍历整个图层;
+    改变已有成员顺序的修改才重新读取整个图层。
+    """
+
+    __slots__ = ("layer", "index", "always", "order", "next_order")
+
+    def __init__(self, layer: Layer, cell_size: int):
+        self.layer: Layer = layer
+        self.index: SpatialIndex = SpatialIndex(cell_size)
+        self.always: Set[ListenerLike] = set()
+        self.order: Dict[ListenerLike, int] = {}
+        self.next_order: int = 0
+        self.on_change(layer, ())
+        layer.on_change = self.on_change
+
+    def __add(self, listener: ListenerLike) -> None:
+        if isinstance(listener, EntityLike) and listener.cullable:
+            self.index.add(listener)
+        else:
+            self.always.add(listener)
+
+    def __remove(self, listener: ListenerLike) -> None:
+        self.index.remove(listener)
+        self.always.discard(listener)
+
+    def on_change(
+        self,
+        added: Optional[Sequence[ListenerLike]],
+        removed: Optional[Sequence[ListenerLike]],
+    ) -> None:
+        """
+        图层成员变化时调用 (见`Layer.on_change`)
+        """
+        order = self.order
+        if added is None:  # 顺序变化, 重新编号; 只把增删的成员加入或移出空间索引
+            new_order = {listener: i for i, listener in enumerate(self.layer)}
+            for listener in order.keys() - new_order.keys():
+                self.__remove(listener)
+            for listener in new_order.keys() - order.keys():
+                self.__add(listener)
+            self.order = new_order
+            self.next_order = len(new_order)
+            return
+        for listener in removed:
+            if order.pop(listener, None) is not None:
+                self.__remove(listener)
+        for listener in added:
+            if listener not in order:
+                order[listener] = self.next_order
+                self.next_order += 1
+                self.__add(listener)
+
+    def close(self) -> None:
+        """
+        停止跟踪图层, 并清空空间索引
+        """
+        if self.layer.on_change == self.on_change:
+            self.layer.on_change = None
+        self.index.clear()
+
+
 class SceneLike(LayerLike):
     """
     场景类, 主要提供相机坐标, 图层控制, 以及进入与退出
@@ -323,8 +1158,18 @@ class SceneLike(LayerLike):
         相机坐标 (绘制位置的负偏移量), 初始值为`(0, 0)`
     is_activated : bool
         场景是否被激活：调用`self.into`时设置为True, 调用`self.leave`时设置为False
-    layers : collections.defaultdict[int, List[ListenerLike]]
-        图层。键为整数, 代表绘制顺序 (从小到大)
+    layers : SortedDefaultDict[int, List[ListenerLike]]
+        图层。键为整数, 代表绘制顺序 (从小到大), 键的顺序增量维护
+    culling : bool, default = True
+        是否剔除不在相机范围内的实体 (不绘制)
+    culling_cell_size : int, default = 256
+        剔除所用空间索引的格子边长, 修改后在下一次绘制时重建图层的索引
+    culled_count : int
+        上一次绘制时被剔除的成员数量
+    drawn_count : int
+        上一次绘制时被绘制的成员数量 (没有被剔除的成员数量)
+    asset_paths : list[str]
+        场景需要的图像路径, `prefetch`时在后台预加载
 
     ---
 
@@ -345,6 +1190,8 @@ class SceneLike(LayerLike):
         进入场景
     leave()
         离开场景
+    prefetch()
+        在后台预加载场景需要的图像 (`self.asset_paths`)
 
     ---
 
@@ -371,7 +1218,7 @@ class SceneLike(LayerLike):
     Listening Methods
     ---
     draw@DRAW
-        根据图层顺序, 在画布上绘制实体
+        根据图层顺序, 在画布上绘制相机范围内的实体
 
     ---
 
@@ -382,8 +1229,16 @@ class SceneLike(LayerLike):
     # attributes
     __core: Core
     __camera_cord: Tuple[int, int]
+    __layer_indexes: Dict[int, "_LayerIndex"]
     is_activated: bool
-    layers: collections.defaultdict[int, List[ListenerLike]]
+    layers: SortedDefaultDict[int, List[ListenerLike]]
+    culling: bool
+    culling_cell_size: int
+    culled_count: int
+    drawn_count: int
+    asset_paths: List[str]
+    __drawn_states: Dict["EntityLike", Tuple]
+    __drawn_offset: Optional[Tuple[int, int]]
 
     @property
     def core(self):
@@ -428,10 +1283,18 @@ class SceneLike(LayerLike):
         )
         self.__core: Core = core
         self.__camera_cord: Tuple[int, int] = (0, 0)
-        self.layers: collections.defaultdict[int, List[ListenerLike]] = (
-            collections.defaultdict(list)
+        self.layers: SortedDefaultDict[int, List[ListenerLike]] = SortedDefaultDict(
+            Layer
         )
         self.is_activated = False
+        self.culling: bool = True
+        self.culling_cell_size: int = 256
+        self.culled_count: int = 0
+        self.drawn_count: int = 0
+        self.asset_paths: List[str] = []
+        self.__layer_indexes: Dict[int, _LayerIndex] = {}
+        self.__drawn_states: Dict[EntityLike, Tuple] = {}
+        self.__drawn_offset: Optional[Tuple[int, int]] = None
 
     def __enter__(self):
         """
@@ -449,18 +1312,43 @@ class SceneLike(LayerLike):
 
     def into(self) -> None:
         """
-        进入场景, `self.is_activated`设置为`True`
+        进入场景, `self.is_activated`设置为`True`, 并登记到`self.core`上 (参与pygame事件过滤)。
+        同时把`flush_debug_overlay`登记到`self.core.flip_hooks` (只登记一次)
         """
         self.is_activated = True
+        self.core.attach(self)
+        if flush_debug_overlay not in self.core.flip_hooks:
+            self.core.flip_hooks.append(flush_debug_overlay)
+        self.__drawn_states = {}  # 脏矩形模式下, 进入场景后第一帧整个窗口重绘
+        self.__drawn_offset = None
         logger.info(f"Into {self.__class__}.")
 
     def leave(self) -> None:
         """
-        离开场景, `self.is_activated`设置为`False`
+        离开场景, `self.is_activated`设置为`False`, 并取消在`self.core`上的登记
         """
         self.is_activated = False
+        self.core.detach(self)
         logger.info(f"Leave {self.__class__}.")
 
+    def prefetch(self) -> List["assets.AssetHandle"]:
+        """
+        在后台预加载场景需要的图像 (`self.asset_paths`), 避免切换场景时同步解码造成卡顿
+
+        可以重复调用 (已经加载或正在加载的图像不会重复解码), 比如玩家每次移动到传送门附近时:
+        ```
+        if player.rect.inflate(200, 200).colliderect(portal.rect):
+            wild_scene.prefetch()
+        ```
+        需要每帧调用`assets.default_streamer.update()`完成加载。
+
+        Returns
+        ---
+        list[assets.AssetHandle]
+            每张图像的句柄
+        """
+        return assets.default_streamer.prefetch(self.asset_paths)
+
     @listening(c.EventCode.DRAW)
     def draw(self, event: EventLike):
         """
@@ -481,11 +1369,110 @@ class SceneLike(LayerLike):
         Notes
         ---
         根据图层的键从小到大排序图层, 逐层处理。每个图层中的对象按照列表顺序接收DRAW事件。
+
+        Culling
+        ---
+        `self.culling`打开时, 矩形不在相机范围 (`camera_cord`与`core.winsize`) 内的实体不会被绘制。
+        每个`Layer`图层维护一个空间索引 (`SpatialIndex`), 实体移动时自动更新, 图层成员变化 (`Layer.on_change`) 时只增删变化的成员;
+        因此绘制开销取决于屏幕内的实体数量, 而不是世界大小。
+        不是`Layer`的图层 (比如直接赋值的`list`)、非`EntityLike`成员、`cullable`为False的实体不会被剔除。
+        统计见`self.culled_count`与`self.drawn_count`。
+
+        Dirty Rect Mode
+        ---
+        `self.core.dirty_rect_mode`打开时, 绘制前比较每个实体的窗口位置与`get_render_state()`,
+        把变化前后的矩形 (以及离开视野的实体的矩形) 报告给`Core.mark_dirty`, 然后调用`Core.begin_dirty_draw`。
+        相机移动、存在非`EntityLike`成员或`cullable`为False的实体、`c.DEBUG`打开时, 整个窗口都会被重绘。
+        没有任何变化时跳过绘制。
+        """
+        surface: pygame.Surface = self.core.window
+        offset: Tuple[int, int] = utils.IntTupleOper.sub(0, self.camera_cord)
+        camera = pygame.Rect(self.camera_cord, self.core.winsize)
+        visible_layers: List[List[ListenerLike]] = []
+        culled = drawn = 0
+        layers = self.layers
+        for lid in layers.sorted_keys():
+            layer = layers.get(lid)
+            if not layer:
+                continue
+            visible = self.__get_visible(lid, layer, camera) if self.culling else layer
+            culled += len(layer) - len(visible)
+            drawn += len(visible)
+            visible_layers.append(visible)
+        self.culled_count = culled
+        self.drawn_count = drawn
+
+        if len(self.__layer_indexes) > len(layers):  # 清理已经删除的图层
+            for lid in [i for i in self.__layer_indexes if i not in layers]:
+                self.__layer_indexes.pop(lid).close()
+
+        if self.core.dirty_rect_mode:
+            self.__report_dirty(visible_layers, offset)
+            if self.core.begin_dirty_draw() is None:
+                return
+        for visible in visible_layers:
+            self.draw_layer(visible, surface, offset)
+
+    def __report_dirty(
+        self, visible_layers: List[List[ListenerLike]], offset: Tuple[int, int]
+    ) -> None:
         """
-        window = self.core.window
-        offset = utils.IntTupleOper.sub(0, self.camera_cord)
-        draw_event = EventLike.draw_event(window, offset=offset)
-        super().draw(draw_event)
+        比较成员与上一次绘制时的状态, 把变化的区域报告给`Core.mark_dirty`
+        """
+        core = self.core
+        if offset != self.__drawn_offset:
+            core.mark_dirty(core.window.get_rect())
+            self.__drawn_offset = offset
+        ox, oy = offset
+        old_states = self.__drawn_states
+        new_states: Dict[EntityLike, Tuple] = {}
+        whole_window = c.DEBUG  # DEBUG框覆盖整个窗口
+        for visible in visible_layers:
+            for listener in visible:
+                if not isinstance(listener, EntityLike) or not listener.cullable:
+                    whole_window = True
+                    continue
+                rect = listener.rect
+                state = (rect.x + ox, rect.y + oy, rect.w, rect.h)
+                state += listener.get_render_state()
+                new_states[listener] = state
+                old_state = old_states.pop(listener, None)
+                if old_state != state:
+                    if old_state is not None:
+                        core.mark_dirty(pygame.Rect(old_state[:4]))
+                    core.mark_dirty(pygame.Rect(state[:4]))
+        for old_state in old_states.values():  # 被删除或离开视野
+            core.mark_dirty(pygame.Rect(old_state[:4]))
+        if whole_window:
+            core.mark_dirty(core.window.get_rect())
+        self.__drawn_states = new_states
+
+    def __get_visible(
+        self, lid: int, layer: List[ListenerLike], camera: pygame.Rect
+    ) -> List[ListenerLike]:
+        """
+        返回图层中在相机范围内 (或不可剔除) 的成员, 保持图层顺序
+        """
+        if not isinstance(layer, Layer):
+            return layer
+        entry = self.__layer_indexes.get(lid)
+        if (
+            entry is None
+            or entry.layer is not layer
+            or entry.index.cell_size != self.culling_cell_size
+        ):
+            if entry is not None:
+                entry.close()
+            entry = self.__layer_indexes[lid] = _LayerIndex(
+                layer, self.culling_cell_size
+            )
+        if not len(entry.index):
+            return layer
+        visible = entry.index.query(camera)
+        if len(visible) + len(entry.always) == len(layer):
+            return layer
+        visible.update(entry.always)
+        return sorted(visible, key=entry.order.__getitem__)
 
 
 class TextEntity(EntityLike):
@@ -507,12 +1494,27 @@ class TextEntity(EntityLike):
         字体颜色
     back_ground : ColorValue
         背景颜色
+    text : str
+        当前的文本 (只读, 通过`set_text`设置)
+
+    Notes
+    ---
+    每一行通过`assets.default_text_cache`渲染 (相同的行不会重复渲染)。
     """
 
     # Attributes
     font: pygame.font.Font
     font_color: c.ColorValue
     back_ground: c.ColorValue
+    __text: Optional[str]
+    __style: Optional[Tuple]
+    __line_rects: List[Tuple[str, pygame.Rect]]
+    __text_surface: Optional[pygame.Surface]
+
+    @property
+    def text(self) -> str:
+        """当前的文本"""
+        return self.__text if self.__text is not None else ""
 
     @staticmethod
     def get_zh_font(font_size: int, *, bold=False, italic=False) -> pygame.font.Font:
@@ -528,22 +1530,19 @@ class TextEntity(EntityLike):
         italic : bool, default = False
             斜体 (仅当在系统中找到支持中文字体时生效)
 
+        Returns
+        ---
+        pygame.font.Font
+            共享的字体 (同样的参数返回同一个对象), 不要修改它的属性
+
         Notes
         ---
         中文字体查找顺序
-        SimHei, microsoftyahei, notosanscjk
-        """
-        available_fonts = pygame.font.get_fonts()
-        font_name = None
-        for i in ["microsoftyahei", "SimHei", "notosanscjk"]:
-            if i not in available_fonts:
-                continue
-            font_name = i
-            break
+        microsoftyahei, simhei, notosanscjk
 
-        if font_name is None:
-            return pygame.font.Font(None, font_size)
-        return pygame.font.SysFont(font_name, font_size, bold, italic)
+        使用`assets.default_fonts`: 只在第一次调用时扫描系统字体, Font对象按`(字号, 加粗, 斜体)`缓存。
+        """
+        return assets.default_fonts.get_font(font_size, bold=bold, italic=italic)
 
     def __init__(
         self,
@@ -561,7 +1560,7 @@ class TextEntity(EntityLike):
         rect : pygame.Rect
             文本框
         font : pygame.font.Font, default = None
-            字体
+            字体, 默认为24号的中文字体 (`get_zh_font(24)`)
         font_color : ColorValue, default  = (255, 255, 255)
             字体颜色
         back_ground : ColorValue, default  = (0, 0, 0, 0)
@@ -572,10 +1571,14 @@ class TextEntity(EntityLike):
             是否在设置文字时, 自动重新更新文本框大小
         """
         super().__init__(rect)
-        self.font: pygame.font.Font = font if font is not None else self.get_zh_font()
+        self.font: pygame.font.Font = font if font is not None else self.get_zh_font(24)
         self.font_color: c.ColorValue = font_color
         self.back_ground: c.ColorValue = back_ground
         self.dynamic_size: bool = dynamic_size
+        self.__text: Optional[str] = None
+        self.__style: Optional[Tuple] = None
+        self.__line_rects: List[Tuple[str, pygame.Rect]] = []
+        self.__text_surface: Optional[pygame.Surface] = None
         self.set_text(text)
 
     def set_text(self, text: str = "") -> None:
@@ -584,27 +1587,299 @@ class TextEntity(EntityLike):
 
         Notes
         ---
-        当`self.dynamic_size`为True时, 会自动更新文本框大小
+        - 当`self.dynamic_size`为True时, 会自动更新文本框大小
+        - 文本、字体、颜色与文本框大小都没有变化时什么都不做, 可以每帧调用
+        - 只有样式没有变化时, 原地重绘发生变化的行, 其余的行保持不变
         """
+        cache = assets.default_text_cache
+        style = (
+            self.font,
+            cache.color_key(self.font_color),
+            cache.color_key(self.back_ground),
+            self.dynamic_size,
+        )
+        surface = self.__text_surface
+        if (
+            text == self.__text
+            and style == self.__style
+            and surface is self.image
+            and (self.dynamic_size or surface.get_size() == self.rect.size)
+        ):
+            return
+
         # ===几何计算
-        line_width_list: list[int] = []
-        line_offset_list: list[int] = []
+        lines = text.splitlines()
+        rendered = [cache.render(self.font, line, style[1]) for line in lines]
+        line_rects: List[Tuple[str, pygame.Rect]] = []
         current_offset: int = 0
-        for line in text.splitlines():
-            line_offset_list.append(current_offset)
-            line_width, line_height = self.font.size(line)
-            current_offset += line_height
-            line_width_list.append(line_width)
-        max_width = max(line_width_list) if line_width_list else 0
+        for line, line_surface in zip(lines, rendered):
+            line_rects.append(
+                (line, line_surface.get_rect(topleft=(0, current_offset)))
+            )
+            current_offset += line_surface.get_height()
+        max_width = max((rect.width for _, rect in line_rects), default=0)
         # ===resize
         if self.dynamic_size:
             self.rect.size = (max_width, current_offset)
-        # ===文本框背景
-        text_surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
-        text_surface.fill(self.back_ground)
-        # ===绘制文本
-        for line, offset in zip(text.splitlines(), line_offset_list):
-            text_surface.blit(
-                self.font.render(line, True, self.font_color), (0, offset)
+
+        old_line_rects = self.__line_rects
+        if (
+            style == self.__style
+            and surface is self.image
+            and surface.get_size() == self.rect.size
+            and all(
+                old[1].y == new[1].y for old, new in zip(old_line_rects, line_rects)
             )
-        self.image = text_surface
+        ):
+            # ===只重绘变化的行 (每一行占据互不重叠的横条)
+            changed = False
+            for i in range(max(len(line_rects), len(old_line_rects))):
+                old = old_line_rects[i] if i < len(old_line_rects) else None
+                new = line_rects[i] if i < len(line_rects) else None
+                if old == new:
+                    continue
+                changed = True
+                for _, rect in filter(None, (old, new)):
+                    surface.fill(
+                        self.back_ground, (0, rect.y, surface.get_width(), rect.height)
+                    )
+                if new is not None:
+                    surface.blit(rendered[i], new[1])
+            if changed:
+                self.invalidate_mask()
+        else:
+            # ===文本框背景
+            surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            surface.fill(self.back_ground)
+            # ===绘制文本
+            for line_surface, (_, rect) in zip(rendered, line_rects):
+                surface.blit(line_surface, rect)
+            self.image = surface
+        self.__text = text
+        self.__style = style
+        self.__line_rects = line_rects
+        self.__text_surface = surface
+
+
+class TileMap(EntityLike):
+    """
+    瓦片地图图层: 用紧凑的二维数组储存瓦片ID, 按区块 (chunk) 预渲染, 每帧只绘制视野内的区块
+
+    Attributes
+    ---
+    tile_size : tuple[int, int]
+        瓦片大小 (像素)
+    grid_shape : tuple[int, int]
+        地图大小 (列数, 行数)
+    chunk_tiles : int
+        区块边长 (瓦片数)
+    tile_images : Sequence[Optional[pygame.Surface]]
+        瓦片图像, 下标为瓦片ID。图像为None的瓦片不绘制 (透明)
+    rendered_chunks : int
+        累计渲染区块的次数 (用于诊断)
+    rect : TrackedRect
+        地图范围 (像素), 左上角是地图的位置
+
+    Methods
+    ---
+    get_tile(self, col: int, row: int) -> int
+        获取瓦片ID
+    set_tile(self, col: int, row: int, tile_id: int) -> None
+        设置瓦片ID, 只重新渲染该瓦片所在的区块
+    fill(self, tile_id: int) -> None
+        用同一种瓦片填满地图
+    invalidate(self) -> None
+        使所有区块的缓存失效 (比如原地修改了瓦片图像)
+    draw@DRAW
+        绘制视野内的区块
+
+    Examples
+    ---
+    ```
+    tiles = [None, ground_image, wall_image]  # 0号瓦片为空
+    tile_map = TileMap((40, 40), (38, 25), tiles, tile_ids=rows)
+    scene.layers[-1].append(tile_map)
+    tile_map.set_tile(3, 4, 2)
+    ```
+
+    Notes
+    ---
+    - 瓦片ID储存在`array.array("H")`中 (0~65535), 按行储存。
+    - 区块在第一次进入视野时渲染并缓存, 修改瓦片只会使所在区块失效。
+    - `tile_images`中的图像会被直接绘制到区块上, 修改`tile_images`后需要调用`invalidate`。
+    """
+
+    # attributes
+    __tile_ids: array.array
+    __chunks: Dict[Tuple[int, int], pygame.Surface]
+    tile_size: Tuple[int, int]
+    grid_shape: Tuple[int, int]
+    chunk_tiles: int
+    tile_images: Sequence[Optional[pygame.Surface]]
+    rendered_chunks: int
+
+    def __init__(
+        self,
+        tile_size: Tuple[int, int],
+        grid_shape: Tuple[int, int],
+        tile_images: Sequence[Optional[pygame.Surface]],
+        *,
+        tile_ids: Optional[Iterable[Iterable[int]]] = None,
+        position: Tuple[int, int] = (0, 0),
+        chunk_tiles: int = 16,
+        post_api: Optional[PostEventApiLike] = None,
+        listen_receivers: Optional[Set[str]] = None,
+    ):
+        """
+        Parameters
+        ---
+        tile_size : tuple[int, int]
+            瓦片大小 (像素)
+        grid_shape : tuple[int, int]
+            地图大小 (列数, 行数)
+        tile_images : Sequence[Optional[pygame.Surface]]
+            瓦片图像, 下标为瓦片ID
+        tile_ids : Iterable[Iterable[int]], optional, default = None
+            初始瓦片ID (按行), 默认全部为0。行数与每行的长度必须与`grid_shape`一致, 否则抛出`ValueError`
+        position : tuple[int, int], default = (0, 0)
+            地图左上角的位置 (像素)
+        chunk_tiles : int, default = 16
+            区块边长 (瓦片数)
+        post_api : (EventLike) -> None, optional, default = None
+            发布事件函数, 一般使用`Core`的`add_event`
+        listen_receivers : set[str], optional, default = {EVERYONE_RECEIVER, self.uuid}
+            监听的接收者集合
+        """
+        cols, rows = grid_shape
+        super().__init__(
+            pygame.Rect(position, (cols * tile_size[0], rows * tile_size[1])),
+            post_api=post_api,
+            listen_receivers=listen_receivers,
+        )
+        self.tile_size: Tuple[int, int] = tile_size
+        self.grid_shape: Tuple[int, int] = grid_shape
+        self.chunk_tiles: int = chunk_tiles
+        self.tile_images: Sequence[Optional[pygame.Surface]] = tile_images
+        self.rendered_chunks: int = 0
+        self.__chunks: Dict[Tuple[int, int], pygame.Surface] = {}
+        self.__tile_ids: array.array = array.array("H", bytes(2 * cols * rows))
+        if tile_ids is not None:
+            row_count = 0
+            for row, ids in enumerate(tile_ids):
+                ids = list(ids)
+                if len(ids) != cols or row >= rows:
+                    raise ValueError(
+                        f"`tile_ids` does not match grid_shape {grid_shape}."
+                    )
+                self.__tile_ids[row * cols : (row + 1) * cols] = array.array("H", ids)
+                row_count += 1
+            if row_count != rows:
+                raise ValueError(
+                    f"`tile_ids` has {row_count} rows, expected {rows} (grid_shape {grid_shape})."
+                )
+
+    def __index(self, col: int, row: int) -> int:
+        cols, rows = self.grid_shape
+        if not (0 <= col < cols and 0 <= row < rows):
+            raise IndexError(f"Tile ({col}, {row}) is out of grid {self.grid_shape}.")
+        return row * cols + col
+
+    def get_tile(self, col: int, row: int) -> int:
+        """
+        获取瓦片ID
+
+        Raises
+        ---
+        IndexError
+            坐标超出地图范围
+        """
+        return self.__tile_ids[self.__index(col, row)]
+
+    def set_tile(self, col: int, row: int, tile_id: int) -> None:
+        """
+        设置瓦片ID, 只使该瓦片所在的区块失效 (ID没有变化时什么都不做)
+
+        Raises
+        ---
+        IndexError
+            坐标超出地图范围
+        """
+        index = self.__index(col, row)
+        if self.__tile_ids[index] == tile_id:
+            return
+        self.__tile_ids[index] = tile_id
+        self.__chunks.pop((col // self.chunk_tiles, row // self.chunk_tiles), None)
+        self.touch()
+
+    def fill(self, tile_id: int) -> None:
+        """
+        用同一种瓦片填满地图
+        """
+        cols, rows = self.grid_shape
+        self.__tile_ids = array.array("H", [tile_id]) * (cols * rows)
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        使所有区块的缓存失效
+        """
+        self.__chunks.clear()
+        self.touch()
+
+    def __render_chunk(self, cx: int, cy: int) -> pygame.Surface:
+        """渲染区块`(cx, cy)`"""
+        cols, rows = self.grid_shape
+        tw, th = self.tile_size
+        n = self.chunk_tiles
+        col0, row0 = cx * n, cy * n
+        col1, row1 = min(col0 + n, cols), min(row0 + n, rows)
+        chunk = pygame.Surface(
+            ((col1 - col0) * tw, (row1 - row0) * th), pygame.SRCALPHA
+        )
+        images = self.tile_images
+        ids = self.__tile_ids
+        blit_items: List[Tuple[pygame.Surface, Tuple[int, int]]] = []
+        for row in range(row0, row1):
+            base = row * cols
+            for col in range(col0, col1):
+                image = images[ids[base + col]]
+                if image is not None:
+                    blit_items.append((image, ((col - col0) * tw, (row - row0) * th)))
+        chunk.blits(blit_items, doreturn=False)
+        self.rendered_chunks += 1
+        return chunk
+
+    @listening(c.EventCode.DRAW)
+    def draw(self, event: EventLike):
+        """
+        绘制视野 (画布范围) 内的区块, 没有缓存的区块先渲染
+
+        Listening
+        ---
+        DRAW : DrawEventBody
+            surface : pygame.Surface
+                画布
+            offset : tuple[int, int]
+                偏移量
+        """
+        body: c.DrawEventBody = event.body
+        surface: pygame.Surface = body["surface"]
+        offset: Tuple[int, int] = body["offset"]
+
+        left = self.rect.x + offset[0]
+        top = self.rect.y + offset[1]
+        view = surface.get_clip().move(-left, -top)  # 地图坐标系中的视野
+        view = view.clip(pygame.Rect((0, 0), self.rect.size))
+        if not view.width or not view.height:
+            return
+        tw, th = self.tile_size
+        cw, ch = tw * self.chunk_tiles, th * self.chunk_tiles
+        chunks = self.__chunks
+        blit_items: List[Tuple[pygame.Surface, Tuple[int, int]]] = []
+        for cy in range(view.top // ch, (view.bottom - 1) // ch + 1):
+            for cx in range(view.left // cw, (view.right - 1) // cw + 1):
+                chunk = chunks.get((cx, cy))
+                if chunk is None:
+                    chunk = chunks[(cx, cy)] = self.__render_chunk(cx, cy)
+                blit_items.append((chunk, (left + cx * cw, top + cy * ch)))
+        surface.blits(blit_items, doreturn=False)
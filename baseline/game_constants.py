@@ -51,30 +51,49 @@ class SceneEventCode(_IntEnum):
 
 
 # event body | 事件内容模板
-class MoveAttemptBody(_typing.TypedDict):
-    sender: str
-    target_rect: _pygame.Rect
-    charater_type: CharaterType
+class MoveAttemptBody(EventBody):
+    __slots__ = ("sender", "target_rect", "charater_type")
 
+    def __init__(
+        self, sender: str, target_rect: _pygame.Rect, charater_type: CharaterType
+    ) -> None:
+        self.sender: str = sender
+        self.target_rect: _pygame.Rect = target_rect
+        self.charater_type: CharaterType = charater_type
 
-class MoveAllowBody(_typing.TypedDict):
-    receiver: str
-    target_rect: _pygame.Rect
 
+class MoveAllowBody(EventBody):
+    __slots__ = ("receiver", "target_rect")
 
-class HaveVolumnBody(_typing.TypedDict):
-    pass
+    def __init__(self, receiver: str, target_rect: _pygame.Rect) -> None:
+        self.receiver: str = receiver
+        self.target_rect: _pygame.Rect = target_rect
 
 
-class ChangeSceneEventBody(_typing.TypedDict):
-    new_scene: "SceneLike"
+class HaveVolumnBody(EventBody):
+    __slots__ = ()
 
 
-class TeleportEventBody(_typing.TypedDict):
-    scene_id: int
-    position: _typing.Optional[_typing.Tuple[int, int]]
+class ChangeSceneEventBody(EventBody):
+    __slots__ = ("new_scene",)
 
+    def __init__(self, new_scene: "SceneLike") -> None:
+        self.new_scene: "SceneLike" = new_scene
 
-class CollisionEventBody(_typing.TypedDict):
-    sender: str
-    charater_type: CharaterType
+
+class TeleportEventBody(EventBody):
+    __slots__ = ("scene_id", "position")
+
+    def __init__(
+        self, scene_id: int, position: _typing.Optional[_typing.Tuple[int, int]] = None
+    ) -> None:
+        self.scene_id: int = scene_id
+        self.position: _typing.Optional[_typing.Tuple[int, int]] = position
+
+
+class CollisionEventBody(EventBody):
+    __slots__ = ("sender", "charater_type")
+
+    def __init__(self, sender: str, charater_type: CharaterType) -> None:
+        self.sender: str = sender
+        self.charater_type: CharaterType = charater_type
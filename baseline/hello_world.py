@@ -10,6 +10,7 @@ from typing import Tuple, Optional
 import pygame
 
 import utils
+import assets
 import game_constants as c
 from game_collections import (
     EventLike,
@@ -19,6 +20,7 @@ from game_collections import (
     GroupLike,
     ListenerLike,
     TextEntity,
+    flush_debug_overlay,
 )
 
 c.DEBUG = True
@@ -80,7 +82,7 @@ class WanderNpc(EntityLike):
             self.__walking_radius,
             (math.cos(self.__walking_radian), math.sin(self.__walking_radian)),
         )
-        self.rect = self.__walking_center.move(*shift)
+        self.rect.update(self.__walking_center.move(*shift))
 
 
 class StateShow(TextEntity):
@@ -113,6 +115,10 @@ class StateShow(TextEntity):
 
 if __name__ == "__main__":
     co = Core()
+    # 可选的预解码资源包与图集, 见build_bundle.py与build_atlas.py
+    assets.default_assets.load_bundle(r".\assets\bundle\images.bundle")
+    assets.default_assets.load_atlas(r".\assets\atlas\atlas.json")
+    assets.default_fonts.cache_path = r".\.cache\fonts.json"  # 之后启动不再扫描系统字体
     group = GroupLike()
     player = Player()
 
@@ -128,9 +134,12 @@ if __name__ == "__main__":
     group.add_listener(wander_npc)
     group.add_listener(tree)
     group.add_listener(state_show)
+    co.attach(group)  # 只接收群组监听的pygame事件
+    co.flip_hooks.append(flush_debug_overlay)  # 每帧输出前一次性绘制DEBUG框
 
     while True:
         co.window.fill((255, 255, 255))  # 全屏涂黑
         for event in co.yield_events():
             group.listen(event)  # 听取: 核心事件队列
+        assets.update()  # 换上后台加载完成的图像, 推进音乐切换
         co.flip()  # 更新屏幕缓冲区
@@ -0,0 +1,42 @@
+"""
+测试配置: 使用SDL的dummy驱动 (不需要显示器与声卡), 并把项目目录加入`sys.path`
+
+Usage
+---
+```
+python -m pytest -q
+```
+"""
+
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from base.collections import Core
+
+
+@pytest.fixture(scope="session", autouse=True)
+def pygame_init():
+    Core.init()
+
+
+@pytest.fixture
+def core():
+    """`Core`单例, 测试结束后恢复被修改的设置并清空事件"""
+    core = Core()
+    core.clear_event()
+    injectors = list(core.queue_injectors)
+    policies = dict(core.coalesce_policies)
+    flip_hooks = list(core.flip_hooks)
+    yield core
+    core.queue_injectors[:] = injectors
+    core.flip_hooks[:] = flip_hooks
+    core.coalesce_policies.clear()
+    core.coalesce_policies.update(policies)
+    core.dirty_rect_mode = False
+    core.clear_event()
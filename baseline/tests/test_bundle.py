@@ -0,0 +1,73 @@
+import os
+
+import pygame
+import pytest
+
+import assets
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    source = str(tmp_path / "tile.png")
+    bundle = str(tmp_path / "images.bundle")
+    image = pygame.Surface((8, 8), pygame.SRCALPHA)
+    image.fill((255, 0, 0, 255))
+    pygame.image.save(image, source)
+    assets.build_bundle(
+        [source], bundle, root=str(tmp_path), sizes={source: [(16, 16)]}
+    )
+    return source, bundle
+
+
+def save_color(path, color):
+    image = pygame.Surface((8, 8), pygame.SRCALPHA)
+    image.fill(color)
+    pygame.image.save(image, path)
+
+
+def test_touched_source_updates_index(bundle):
+    source, bundle = bundle
+    assert assets.AssetManager().load_bundle(bundle, auto_rebuild=False) == 2
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert assets.AssetManager().load_bundle(bundle, auto_rebuild=False) == 2
+    entry = assets._read_bundle_index(bundle)["entries"][0]
+    assert entry["mtime_ns"] == os.stat(source).st_mtime_ns
+
+
+def test_changed_source_is_not_loaded(bundle):
+    source, bundle = bundle
+    save_color(source, (0, 255, 0, 255))
+    assert assets.AssetManager().load_bundle(bundle, auto_rebuild=False) == 0
+    manager = assets.AssetManager()
+    assert manager.load_bundle(bundle) == 2  # 自动重新生成
+    assert manager.load_image(source).get_at((0, 0)) == (0, 255, 0, 255)
+
+
+def test_reload_unmaps_previous_bundle(bundle, monkeypatch):
+    source, bundle = bundle
+    mapped = []
+    original_mmap = assets.mmap.mmap
+
+    def tracking_mmap(*args, **kwargs):
+        mapped.append(original_mmap(*args, **kwargs))
+        return mapped[-1]
+
+    monkeypatch.setattr(assets.mmap, "mmap", tracking_mmap)
+    manager = assets.AssetManager()
+    assert manager.load_bundle(bundle) == 2
+    manager.load_image(source)
+    save_color(source, (0, 0, 255, 255))
+
+    # 替换文件时, 旧的映射必须已经关闭 (Windows不能替换被映射的文件)
+    replace = os.replace
+
+    def checked_replace(src, dst):
+        assert all(mapping.closed for mapping in mapped)
+        replace(src, dst)
+
+    monkeypatch.setattr(assets.os, "replace", checked_replace)
+    assert manager.load_bundle(bundle) == 2
+    assert [mapping.closed for mapping in mapped] == [True, False]
+    manager.clear()
+    assert manager.load_image(source).get_at((0, 0)) == (0, 0, 255, 255)
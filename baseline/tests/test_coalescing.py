@@ -0,0 +1,62 @@
+import pygame
+import pytest
+
+from base import constants as const
+from base.collections import EventLike
+
+TEST_CODE = pygame.USEREVENT + 500  # 不与框架的事件代码冲突
+
+
+def drain(core, pygame_events=False):
+    """取出本帧的全部事件, `pygame_events`为`False`时只取出通过`add_event`加入的事件"""
+    if not pygame_events:
+        core.queue_injectors[:] = []
+    else:
+        core.queue_injectors[:] = core.queue_injectors[:1]
+    return list(core.yield_events())
+
+
+def post_keys(*keys):
+    pygame.event.clear()
+    for key in keys:
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key))
+
+
+def test_keep_last(core):
+    core.coalesce_policies[TEST_CODE] = const.CoalescePolicy.KEEP_LAST
+    for i in range(3):
+        core.add_event(EventLike(TEST_CODE, body={"i": i}))
+    assert [e.body["i"] for e in drain(core)] == [2]
+
+
+def test_dedupe(core):
+    core.coalesce_policies[TEST_CODE] = const.CoalescePolicy.DEDUPE
+    for i in (0, 0, 1):
+        core.add_event(EventLike(TEST_CODE, body={"i": i}))
+    assert [e.body["i"] for e in drain(core)] == [0, 1]
+
+
+@pytest.mark.parametrize("capped", [False, True])
+def test_pygame_events_use_the_same_policy(core, capped):
+    """设置容量上限与否, pygame事件的合并结果与计数都相同"""
+    core.coalesce_policies[pygame.KEYDOWN] = const.CoalescePolicy.DEDUPE
+    prior = EventLike.from_pygame_event(pygame.event.Event(pygame.KEYDOWN)).prior
+    if capped:
+        core.set_queue_cap(prior, 100)
+    try:
+        core.coalesced_counts.clear()
+        post_keys(pygame.K_a, pygame.K_a, pygame.K_b)
+        keys = [e.key for e in drain(core, True) if e.code == pygame.KEYDOWN]
+    finally:
+        core.set_queue_cap(prior, None)
+    assert keys == [pygame.K_a, pygame.K_b]
+    assert core.coalesced_counts[pygame.KEYDOWN] == 1
+
+
+def test_pygame_keep_last_counts(core):
+    core.coalesce_policies[pygame.KEYDOWN] = const.CoalescePolicy.KEEP_LAST
+    core.coalesced_counts.clear()
+    post_keys(pygame.K_a, pygame.K_b, pygame.K_c)
+    keys = [e.key for e in drain(core, True) if e.code == pygame.KEYDOWN]
+    assert keys == [pygame.K_c]
+    assert core.coalesced_counts[pygame.KEYDOWN] == 2
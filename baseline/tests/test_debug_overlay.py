@@ -0,0 +1,53 @@
+from unittest import mock
+
+import pygame
+import pytest
+
+import game_constants as c
+from base.collections import Core, EventLike
+from game_collections import DebugOverlay, EntityLike, SceneLike
+
+RED = (255, 0, 0, 255)
+BLUE = (0, 0, 255, 255)
+
+
+@pytest.fixture
+def debug():
+    saved, c.DEBUG = c.DEBUG, True
+    yield
+    c.DEBUG = saved
+
+
+def make_entity(rect, color):
+    image = pygame.Surface(rect.size, pygame.SRCALPHA)
+    image.fill(color)
+    return EntityLike(rect, image=image)
+
+
+def test_overlay_is_flushed_once_per_frame(core, debug):
+    scene = SceneLike(core)
+    scene.into()
+    scene.layers[0].append(make_entity(pygame.Rect(10, 10, 20, 20), BLUE))
+    scene.layers[1].append(make_entity(pygame.Rect(50, 10, 20, 20), BLUE))
+    try:
+        with mock.patch.object(DebugOverlay, "draw", autospec=True) as draw:
+            scene.draw(EventLike.draw_event(core.window))
+            assert draw.call_count == 0
+            Core.flip()
+        assert draw.call_count == 1
+    finally:
+        scene.leave()
+
+
+def test_overlay_is_above_higher_layers(core, debug):
+    scene = SceneLike(core)
+    scene.into()
+    scene.layers[0].append(make_entity(pygame.Rect(10, 10, 20, 20), BLUE))
+    scene.layers[1].append(make_entity(pygame.Rect(0, 0, 100, 100), BLUE))
+    try:
+        core.window.fill((0, 0, 0))
+        scene.draw(EventLike.draw_event(core.window))
+        Core.flip()
+    finally:
+        scene.leave()
+    assert core.window.get_at((20, 10)) == RED  # 低图层实体的碰撞箱上边
@@ -0,0 +1,48 @@
+from unittest import mock
+
+import pygame
+
+from base.collections import Core
+
+
+def test_flip_is_static(core):
+    with mock.patch("pygame.display.flip") as flip:
+        Core.flip()
+        core.flip()
+    assert flip.call_count == 2
+
+
+def test_separate_rects_are_kept(core):
+    core.dirty_rect_mode = True
+    Core.flip()  # 输出打开模式时标记的整个窗口
+    core.mark_dirty(pygame.Rect(0, 0, 10, 10))
+    core.mark_dirty(pygame.Rect(500, 400, 10, 10))
+    assert core.dirty_rects == [
+        pygame.Rect(0, 0, 10, 10),
+        pygame.Rect(500, 400, 10, 10),
+    ]
+    assert core.dirty_area == pygame.Rect(0, 0, 510, 410)
+
+
+def test_overlapping_rects_are_merged(core):
+    core.dirty_rect_mode = True
+    Core.flip()
+    core.mark_dirty(pygame.Rect(0, 0, 10, 10))
+    core.mark_dirty(pygame.Rect(100, 0, 10, 10))
+    core.mark_dirty(pygame.Rect(5, 5, 100, 2))  # 连接前两个矩形
+    assert core.dirty_rects == [pygame.Rect(0, 0, 110, 10)]
+
+
+def test_flip_updates_dirty_rects(core):
+    core.dirty_rect_mode = True
+    Core.flip()
+    rects = [pygame.Rect(0, 0, 10, 10), pygame.Rect(500, 400, 10, 10)]
+    for rect in rects:
+        core.mark_dirty(rect)
+    core.begin_dirty_draw()
+    core.mark_dirty(pygame.Rect(50, 50, 5, 5))  # 已经开始绘制, 留到下一帧
+    with mock.patch("pygame.display.update") as update:
+        Core.flip()
+    update.assert_called_once_with(rects)
+    assert core.window.get_clip() == core.window.get_rect()
+    assert core.dirty_rects == [pygame.Rect(50, 50, 5, 5)]
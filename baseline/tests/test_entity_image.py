@@ -0,0 +1,20 @@
+import pygame
+
+from base.collections import EventLike
+from game_collections import EntityLike
+
+
+def test_imageless_entity_returns_private_surfaces():
+    a = EntityLike(pygame.Rect(0, 0, 10, 10))
+    b = EntityLike(pygame.Rect(0, 0, 10, 10))
+    assert not a.has_image
+    a.image.fill((255, 0, 0, 255))  # 在返回的图像上绘制不影响其他实体
+    assert a.image is not b.image
+    assert b.image.get_at((0, 0)).a == 0
+    assert b.image.get_size() == (10, 10)
+
+
+def test_imageless_entity_is_not_drawn(core):
+    surface = pygame.Surface((20, 20), pygame.SRCALPHA)
+    EntityLike(pygame.Rect(0, 0, 10, 10)).draw(EventLike.draw_event(surface))
+    assert surface.get_bounding_rect().size == (0, 0)
@@ -0,0 +1,35 @@
+import pygame
+
+from game_collections import EntityLike
+
+
+def half_filled_image():
+    image = pygame.Surface((10, 10), pygame.SRCALPHA)
+    image.fill((255, 255, 255, 255), (0, 0, 5, 10))
+    return image
+
+
+def test_invalidation_is_shared():
+    """共享Surface的实体共享掩码; 任何一个实体使掩码失效后, 其他实体也得到新的掩码"""
+    image = half_filled_image()
+    a = EntityLike(pygame.Rect(0, 0, 10, 10), image=image)
+    b = EntityLike(pygame.Rect(0, 0, 10, 10), image=image)
+    assert a.mask.count() == b.mask.count() == 50
+    image.fill((255, 255, 255, 255))
+    a.invalidate_mask()
+    assert b.mask.count() == 100
+
+
+def test_overridden_image_property():
+    image = half_filled_image()
+
+    class Overridden(EntityLike):
+        @property
+        def image(self):
+            return image
+
+    assert Overridden(pygame.Rect(0, 0, 10, 10)).mask.count() == 50
+
+
+def test_entity_without_image_has_empty_mask():
+    assert EntityLike(pygame.Rect(0, 0, 4, 4)).mask.count() == 0
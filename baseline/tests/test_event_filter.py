@@ -0,0 +1,67 @@
+import pygame
+import pytest
+
+from base.collections import GroupLike, ListenerLike
+from base.tools import listening
+
+
+class KeyListener(ListenerLike):
+    @listening(pygame.KEYDOWN)
+    def on_key(self, event):
+        pass
+
+
+class MouseListener(ListenerLike):
+    @listening(pygame.MOUSEBUTTONDOWN)
+    def on_click(self, event):
+        pass
+
+
+@pytest.fixture
+def group(core):
+    group = GroupLike()
+    group.add_listener(KeyListener())
+    core.attach(group)
+    yield group
+    core.detach(group)
+    list(core.yield_events())  # 没有登记者时取消过滤
+
+
+def test_unused_types_are_blocked(core, group):
+    list(core.yield_events())  # 过滤在获取pygame事件前更新
+    assert not pygame.event.get_blocked(pygame.KEYDOWN)
+    assert pygame.event.get_blocked(pygame.MOUSEBUTTONDOWN)
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "QUIT",
+        "WINDOWFOCUSLOST",
+        "WINDOWCLOSE",
+        "VIDEOEXPOSE",
+        "ACTIVEEVENT",
+        "TEXTINPUT",
+    ],
+)
+def test_system_events_are_not_blocked(core, group, name):
+    list(core.yield_events())
+    assert not pygame.event.get_blocked(getattr(pygame, name))
+
+
+def test_filter_follows_group_members(core, group):
+    list(core.yield_events())
+    group.add_listener(MouseListener())
+    list(core.yield_events())
+    assert not pygame.event.get_blocked(pygame.MOUSEBUTTONDOWN)
+
+
+def test_union_is_not_rebuilt_every_frame(core, group, monkeypatch):
+    list(core.yield_events())
+    calls = []
+    monkeypatch.setattr(
+        GroupLike, "listen_codes", property(lambda self: calls.append(self) or set())
+    )
+    for _ in range(3):
+        list(core.yield_events())
+    assert calls == []
@@ -0,0 +1,29 @@
+import time
+
+import pygame
+
+import assets
+from game_collections import LayerLike, SceneLike
+
+
+def wait_ready(handles, timeout=5):
+    deadline = time.perf_counter() + timeout
+    while not all(handle.ready for handle in handles):
+        assert time.perf_counter() < deadline, "prefetch timed out"
+        assets.default_streamer.update()
+        time.sleep(0.001)
+
+
+def test_prefetch_belongs_to_scenes():
+    assert not hasattr(LayerLike, "prefetch")
+
+
+def test_prefetched_images_hit_the_cache(core, tmp_path):
+    source = str(tmp_path / "prefetch.png")
+    pygame.image.save(pygame.Surface((8, 8)), source)
+    scene = SceneLike(core)
+    scene.asset_paths = [source]
+    wait_ready(scene.prefetch())
+    misses = assets.default_assets.stats["misses"]
+    assets.default_assets.load_image(source)
+    assert assets.default_assets.stats["misses"] == misses
@@ -0,0 +1,74 @@
+import pygame
+import pytest
+
+from base import constants as const
+from base import tools
+from base.collections import EventLike
+
+TEST_CODE = pygame.USEREVENT + 500  # 不与框架的事件代码冲突
+TEST_PRIOR = 7
+
+
+@pytest.fixture
+def capped(core):
+    yield core
+    core.set_queue_cap(TEST_PRIOR, None)
+    core.set_queue_cap(EventLike.step_event(0).prior, None)
+
+
+def drain(core):
+    core.queue_injectors[:] = []
+    return list(core.yield_events())
+
+
+def add_events(core, count, prior=TEST_PRIOR):
+    for i in range(count):
+        core.add_event(EventLike(TEST_CODE, prior=prior, body={"i": i}))
+
+
+def test_drop_oldest_keeps_newest(capped):
+    capped.set_queue_cap(TEST_PRIOR, 3, const.OverflowPolicy.DROP_OLDEST)
+    add_events(capped, 5)
+    assert [e.body["i"] for e in drain(capped)] == [2, 3, 4]
+    assert capped.event_stats["dropped"] >= 2
+
+
+def test_drop_newest_keeps_oldest(capped):
+    capped.set_queue_cap(TEST_PRIOR, 3, const.OverflowPolicy.DROP_NEWEST)
+    add_events(capped, 5)
+    assert [e.body["i"] for e in drain(capped)] == [0, 1, 2]
+
+
+def test_coalesce_replaces_same_code(capped):
+    capped.set_queue_cap(TEST_PRIOR, 2, const.OverflowPolicy.COALESCE)
+    capped.add_event(EventLike(TEST_CODE + 1, prior=TEST_PRIOR))
+    add_events(capped, 3)
+    events = drain(capped)
+    assert [e.code for e in events] == [TEST_CODE + 1, TEST_CODE]
+    assert events[1].body["i"] == 2
+
+
+def test_frame_events_are_never_evicted(capped):
+    step = EventLike.step_event(0.016)
+    capped.set_queue_cap(step.prior, 2, const.OverflowPolicy.DROP_OLDEST)
+    capped.add_event(step)
+    add_events(capped, 3, prior=step.prior)
+    events = drain(capped)
+    assert events[0] is step
+    assert [e.body["i"] for e in events[1:]] == [2]
+
+    add_events(capped, 2, prior=step.prior)
+    capped.add_event(step)  # 达到上限也会加入
+    assert step in drain(capped)
+
+
+def test_barrel_queue_pops_without_rebuilding_heap():
+    queue = tools.BarrelQueue(lambda x: x[0])
+    queue.extend([(1, "a"), (2, "b"), (2, "c"), (3, "d")])
+    assert queue.popleft_key(2) == (2, "b")
+    assert queue.pop_first(2, lambda x: True) == (2, "c")
+    assert queue.pop_first(2, lambda x: True) is None
+    assert [queue.popleft() for _ in range(len(queue))] == [(1, "a"), (3, "d")]
+    assert not queue
+    with pytest.raises(KeyError):
+        queue.popleft_key(2)
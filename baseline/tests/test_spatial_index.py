@@ -0,0 +1,124 @@
+from unittest import mock
+
+import pygame
+import pytest
+
+from base.collections import EventLike
+from game_collections import EntityLike, SceneLike, SpatialIndex, TrackedRect
+
+
+def test_tracked_rect_notifies_in_place_changes():
+    calls = []
+    rect = TrackedRect(0, 0, 10, 10)
+    rect.on_change = lambda: calls.append(rect.topleft)
+    rect.x = 5
+    rect.move_ip(1, 1)
+    rect.move(100, 100)  # 返回新矩形, 不通知
+    assert calls == [(5, 0), (6, 1)]
+
+
+def test_entity_rect_observers():
+    entity = EntityLike(pygame.Rect(0, 0, 10, 10))
+    moved = []
+    entity.add_rect_observer(moved.append)
+    entity.rect.move_ip(3, 0)
+    entity.rect.centerx = 50
+    assert moved == [entity, entity]
+    entity.remove_rect_observer(moved.append)
+    entity.rect.x = 0
+    assert len(moved) == 2
+
+
+def test_entity_rect_keeps_assigned_tracked_rect():
+    entity = EntityLike(pygame.Rect(0, 0, 10, 10))
+    moved = []
+    entity.add_rect_observer(moved.append)
+    old_rect = entity.rect
+    rect = TrackedRect(0, 0, 10, 10)
+    entity.rect = rect
+    assert entity.rect is rect
+    rect.x = 40  # 共享同一个矩形, 修改会移动实体
+    assert entity.rect.x == 40 and len(moved) == 2
+    old_rect.x = 99  # 被替换的矩形不再通知
+    assert len(moved) == 2
+
+
+def test_entity_rect_rejects_plain_rect():
+    entity = EntityLike(pygame.Rect(0, 0, 10, 10))
+    with pytest.raises(TypeError):
+        entity.rect = pygame.Rect(5, 5, 10, 10)
+    entity.rect.update(5, 5, 10, 10)
+    assert entity.rect.topleft == (5, 5)
+
+
+def test_index_follows_moves():
+    near = EntityLike(pygame.Rect(0, 0, 10, 10))
+    far = EntityLike(pygame.Rect(5000, 0, 10, 10))
+    index = SpatialIndex(100)
+    index.add(near)
+    index.add(far)
+    view = pygame.Rect(0, 0, 200, 200)
+    assert index.query(view) == {near}
+    far.rect.topleft = (50, 50)
+    assert index.query(view) == {near, far}
+    index.remove(near)
+    near.rect.topleft = (60, 60)  # 已经移出索引, 不再跟踪
+    assert index.query(view) == {far}
+
+
+def make_scene(core, count):
+    scene = SceneLike(core)
+    layer = scene.layers[0]
+    for i in range(count):
+        layer.append(EntityLike(pygame.Rect(i * 200, 0, 10, 10)))
+    return scene, layer
+
+
+def test_scene_culls_outside_camera(core):
+    scene, layer = make_scene(core, 100)
+    scene.draw(EventLike.draw_event(core.window))
+    visible = -(-core.winsize[0] // 200)
+    assert (scene.drawn_count, scene.culled_count) == (visible, 100 - visible)
+
+    layer[-1].rect.topleft = (0, 100)  # 移入视野
+    scene.draw(EventLike.draw_event(core.window))
+    assert scene.drawn_count == visible + 1
+
+
+def test_layer_changes_update_index_incrementally(core):
+    scene, layer = make_scene(core, 100)
+    draw = EventLike.draw_event(core.window)
+    scene.draw(draw)
+    visible = scene.drawn_count
+
+    # 在末尾加入与删除成员不会重新遍历整个图层, 也不会重建索引
+    original_add = SpatialIndex.add
+    with mock.patch(
+        "game_collections.enumerate", create=True, side_effect=AssertionError
+    ), mock.patch.object(
+        SpatialIndex, "add", autospec=True, side_effect=original_add
+    ) as add:
+        layer.append(EntityLike(pygame.Rect(0, 200, 10, 10)))
+        assert add.call_count == 1
+    removed = layer[0]
+    scene.kill(EventLike.kill_event(removed.uuid))
+    scene.draw(draw)
+    assert removed not in layer
+    assert scene.drawn_count == visible  # 新成员可见, 被删除的成员不再绘制
+    removed.rect.topleft = (5, 5)
+    scene.draw(draw)
+    assert scene.drawn_count == visible
+
+
+def test_reordered_layer_keeps_draw_order(core):
+    scene, layer = make_scene(core, 3)
+    scene.draw(EventLike.draw_event(core.window))
+    layer.reverse()
+    far = EntityLike(pygame.Rect(50000, 0, 10, 10))
+    layer.insert(0, far)
+    drawn = []
+    with mock.patch.object(
+        SceneLike, "draw_layer", lambda self, visible, *_: drawn.extend(visible)
+    ):
+        scene.draw(EventLike.draw_event(core.window))
+    assert drawn == list(layer)[1:]
@@ -0,0 +1,35 @@
+import pygame
+import pytest
+
+from game_collections import TextEntity
+
+
+@pytest.fixture
+def text():
+    return TextEntity(
+        pygame.Rect(0, 0, 200, 100),
+        font=pygame.font.Font(None, 24),
+        back_ground=(0, 0, 0, 255),
+        text="hello\nworld",
+    )
+
+
+def pixels(image, rect):
+    return image.subsurface(rect).copy().get_view("2").raw
+
+
+def test_changed_line_is_repainted_in_place(text):
+    image = text.image
+    first_line = pixels(image, (0, 0, 200, 16))
+    second_line = pixels(image, (0, 20, 200, 16))
+    text.set_text("hello\nthere")
+    assert text.image is image
+    assert pixels(text.image, (0, 0, 200, 16)) == first_line
+    assert pixels(text.image, (0, 20, 200, 16)) != second_line
+
+
+def test_same_text_keeps_render_state(text):
+    text.set_text("hello\nthere")
+    render_state = text.get_render_state()
+    text.set_text("hello\nthere")
+    assert text.get_render_state() == render_state
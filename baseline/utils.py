@@ -6,6 +6,8 @@ import random
 
 import pygame
 
+import assets
+
 _NumberLike = Union[float, int]
 _TupleLike = Union[Tuple[_NumberLike], _NumberLike]
 _IntTupleLike = Union[Tuple[int], int]
@@ -13,13 +15,15 @@ _IntTupleLike = Union[Tuple[int], int]
 
 class PygameApis:
     @staticmethod
-    def play_music(path: str, *, loop: int = -1) -> None:
+    def play_music(path: str, *, loop: int = -1, fade_ms: int = 0) -> None:
         """
         切换并播放背景音乐
 
         Notes
         ---
-        旧的背景音乐会被覆盖掉
+        旧的背景音乐会被覆盖掉。使用`assets.default_music`, 不阻塞:
+        音乐在后台加载完成 (预加载过的立即开始) 且旧的音乐淡出之后才开始播放,
+        需要每帧调用`assets.update()`。
 
         Parameters
         ---
@@ -27,19 +31,41 @@ class PygameApis:
             音乐路径
         loop : int, default = -1
             循环次数, `-1`为无限循环
+        fade_ms : int, default = 0
+            旧音乐淡出与新音乐淡入的时间 (毫秒)
         """
-        pygame.mixer.music.load(path)
-        pygame.mixer.music.play(loops=loop)
+        assets.default_music.play(path, loop=loop, fade_ms=fade_ms)
 
     @staticmethod
-    def stop_music() -> None:
+    def preload_music(path: str, *, as_sound: bool = False) -> None:
+        """
+        在后台预加载背景音乐, 比如接近传送门时预加载下一个场景的音乐
+
+        Parameters
+        ---
+        path : str
+            音乐路径
+        as_sound : bool, default = False
+            是否完整解码 (只适合较短的循环, 可以与其他音乐交叉淡入淡出)
+        """
+        assets.default_music.preload(path, as_sound=as_sound)
+
+    @staticmethod
+    def stop_music(fade_ms: int = 0) -> None:
         """
         停止背景音乐
+
+        Parameters
+        ---
+        fade_ms : int, default = 0
+            淡出的时间 (毫秒)
         """
-        pygame.mixer.music.stop()
+        assets.default_music.stop(fade_ms)
 
     @staticmethod
-    def play_sound(path: str, *, loop: int = 0) -> pygame.mixer.Sound:
+    def play_sound(
+        path: str, *, loop: int = 0, priority: int = 0
+    ) -> pygame.mixer.Sound:
         """
         播放音效
 
@@ -49,31 +75,52 @@ class PygameApis:
             音乐路径
         loop : int, default = 0
             循环次数, `-1`为无限循环
+        priority : int, default = 0
+            优先级, 越大越优先 (没有空闲的混音通道时, 可以抢占优先级不高于它的声音)
 
         Returns
         ---
         pygame.mixer.Sound
+            缓存的音效, 被所有播放共享 (调用它的`stop`会停止这个音效的所有播放)
+
+        Notes
+        ---
+        使用`assets.default_sounds`: 每个文件只解码一次, 同一音效同时播放的数量有上限。
+        """
+        assets.default_sounds.play(path, loop=loop, priority=priority)
+        return assets.default_sounds.load_sound(path)
+
+    @staticmethod
+    def preload_sounds(paths: Iterable[str]) -> None:
         """
-        sound = pygame.mixer.Sound(path)
-        sound.play(loops=loop)
-        return sound
+        预先加载 (解码) 多个音效, 避免第一次播放时卡顿
+        """
+        assets.default_sounds.preload(paths)
 
     @staticmethod
     def stop_sound() -> None:
         """
         停止所有音效
         """
-        pygame.mixer.stop()
+        assets.default_sounds.stop()
 
 
 @functools.cache
+def get_debug_font() -> pygame.font.Font:
+    """DEBUG文字使用的字体 (只创建一次)"""
+    return pygame.font.Font(None, 18)
+
+
 def debug_text(text: str) -> pygame.Surface:
-    font = pygame.font.Font(None, 18)
-    return font.render(
-        text,
-        True,
-        (255, 0, 0),
-    )
+    """
+    渲染红色的DEBUG文字
+
+    Notes
+    ---
+    使用`assets.default_text_cache` (有数量上限的LRU缓存), 返回的Surface是共享的, 不要在上面绘制。
+    实体的DEBUG框由`game_collections.debug_overlay`统一绘制。
+    """
+    return assets.default_text_cache.render(get_debug_font(), text, (255, 0, 0))
 
 
 @staticmethod
@@ -206,7 +253,14 @@ class RectOper:
 
 
 def load_image_and_scale(img_path: str, rect: pygame.Rect) -> pygame.Surface:
-    return pygame.transform.scale(pygame.image.load(img_path), rect.size)
+    """
+    加载图像并缩放到`rect`的大小 (通过`assets.default_assets`缓存)
+
+    Notes
+    ---
+    返回的图像被所有使用者共享, 不要在上面绘制
+    """
+    return assets.default_assets.load_image(img_path, rect.size)
 
 
 class _GridInfo(TypedDict):